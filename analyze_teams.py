@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+"""
+Team Outspeed Matrix
+队伍速度对比矩阵
+Compare the speed of each member of Showdown teams against a format's most used Pokemon
+
+用法 / Usage:
+python analyze_teams.py format_code team_file [team_file ...] [options]
+
+例如 / Examples:
+python analyze_teams.py gen9vgc2025regi my_team.txt
+python analyze_teams.py gen9vgc2025regi open_team_sheets.txt --rating 1760 --top-n 50 --json
+python analyze_teams.py gen9ou teams/*.txt --scenarios neutral tailwind --translate
+
+可选参数 / Optional Arguments:
+--rating, -r       评级阈值（默认: 最高评级） / Rating threshold (default: highest rating)
+--month, -m        指定统计月份 YYYY-MM / Specify statistics month YYYY-MM
+--top-n, -n        对比使用率最高的N只宝可梦（默认: 30） / Compare against the N most used Pokemon (default: 30)
+--scenarios, -s    速度场景（默认: 全部） / Speed scenarios (default: all)
+--output, -o       指定输出目录 / Specify output directory
+--json             同时导出完整矩阵为JSON / Also export the full matrix as JSON
+--summary-only     HTML只包含每支队伍的汇总表（适合大批量队伍） / HTML only holds each team's summary table (for large batches)
+--translate, -t    使用中文翻译宝可梦名称 / Use Chinese translation for Pokemon names
+--sprites          HTML图标来源：sheet/inline/sibling / HTML sprite source: sheet/inline/sibling
+
+队伍文件为Showdown导出的文本，可以包含多支以 "=== [format] 名称 ===" 分隔的队伍（队伍备份格式）。
+每个队员在各场景（能力等级、顺风、麻痹，讲究围巾自动计入）下的速度与对手速度线中每个速度比较，
+按该速度在对手中的占比加权，得到先手、同速和后手的概率；汇总按对手使用率加权。
+所有队伍的所有队员一次性用numpy向量化比较，适合成百上千支队伍（如比赛公开队伍表）。
+Team files are Showdown export text and may hold several teams separated by "=== [format] Name ===" lines (the
+teambuilder backup format). Each member's speed in every scenario (stat stages, Tailwind, paralysis; Choice Scarf is
+applied automatically) is compared with every speed in the threats' speed tiers, weighted by that speed's share of
+the threat, giving outspeed, tie and underspeed probabilities; summaries are weighted by threat usage. All members of
+all teams are compared in one vectorized numpy pass, so hundreds of teams (e.g. open team sheets) run at once.
+"""
+
+import os
+import re
+import html
+import json
+import argparse
+from datetime import datetime
+import export_speed_tiers as tiers
+import stat_tables
+
+# 速度场景：(显示名称, 能力等级, 倍率) / Speed scenarios: (label, stat stage, multiplier)
+SPEED_SCENARIOS = {
+    'neutral': ("Neutral", 0, 1.0),
+    'plus1': ("+1", 1, 1.0),
+    'plus2': ("+2", 2, 1.0),
+    'minus1': ("-1", -1, 1.0),
+    'tailwind': ("Tailwind", 0, 2.0),
+    'paralysis': ("Paralysis", 0, 0.5)
+}
+
+# 影响速度的道具 / Items that modify speed
+ITEM_SPEED_MULTIPLIERS = {'Choice Scarf': 1.5, 'Iron Ball': 0.5}
+
+# 默认对比的对手数量 / Default number of threats
+DEFAULT_TOP_N = 30
+
+TEAM_HEADER_PATTERN = re.compile(r"^===\s*(?:\[([^\]]*)\]\s*)?(.*?)\s*===$")
+GENDER_PATTERN = re.compile(r"\s*\((?:M|F)\)$")
+NICKNAME_PATTERN = re.compile(r"^(.*?)\s*\(([^()]+)\)$")
+STAT_PATTERN = re.compile(r"(\d+)\s*Spe\b")
+EV_PATTERN = re.compile(r"(\d+)\s*(HP|Atk|Def|SpA|SpD|Spe)\b")
+
+# 导出文本中能力值的顺序 / Order of stats in export text
+STAT_NAMES = ['HP', 'Atk', 'Def', 'SpA', 'SpD', 'Spe']
+
+
+def parse_showdown_set(lines):
+    """解析Showdown导出的一只宝可梦，返回配置字典，无法解析时返回None / Parse one Pokemon of a Showdown export, or None"""
+    first_line = lines[0].strip()
+    name_part, _, item = first_line.partition(" @ ")
+    name_part = GENDER_PATTERN.sub("", name_part.strip())
+    nickname_match = NICKNAME_PATTERN.match(name_part)
+    species = nickname_match.group(2).strip() if nickname_match else name_part
+    if not species:
+        return None
+
+    pokemon_set = {
+        'species': species,
+        'nickname': nickname_match.group(1).strip() if nickname_match else None,
+        'item': item.strip() or None,
+        'ability': None,
+        'level': None,
+        'nature': None,
+        'evs': [0] * 6,
+        'moves': [],
+        'speed_ev': 0,
+        'speed_iv': 31
+    }
+    for line in lines[1:]:
+        line = line.strip()
+        if line.startswith("Level:"):
+            level = line[len("Level:"):].strip()
+            pokemon_set['level'] = int(level) if level.isdigit() else None
+        elif line.startswith("Ability:"):
+            pokemon_set['ability'] = line[len("Ability:"):].strip() or None
+        elif line.startswith("EVs:"):
+            for value, stat in EV_PATTERN.findall(line):
+                pokemon_set['evs'][STAT_NAMES.index(stat)] = int(value)
+            pokemon_set['speed_ev'] = pokemon_set['evs'][5]
+        elif line.startswith("IVs:"):
+            match = STAT_PATTERN.search(line)
+            pokemon_set['speed_iv'] = int(match.group(1)) if match else 31
+        elif line.endswith(" Nature"):
+            pokemon_set['nature'] = line[:-len(" Nature")].strip()
+        elif line.startswith("- "):
+            pokemon_set['moves'].append(line[2:].strip())
+    return pokemon_set
+
+
+def parse_showdown_teams(text, default_name="Team"):
+    """解析Showdown导出文本中的所有队伍 / Parse every team in Showdown export text
+
+    返回 [{'name', 'format', 'members'}]；没有 "===" 标题时整段文本视为一支队伍 /
+    Returns [{'name', 'format', 'members'}]; text without "===" headers is a single team
+    """
+    teams = []
+    current = None
+    block = []
+
+    def finish_block():
+        if block and current is not None:
+            pokemon_set = parse_showdown_set(block)
+            if pokemon_set:
+                current['members'].append(pokemon_set)
+        block.clear()
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        header = TEAM_HEADER_PATTERN.match(line)
+        if header:
+            finish_block()
+            current = {'name': header.group(2) or f"{default_name} {len(teams) + 1}", 'format': header.group(1),
+                       'members': []}
+            teams.append(current)
+        elif not line:
+            finish_block()
+        else:
+            if current is None:
+                current = {'name': default_name, 'format': None, 'members': []}
+                teams.append(current)
+            block.append(line)
+    finish_block()
+    return [team for team in teams if team['members']]
+
+
+def resolve_base_speed(species, generation=stat_tables.LATEST_GENERATION):
+    """查找宝可梦在某世代的速度种族值：先按ID精确匹配，再模糊匹配 / Look up base speed in a generation: exact ID first, then fuzzy match"""
+    pokemon_id = tiers.to_showdown_id(species)
+    if pokemon_id not in tiers.pokedexEntries:
+        pokemon_id = tiers.fuzzy_match(species, tiers.pokedexEntries.keys())
+    if not pokemon_id:
+        return None
+    return tiers.get_pokemon_base_stats(pokemon_id, generation).get("spe")
+
+
+def calculate_member_speed(pokemon_set, base_speed, format_level, generation=stat_tables.LATEST_GENERATION):
+    """计算队员未受场景影响的速度（含性格，不含道具） / Calculate a member's speed before scenarios (nature, no item)
+
+    第一、二世代与速度线一样查表（能力值15、能力经验）；之后的世代保留配置中的个体值 /
+    Generations 1 and 2 are looked up like the speed tiers (DV 15, stat experience); later generations keep the set's IV
+    """
+    level = pokemon_set['level'] or format_level
+    if stat_tables.get_generation_rules(generation) == 'legacy':
+        return stat_tables.calculate_stat('spe', base_speed, pokemon_set['speed_ev'], pokemon_set['nature'], generation, level)
+    multiplier = tiers.get_nature_speed_multiplier(pokemon_set['nature'])
+    return tiers.calculate_stat_value(base_speed, pokemon_set['speed_iv'], pokemon_set['speed_ev'], level, multiplier)
+
+
+def apply_speed_scenario(speed, stage, multiplier):
+    """应用能力等级后再应用倍率，每步向下取整 / Apply the stat stage, then the multiplier, flooring after each step"""
+    if stage >= 0:
+        staged = speed * (2 + stage) // 2
+    else:
+        staged = speed * 2 // (2 - stage)
+    return int(staged * multiplier)
+
+
+def build_threat_distributions(speed_tiers_list, top_n=DEFAULT_TOP_N):
+    """从速度线中取使用率最高的N只宝可梦及其速度分布 / Take the N most used Pokemon and their speed distributions from speed tiers
+
+    每只宝可梦的速度占比按其列出的速度归一化 / Each Pokemon's speed shares are normalized over its listed speeds
+    """
+    threats = {}
+    for tier in speed_tiers_list:
+        for pokemon in tier['pokemon_list']:
+            threat = threats.setdefault(pokemon['name'], {'name': pokemon['name'], 'usage': pokemon['usage'], 'speeds': []})
+            threat['speeds'].append([tier['speed'], pokemon['speed_usage_ratio']])
+
+    selected = sorted(threats.values(), key=lambda threat: threat['usage'], reverse=True)[:top_n]
+    for threat in selected:
+        total = sum(share for _, share in threat['speeds'])
+        for entry in threat['speeds']:
+            entry[1] = entry[1] / total if total else 1 / len(threat['speeds'])
+    return selected
+
+
+def prepare_team_speeds(teams, format_code, scenarios):
+    """计算所有队员在各场景下的速度，返回 (队员列表, 速度矩阵 [队员][场景]) / Speeds of every member in every scenario
+
+    无法识别的宝可梦跳过并提示 / Unrecognized Pokemon are skipped with a message
+    """
+    format_level = tiers.get_format_level(format_code)
+    generation = stat_tables.get_format_generation(format_code)
+    members = []
+    member_speeds = []
+    for team_number, team in enumerate(teams):
+        for pokemon_set in team['members']:
+            base_speed = resolve_base_speed(pokemon_set['species'], generation)
+            if base_speed is None:
+                print(f"Warning: Unknown Pokemon '{pokemon_set['species']}' in {team['name']}, skipped")
+                continue
+            speed = calculate_member_speed(pokemon_set, base_speed, format_level, generation)
+            item_multiplier = ITEM_SPEED_MULTIPLIERS.get(pokemon_set['item'], 1.0)
+            members.append(dict(pokemon_set, team=team_number, base_speed=base_speed, speed=speed))
+            member_speeds.append([apply_speed_scenario(speed, SPEED_SCENARIOS[key][1], SPEED_SCENARIOS[key][2] * item_multiplier)
+                                  for key in scenarios])
+    return members, member_speeds
+
+
+def compute_outspeed_matrix(member_speeds, threats):
+    """向量化计算 队员 × 场景 × 对手 的先手、同速、后手概率 / Vectorized outspeed, tie and underspeed probabilities for members × scenarios × threats
+
+    member_speeds 为 [队员][场景] 的速度；返回numpy数组字典，形状均为 (队员, 场景, 对手) /
+    member_speeds is speeds [member][scenario]; returns a dict of numpy arrays shaped (members, scenarios, threats)
+    """
+    import numpy as np
+
+    speeds = np.asarray(member_speeds, dtype=np.int32).reshape(len(member_speeds), -1)
+    # 所有对手的速度依次排列，记录每只对手的起始位置 / Every threat's speeds laid out in order, with each threat's start
+    threat_speeds = np.array([speed for threat in threats for speed, _ in threat['speeds']], dtype=np.int32)
+    threat_shares = np.array([share for threat in threats for _, share in threat['speeds']], dtype=np.float64)
+    starts = np.cumsum([0] + [len(threat['speeds']) for threat in threats[:-1]])
+
+    difference = speeds[:, :, None] - threat_speeds[None, None, :]
+    outspeed = np.add.reduceat((difference > 0) * threat_shares, starts, axis=2)
+    tie = np.add.reduceat((difference == 0) * threat_shares, starts, axis=2)
+    return {'outspeed': outspeed, 'tie': tie, 'underspeed': np.clip(1.0 - outspeed - tie, 0.0, 1.0)}
+
+
+def summarize_outspeed(matrix, threats):
+    """按对手使用率加权汇总，返回 (先手, 同速) 数组，形状为 (队员, 场景) / Usage-weighted summary, returning (outspeed, tie) arrays shaped (members, scenarios)"""
+    import numpy as np
+
+    usage = np.array([threat['usage'] for threat in threats], dtype=np.float64)
+    weights = usage / usage.sum() if usage.sum() else np.full(len(threats), 1 / len(threats))
+    return matrix['outspeed'] @ weights, matrix['tie'] @ weights
+
+
+def format_probability_cell(outspeed, tie):
+    """单元格文本和颜色类 / Cell text and color class"""
+    underspeed = max(0.0, 1.0 - outspeed - tie)
+    if outspeed > underspeed:
+        css_class = 'nature-positive'
+    elif underspeed > outspeed:
+        css_class = 'nature-negative'
+    else:
+        css_class = 'nature-neutral'
+    text = f"{outspeed * 100:.0f}%"
+    if tie > 0:
+        text += f" <small>(tie {tie * 100:.0f}%)</small>"
+    return f'<td class="{css_class}">{text}</td>'
+
+
+def render_sprite_name(name, sprite_positions, label=None):
+    """宝可梦图标和名称 / Pokemon sprite and name"""
+    sprite_info = sprite_positions[name]
+    return f"""<div style="display: flex; align-items: center;">
+                                <div class="pokemon-sprite" style="background-position: -{sprite_info['x']}px -{sprite_info['y']}px;"></div>
+                                <span class="pokemon-name">{html.escape(label or tiers.translate_pokemon_name(name))}</span>
+                            </div>"""
+
+
+def render_team_section(team, team_members, member_indexes, threats, scenarios, matrix, summary, sprite_positions,
+                        summary_only=False):
+    """生成一支队伍的汇总表和各场景的矩阵 / Render one team's summary table and per-scenario matrices"""
+    outspeed_summary, tie_summary = summary
+    labels = [SPEED_SCENARIOS[key][0] for key in scenarios]
+    member_labels = [member['nickname'] or tiers.translate_pokemon_name(member['species']) for member in team_members]
+
+    rows = ""
+    for member, member_label, index in zip(team_members, member_labels, member_indexes):
+        cells = "".join(format_probability_cell(outspeed_summary[index][s], tie_summary[index][s]) for s in range(len(scenarios)))
+        item = f" @ {html.escape(member['item'])}" if member['item'] else ""
+        rows += f"""
+                    <tr class="pokemon-row">
+                        <td>{render_sprite_name(member['species'], sprite_positions, member_label)}</td>
+                        <td class="speed-tier">{member['speed']}</td>
+                        <td style="font-size: 12px;">{html.escape(member['nature'] or 'Neutral')}, {member['speed_ev']} EVs{item}</td>
+                        {cells}
+                    </tr>"""
+    section = f"""
+        <div class="stats-summary">
+            <div class="stat-item">
+                <div class="stat-number">{html.escape(team['name'])}</div>
+                <div class="stat-label">Usage-weighted share of the top {len(threats)} Pokemon each member outspeeds</div>
+            </div>
+        </div>
+        <div class="table-container">
+            <table>
+                <thead>
+                    <tr>
+                        <th>Member</th>
+                        <th>Speed</th>
+                        <th>Spread</th>
+                        {"".join(f"<th>{label}</th>" for label in labels)}
+                    </tr>
+                </thead>
+                <tbody>{rows}
+                </tbody>
+            </table>
+        </div>"""
+
+    if summary_only:
+        return section
+
+    member_headers = "".join(f"<th>{html.escape(label)}</th>" for label in member_labels)
+    for s, label in enumerate(labels):
+        rows = ""
+        for t, threat in enumerate(threats):
+            speeds = ", ".join(f"{speed} ({share * 100:.0f}%)" for speed, share in threat['speeds'])
+            cells = "".join(format_probability_cell(matrix['outspeed'][index][s][t], matrix['tie'][index][s][t])
+                            for index in member_indexes)
+            rows += f"""
+                    <tr class="pokemon-row">
+                        <td>{render_sprite_name(threat['name'], sprite_positions)}</td>
+                        <td>{threat['usage'] * 100:.2f}%</td>
+                        <td style="font-size: 12px;">{speeds}</td>
+                        {cells}
+                    </tr>"""
+        section += f"""
+        <div class="table-container">
+            <table>
+                <thead>
+                    <tr>
+                        <th>{label}</th>
+                        <th>Usage Rate</th>
+                        <th>Speeds</th>
+                        {member_headers}
+                    </tr>
+                </thead>
+                <tbody>{rows}
+                </tbody>
+            </table>
+        </div>"""
+    return section
+
+
+def render_team_report(teams, members, threats, scenarios, matrix, summary, format_code, rating_threshold,
+                       sprite_positions, stylesheet, summary_only=False):
+    """生成所有队伍的HTML报告 / Render the HTML report for every team"""
+    format_display_name = tiers.formatDisplayNames.get(format_code, format_code)
+    indexes_by_team = {}
+    for index, member in enumerate(members):
+        indexes_by_team.setdefault(member['team'], []).append(index)
+    sections = ""
+    for team_number, team in enumerate(teams):
+        member_indexes = indexes_by_team.get(team_number)
+        if member_indexes:
+            sections += render_team_section(team, [members[index] for index in member_indexes], member_indexes,
+                                            threats, scenarios, matrix, summary, sprite_positions, summary_only)
+
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Team Outspeed Matrix - {format_display_name} ({rating_threshold}+)</title>
+{stylesheet}
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>Team Outspeed Matrix</h1>
+            <p>{format_display_name} - Rating {rating_threshold}+ - {len(teams)} team(s) against the top {len(threats)} Pokemon - Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+        </div>{sections}
+    </div>
+</body>
+</html>"""
+
+
+def build_team_report_filepath(format_code, rating_threshold, extension, output_dir="."):
+    """生成带时间戳的报告路径 / Build timestamped report path"""
+    format_display_name = tiers.formatDisplayNames.get(format_code, format_code)
+    clean_format_name = re.sub(r'[^\w\-_\.]', '_', format_display_name)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(output_dir, f"Team_Outspeed_{clean_format_name}_{rating_threshold}_{timestamp}.{extension}")
+
+
+def export_team_json(teams, members, threats, scenarios, matrix, filepath):
+    """导出完整矩阵为JSON / Export the full matrix as JSON"""
+    document = {
+        'scenarios': [SPEED_SCENARIOS[key][0] for key in scenarios],
+        'threats': threats,
+        'teams': [{'name': team['name'], 'format': team['format'], 'members': []} for team in teams]
+    }
+    for index, member in enumerate(members):
+        document['teams'][member['team']]['members'].append({
+            'species': member['species'],
+            'nickname': member['nickname'],
+            'item': member['item'],
+            'speed': member['speed'],
+            'outspeed': matrix['outspeed'][index].round(4).tolist(),
+            'tie': matrix['tie'][index].round(4).tolist()
+        })
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False)
+    print(f"JSON file exported: {filepath}")
+    return filepath
+
+
+def load_format_speed_tiers(format_code, rating_threshold, year_month=None):
+    """读取格式的未过滤速度线（优先使用缓存） / Read a format's unfiltered speed tiers, using the cache when current"""
+    stats_path, is_outdated = tiers.find_usage_data_file(format_code, rating_threshold, year_month)
+    if not stats_path:
+        return None
+    if is_outdated:
+        print("Warning: Using outdated statistics data")
+    speed_tiers_list = tiers.load_cached_speed_tiers(stats_path, format_code)
+    if speed_tiers_list is None:
+        usage_document = tiers.load_usage_file(stats_path) or {}
+        speed_tiers_list = tiers.calculate_speed_tiers(usage_document.get("data", {}), format_code)
+    return speed_tiers_list
+
+
+def main():
+    """主函数 / Main function"""
+    parser = argparse.ArgumentParser(description="Compare Showdown teams against the speed tiers of a format's most used Pokemon")
+    parser.add_argument("format", help="Format code (e.g.: gen9vgc2025regi)")
+    parser.add_argument("teams", nargs='+', help="Showdown team export files; a file may hold several '=== [format] Name ===' teams")
+    parser.add_argument("--rating", "-r", help="Rating threshold (default: highest rating)")
+    parser.add_argument("--month", "-m", help="Statistics month YYYY-MM (default: last month, falling back to the month before)")
+    parser.add_argument("--top-n", "-n", type=int, default=DEFAULT_TOP_N, help=f"Compare against the N most used Pokemon (default: {DEFAULT_TOP_N})")
+    parser.add_argument("--scenarios", "-s", nargs='+', choices=list(SPEED_SCENARIOS), default=list(SPEED_SCENARIOS),
+                        help="Speed scenarios (default: all)")
+    parser.add_argument("--output", "-o", default=".", help="Output directory (default: current directory)")
+    parser.add_argument("--json", action="store_true", help="Also export the full matrix as JSON")
+    parser.add_argument("--summary-only", action="store_true", help="Only render each team's summary table in HTML (for large batches)")
+    parser.add_argument("--translate", "-t", action="store_true", help="Use Chinese translation for Pokemon names")
+    parser.add_argument("--sprites", choices=tiers.SPRITE_MODES, default="sheet",
+                        help="HTML sprite source: full sheet by relative URL, trimmed atlas inlined as data URI, or trimmed atlas as sibling file (default: sheet)")
+
+    args = parser.parse_args()
+    if args.top_n < 1:
+        parser.error("--top-n must be at least 1")
+
+    try:
+        import numpy
+    except ImportError:
+        print("Error: Team analysis requires numpy (pip install numpy)")
+        return
+
+    print("Loading data...")
+    tiers.load_all_data(use_translation=args.translate)
+
+    rating_threshold = args.rating
+    available_ratings = tiers.get_available_ratings(args.format)
+    if not available_ratings:
+        print(f"Error: No data files found for format '{args.format}'")
+        return
+    if not rating_threshold:
+        rating_threshold = available_ratings[-1]
+        print(f"Rating not specified, using highest rating: {rating_threshold}")
+    elif rating_threshold not in available_ratings:
+        print(f"Error: Rating '{rating_threshold}' is not available for format '{args.format}'")
+        print(f"Available ratings: {', '.join(available_ratings)}")
+        return
+
+    teams = []
+    for team_file in args.teams:
+        try:
+            with open(team_file, 'r', encoding='utf-8') as f:
+                teams.extend(parse_showdown_teams(f.read(), os.path.splitext(os.path.basename(team_file))[0]))
+        except OSError as e:
+            print(f"Error reading {team_file}: {e}")
+    if not teams:
+        print("Error: No teams found")
+        return
+    print(f"Parsed {len(teams)} team(s) with {sum(len(team['members']) for team in teams)} Pokemon")
+
+    speed_tiers_list = load_format_speed_tiers(args.format, rating_threshold, args.month)
+    if not speed_tiers_list:
+        print("Error: Unable to get usage data")
+        return
+    threats = build_threat_distributions(speed_tiers_list, args.top_n)
+    if not threats:
+        print("Error: No threats in the speed tiers")
+        return
+
+    members, member_speeds = prepare_team_speeds(teams, args.format, args.scenarios)
+    if not members:
+        print("Error: No recognized Pokemon in the teams")
+        return
+    matrix = compute_outspeed_matrix(member_speeds, threats)
+    summary = summarize_outspeed(matrix, threats)
+    print(f"Compared {len(members)} Pokemon in {len(args.scenarios)} scenario(s) against {len(threats)} Pokemon")
+
+    os.makedirs(args.output, exist_ok=True)
+    filepath = build_team_report_filepath(args.format, rating_threshold, "html", args.output)
+    sprite_names = {threat['name'] for threat in threats} | {member['species'] for member in members}
+    sprite_url, sprite_positions = tiers.prepare_report_sprites(sorted(sprite_names), args.sprites, filepath)
+    html_content = render_team_report(teams, members, threats, args.scenarios, matrix, summary, args.format,
+                                      rating_threshold, sprite_positions,
+                                      stylesheet=f"    <style>\n{tiers.build_html_stylesheet(sprite_url)}    </style>",
+                                      summary_only=args.summary_only)
+    try:
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        print(f"HTML file exported: {filepath}")
+    except OSError as e:
+        print(f"Error exporting HTML file: {e}")
+
+    if args.json:
+        export_team_json(teams, members, threats, args.scenarios, matrix,
+                         build_team_report_filepath(args.format, rating_threshold, "json", args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Atomic File Writes
+原子文件写入
+Write a file under a temporary name and move it into place only once it is complete
+
+用法 / Usage:
+import atomic_files
+with atomic_files.atomic_write("stats/speed_tier_cache/2025-07-gen9ou-0.json") as f:
+    json.dump(data, f)
+
+临时文件与目标文件在同一目录（"<路径>.<进程ID>.tmp"），写完后用 os.replace 替换目标文件，读取方不会看到写了一半的文件，
+并行的进程也不会写同一个临时文件。写入过程中出现任何异常（包括调用方主动抛出的）时删除临时文件，目标文件保持不变，异常继续抛出。
+The temporary file sits next to the target ("<path>.<pid>.tmp") and replaces it with os.replace once written, so
+readers never see a half-written file and parallel processes never share a temporary file. Any exception while
+writing, including one raised by the caller to abandon the write, removes the temporary file, leaves the target
+untouched and propagates.
+"""
+
+import os
+from contextlib import contextmanager
+
+
+def get_temporary_path(path):
+    """目标文件对应的临时文件路径 / Temporary file path for a target file"""
+    return f"{path}.{os.getpid()}.tmp"
+
+
+@contextmanager
+def atomic_write(path, mode='w', encoding='utf-8', **open_options):
+    """以临时文件写入，完成后原子替换目标文件，出错时删除临时文件 / Write through a temporary file, atomically replace the target when done, remove the temporary file on error
+
+    mode 可含 '+'，以便写完后在同一文件对象上校验 / mode may include '+' so the content can be verified on the same file object
+    """
+    temporary_path = get_temporary_path(path)
+    try:
+        with open(temporary_path, mode, encoding=None if 'b' in mode else encoding, **open_options) as f:
+            yield f
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
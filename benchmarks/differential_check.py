@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Speed Tier Differential Check
+速度线计算差分校验
+Run the reference calculate_speed_tiers and alternate engines on the same inputs and diff the tier lists
+
+用法 / Usage:
+python benchmarks/differential_check.py [options]
+
+例如 / Examples:
+python benchmarks/differential_check.py
+python benchmarks/differential_check.py --engine mymodule:calculate_speed_tiers_fast --workers 8
+python benchmarks/differential_check.py --corpus none --random 200 --seed 42
+python benchmarks/differential_check.py --reference-cache .diff_cache --report diff_report.json
+
+可选参数 / Optional Arguments:
+--engine, -e       待校验的引擎，内置名称或 module:function，可重复（默认: 全部内置引擎） / Engine to check, a built-in name or module:function, repeatable (default: all built-in engines)
+--corpus           真实数据：none/all（默认: all） / Real stats files: none/all (default: all)
+--random, -r       随机合成输入的数量（默认: 50） / Number of randomized synthetic inputs (default: 50)
+--seed             随机输入的起始种子（默认: 0） / First seed for randomized inputs (default: 0)
+--workers, -w      并行进程数（默认: CPU核心数） / Number of worker processes (default: CPU count)
+--reference-cache  缓存参考实现结果的目录，按输入和源码哈希失效 / Directory caching reference results, keyed by input and source hashes
+--rel-tolerance    浮点字段的相对误差容忍度（默认: 0，即完全一致） / Relative tolerance for float fields (default: 0, i.e. exact)
+--max-diffs        每个输入最多报告的差异数（默认: 10） / Maximum differences reported per input (default: 10)
+--report           将完整结果写入JSON文件 / Write the full results to a JSON file
+
+引擎签名与 calculate_speed_tiers 相同：engine(usage_data, format_code) -> 排序后的速度线列表。
+参考实现抛出异常时，引擎必须抛出相同类型的异常。发现差异时以退出码1结束。
+Engines share the calculate_speed_tiers signature: engine(usage_data, format_code) -> sorted speed tier list.
+When the reference raises, an engine must raise the same exception type. Exits with status 1 on any difference.
+"""
+
+import os
+import io
+import sys
+import json
+import math
+import time
+import random
+import hashlib
+import argparse
+import importlib
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_ROOT)
+
+import export_speed_tiers as tiers
+import atomic_files
+import stat_tables
+import synthetic_chaos
+
+# 随机输入的规模范围 / Size ranges of randomized inputs
+RANDOM_SPECIES_RANGE = (1, 120)
+RANDOM_SPREADS_RANGE = (1, 60)
+
+# 工作进程状态 / Worker process state
+workerEngines = {}
+workerOptions = {}
+
+
+def calculate_with_memoized_resolution(usage_data, format_code=""):
+    """缓存物种名称解析的引擎：结果必须与参考实现一致 / Engine caching species resolution; must match the reference exactly"""
+    cache = calculate_with_memoized_resolution.cache
+    reference_match = tiers.fuzzy_match
+
+    def memoized_fuzzy_match(target, options):
+        if target not in cache:
+            cache[target] = reference_match(target, options)
+        return cache[target]
+
+    tiers.fuzzy_match = memoized_fuzzy_match
+    try:
+        return tiers.calculate_speed_tiers(usage_data, format_code)
+    finally:
+        tiers.fuzzy_match = reference_match
+
+
+calculate_with_memoized_resolution.cache = {}
+
+# 内置引擎：名称 -> 函数 / Built-in engines: name -> function
+ENGINES = {
+    'memoized-resolution': calculate_with_memoized_resolution
+}
+
+
+def resolve_engine(spec):
+    """把引擎名称或 module:function 解析为函数 / Resolve an engine name or module:function to a callable"""
+    if spec in ENGINES:
+        return ENGINES[spec]
+    module_name, _, function_name = spec.partition(':')
+    if not function_name:
+        raise ValueError(f"Unknown engine '{spec}', expected one of {', '.join(ENGINES)} or module:function")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def hash_files(paths):
+    """计算多个文件内容的合并哈希 / Hash the combined contents of several files"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def run_engine(engine, usage_data, format_code):
+    """运行一个引擎，异常被记录为结果的一部分 / Run one engine, recording an exception as part of the result
+
+    返回 (结果, 耗时秒数) / Returns (result, seconds)
+    """
+    started = time.perf_counter()
+    try:
+        with redirect_stdout(io.StringIO()):
+            result = engine(usage_data, format_code)
+    except Exception as e:
+        result = {'error': type(e).__name__}
+    return result, time.perf_counter() - started
+
+
+def diff_structures(expected, actual, path, rel_tolerance=0.0, limit=10, differences=None):
+    """递归比较两个结构，返回差异列表 / Recursively compare two structures, returning the list of differences"""
+    differences = [] if differences is None else differences
+    if len(differences) >= limit:
+        return differences
+
+    if type(expected) is not type(actual):
+        differences.append(f"{path}: type {type(expected).__name__} != {type(actual).__name__} ({expected!r} vs {actual!r})")
+    elif isinstance(expected, dict):
+        if list(expected) != list(actual):
+            differences.append(f"{path}: keys {list(expected)} != {list(actual)}")
+        for key in expected:
+            if key in actual:
+                diff_structures(expected[key], actual[key], f"{path}.{key}", rel_tolerance, limit, differences)
+    elif isinstance(expected, list):
+        if len(expected) != len(actual):
+            differences.append(f"{path}: length {len(expected)} != {len(actual)}")
+        for index, (left, right) in enumerate(zip(expected, actual)):
+            diff_structures(left, right, f"{path}[{index}]", rel_tolerance, limit, differences)
+    elif isinstance(expected, float):
+        if not (expected == actual or (rel_tolerance and math.isclose(expected, actual, rel_tol=rel_tolerance))):
+            differences.append(f"{path}: {expected!r} != {actual!r}")
+    elif expected != actual:
+        differences.append(f"{path}: {expected!r} != {actual!r}")
+    return differences[:limit]
+
+
+def init_worker(engine_specs, options):
+    """工作进程初始化：加载图鉴和引擎 / Worker initializer: load the pokedex and the engines"""
+    global workerEngines, workerOptions
+    with redirect_stdout(io.StringIO()):
+        tiers.load_all_data()
+    workerEngines = {spec: resolve_engine(spec) for spec in engine_specs}
+    workerOptions = options
+
+
+def load_task_input(task):
+    """读取任务输入：真实统计文件或随机合成文档 / Load a task's input: a real stats file or a randomized synthetic document
+
+    返回 (使用数据, 格式代码, 输入哈希) / Returns (usage data, format code, input hash)
+    """
+    if task['kind'] == 'file':
+        with open(task['path'], 'rb') as f:
+            raw = f.read()
+        document = json.loads(raw)
+        return document.get('data', {}), task['format_code'], hashlib.sha256(raw).hexdigest()
+
+    document = synthetic_chaos.generate_chaos_document(species_names=workerOptions['species_names'], **task['options'])
+    raw = json.dumps(document, sort_keys=True).encode('utf-8')
+    return document['data'], task['options']['metagame'], hashlib.sha256(raw).hexdigest()
+
+
+def load_cached_reference(cache_path):
+    """读取缓存的参考结果 / Read a cached reference result"""
+    if not cache_path or not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached_reference(cache_path, result):
+    """原子写入参考结果缓存 / Atomically write a reference result to the cache"""
+    with atomic_files.atomic_write(cache_path) as f:
+        json.dump(result, f)
+
+
+def check_task(task):
+    """在一个输入上运行参考实现和所有引擎并比较 / Run the reference and every engine on one input and compare"""
+    usage_data, format_code, input_hash = load_task_input(task)
+    report = {'label': task['label'], 'engines': {}}
+
+    cache_path = None
+    if workerOptions['reference_cache']:
+        key = hashlib.sha256(f"{workerOptions['reference_hash']}:{format_code}:{input_hash}".encode('utf-8')).hexdigest()
+        cache_path = os.path.join(workerOptions['reference_cache'], f"{key}.json")
+    expected = load_cached_reference(cache_path)
+    if expected is None:
+        expected, report['reference_seconds'] = run_engine(tiers.calculate_speed_tiers, usage_data, format_code)
+        if cache_path:
+            save_cached_reference(cache_path, expected)
+    else:
+        report['reference_cached'] = True
+    report['records'] = tiers.count_speed_tier_records(expected) if isinstance(expected, list) else 0
+
+    # JSON往返保证新算出的结果和缓存的参考结果类型相同 / A JSON round trip gives fresh and cached reference results the same types
+    expected = json.loads(json.dumps(expected))
+    for spec, engine in workerEngines.items():
+        actual, seconds = run_engine(engine, usage_data, format_code)
+        report['engines'][spec] = {
+            'seconds': round(seconds, 6),
+            'differences': diff_structures(expected, json.loads(json.dumps(actual)), "tiers",
+                                           workerOptions['rel_tolerance'], workerOptions['max_diffs'])
+        }
+    return report
+
+
+def build_tasks(corpus_mode, random_count, seed):
+    """生成校验任务 / Build the check tasks"""
+    tasks = []
+    if corpus_mode == "all" and os.path.isdir(tiers.DATA_DIRECTORY):
+        for filename in sorted(os.listdir(tiers.DATA_DIRECTORY)):
+            parts = filename[:-len(".json")].split('-')
+            if filename.endswith(".json") and filename[:4].isdigit() and len(parts) >= 4:
+                tasks.append({'kind': 'file', 'label': filename, 'path': tiers.build_data_path(filename),
+                              'format_code': parts[-2]})
+
+    for index in range(random_count):
+        rng = random.Random(seed + index)
+        # 一半输入使用小整数权重，覆盖并列、恰好20%和全零权重 / Half of the inputs use small integer weights to cover ties, exact 20% splits and all-zero weights
+        options = {
+            'species_count': rng.randint(*RANDOM_SPECIES_RANGE),
+            'spreads_per_species': rng.randint(*RANDOM_SPREADS_RANGE),
+            'teammates': 5,
+            'metagame': rng.choice(["gen9synthetic", "gen9vgcsynthetic", "gen9bsssynthetic"]),
+            'seed': seed + index,
+            'weight_levels': rng.choice([None, 1, 2, 5])
+        }
+        tasks.append({'kind': 'synthetic', 'label': f"synthetic-{seed + index}", 'options': options})
+    return tasks
+
+
+def differential_check(engine_specs, corpus_mode="all", random_count=50, seed=0, workers=None,
+                       reference_cache=None, rel_tolerance=0.0, max_diffs=10):
+    """运行差分校验，返回每个输入的报告列表 / Run the differential check, returning one report per input"""
+    if reference_cache:
+        os.makedirs(reference_cache, exist_ok=True)
+    options = {
+        'species_names': synthetic_chaos.load_species_names(),
+        'reference_cache': reference_cache,
+        # 参考结果取决于计算代码（含属性值表）和图鉴 / Reference results depend on the calculation code (stat tables included) and the pokedex
+        'reference_hash': hash_files([tiers.__file__, stat_tables.__file__, tiers.build_data_path("pokedex.json")]),
+        'rel_tolerance': rel_tolerance,
+        'max_diffs': max_diffs
+    }
+    tasks = build_tasks(corpus_mode, random_count, seed)
+    # 大文件先运行，减少并行时的尾部等待 / Run large files first to shorten the parallel tail
+    tasks.sort(key=lambda task: -os.path.getsize(task['path']) if task['kind'] == 'file' else 0)
+
+    reports = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, initializer=init_worker,
+                             initargs=(engine_specs, options)) as executor:
+        for report in executor.map(check_task, tasks):
+            reports.append(report)
+            for spec, result in report['engines'].items():
+                if result['differences']:
+                    print(f"MISMATCH {report['label']} [{spec}]")
+                    for difference in result['differences']:
+                        print(f"  {difference}")
+    return reports
+
+
+def print_summary(reports, engine_specs, elapsed):
+    """打印汇总，返回存在差异的输入数 / Print the summary, returning the number of mismatching inputs"""
+    mismatches = 0
+    print(f"\nChecked {len(reports)} input(s), {sum(report['records'] for report in reports)} reference records "
+          f"in {elapsed:.1f}s ({sum(1 for report in reports if report.get('reference_cached'))} cached reference results)")
+    reference_seconds = sum(report.get('reference_seconds', 0) for report in reports)
+    if reference_seconds:
+        print(f"  {'reference':<32} {reference_seconds:>8.2f}s")
+    for spec in engine_specs:
+        failed = sum(1 for report in reports if report['engines'][spec]['differences'])
+        seconds = sum(report['engines'][spec]['seconds'] for report in reports)
+        mismatches = max(mismatches, failed)
+        print(f"  {spec:<32} {seconds:>8.2f}s  {'OK' if not failed else f'{failed} mismatching input(s)'}")
+    return mismatches
+
+
+def main():
+    """主函数 / Main function"""
+    parser = argparse.ArgumentParser(description="Diff alternate speed tier engines against calculate_speed_tiers")
+    parser.add_argument("--engine", "-e", action="append", help="Built-in engine name or module:function (repeatable)")
+    parser.add_argument("--corpus", choices=["none", "all"], default="all", help="Real stats files: none/all (default: all)")
+    parser.add_argument("--random", "-r", type=int, default=50, help="Number of randomized synthetic inputs (default: 50)")
+    parser.add_argument("--seed", type=int, default=0, help="First seed for randomized inputs (default: 0)")
+    parser.add_argument("--workers", "-w", type=int, help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--reference-cache", help="Directory caching reference results")
+    parser.add_argument("--rel-tolerance", type=float, default=0.0, help="Relative tolerance for float fields (default: 0)")
+    parser.add_argument("--max-diffs", type=int, default=10, help="Maximum differences reported per input (default: 10)")
+    parser.add_argument("--report", help="Write the full results to a JSON file")
+
+    args = parser.parse_args()
+    engine_specs = args.engine or list(ENGINES)
+    report_path = os.path.abspath(args.report) if args.report else None
+    reference_cache = os.path.abspath(args.reference_cache) if args.reference_cache else None
+    # 引擎模块按调用目录导入，数据路径相对于仓库根目录 / Engine modules import from the caller's directory, data paths are relative to the repository root
+    sys.path.append(os.getcwd())
+    os.chdir(REPOSITORY_ROOT)
+
+    try:
+        for spec in engine_specs:
+            resolve_engine(spec)
+    except (ValueError, ImportError, AttributeError) as e:
+        print(f"Error: {e}")
+        sys.exit(2)
+
+    started = time.perf_counter()
+    reports = differential_check(engine_specs, args.corpus, args.random, args.seed, args.workers,
+                                 reference_cache, args.rel_tolerance, args.max_diffs)
+    mismatches = print_summary(reports, engine_specs, time.perf_counter() - started)
+
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump({'engines': engine_specs, 'reports': reports}, f, indent=2)
+        print(f"Report written: {report_path}")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
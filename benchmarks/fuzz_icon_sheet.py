@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Icon Sheet Parser Fuzzer
+图标索引表解析器模糊测试
+Fuzz update_all_data.parse_icon_indexes offline against generated ps-pokemon.sheet.mjs fixtures
+
+用法 / Usage:
+python benchmarks/fuzz_icon_sheet.py [options]
+
+例如 / Examples:
+python benchmarks/fuzz_icon_sheet.py
+python benchmarks/fuzz_icon_sheet.py --iterations 2000 --seed 7
+python benchmarks/fuzz_icon_sheet.py --write-fixture /tmp/ps-pokemon.sheet.mjs
+
+可选参数 / Optional Arguments:
+--iterations, -n   每类模糊测试的次数（默认: 300） / Iterations per fuzz kind (default: 300)
+--seed             随机种子（默认: 0） / Random seed (default: 0)
+--write-fixture    写出一个规范格式的样例表后退出 / Write one canonical fixture sheet and exit
+
+夹具由 stats/forms_index.json 生成，包括随机空白、注释、引号键、拆分的加法、诱饵对象和任意分块边界。
+还会检查：规范格式下与旧的基于eval的解析结果一致；截断和随机破坏的输入只抛出ValueError；解析时间随表大小线性增长。
+Fixtures are generated from stats/forms_index.json with random whitespace, comments, quoted keys, split additions,
+decoy objects and arbitrary chunk boundaries. It also checks that the canonical layout parses the same as the old
+eval-based extraction, that truncated and corrupted inputs only raise ValueError, and that parse time grows linearly.
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_ROOT)
+
+import export_speed_tiers as tiers
+import update_all_data
+
+# 注释中的干扰内容 / Distracting comment content
+COMMENT_TEXTS = ["alt forms", "};", "egg: 1 + 2,", "const BattlePokemonIconIndexes = {", "ü 表", "'\"", "*"]
+
+IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_$][\w$]*$")
+
+
+def load_expected_indexes():
+    """读取已有的图标索引作为期望结果 / Read the existing icon indexes as the expected result"""
+    indexes = tiers.load_data_file(os.path.join(REPOSITORY_ROOT, tiers.DATA_DIRECTORY, "forms_index.json"))
+    if not indexes:
+        print("Error: stats/forms_index.json is required")
+        sys.exit(1)
+    return indexes
+
+
+def legacy_parse(text):
+    """旧的基于eval的解析（仅用于在规范格式上对比，只在本地生成的夹具上运行） / The old eval-based extraction (only for comparison on the canonical layout, run on locally generated fixtures)"""
+    lines = text.splitlines()
+    start_index = lines.index('const BattlePokemonIconIndexes = {')
+    end_index = start_index
+    while lines[end_index] != '};':
+        end_index += 1
+    content = [line for line in lines[start_index + 1:end_index] if not line.strip().startswith('//')]
+    content_string = re.sub(r'/\*.*?\*/', '', ''.join(content), flags=re.DOTALL)
+    content_string = re.sub(r'(\d+ \+ \d+)', lambda x: str(eval(x.group(1))), content_string)
+    content_string = re.sub(r'(\w+):', r'"\1":', content_string)
+    return eval(f"{{{content_string}}}")
+
+
+def render_canonical_sheet(indexes):
+    """按上游的规范格式生成表 / Render the sheet in the canonical upstream layout"""
+    lines = ["// Generated by the fuzzer", "", "const BattlePokemonIconIndexes = {"]
+    for key, value in indexes.items():
+        if value > 1000:
+            lines.append(f"\t{key}: 1000 + {value - 1000},")
+        else:
+            lines.append(f"\t{key}: {value},")
+        if value % 50 == 0:
+            lines.append("\t// section")
+    lines += ["};", "", "const BattlePokemonIconIndexesLeft = {", "\tegg: 1,", "};", ""]
+    return "\n".join(lines)
+
+
+def random_space(rng):
+    """随机空白或注释 / Random whitespace or comment"""
+    choice = rng.random()
+    if choice < 0.6:
+        return rng.choice(["", " ", "\t", "\n", "\n\t", "  "])
+    if choice < 0.8:
+        return f" // {rng.choice(COMMENT_TEXTS)}\n"
+    return f"/* {rng.choice(COMMENT_TEXTS)}{rng.choice(['', chr(10)])} */"
+
+
+def random_key(rng, key):
+    """随机选择键的写法 / Randomly choose how a key is written"""
+    if IDENTIFIER_PATTERN.match(key) and rng.random() < 0.7:
+        return key
+    quote = rng.choice(["'", '"'])
+    return quote + key.replace("\\", "\\\\").replace(quote, "\\" + quote) + quote
+
+
+def random_value(rng, value):
+    """把值拆成若干个非负整数之和 / Split a value into a sum of non-negative integers"""
+    terms = []
+    remaining = value
+    for _ in range(rng.randint(0, 2)):
+        term = rng.randint(0, remaining)
+        terms.append(term)
+        remaining -= term
+    terms.append(remaining)
+    rng.shuffle(terms)
+    return (random_space(rng) + "+" + random_space(rng)).join(map(str, terms))
+
+
+def render_random_sheet(rng, indexes):
+    """生成随机格式的表，前后带有诱饵代码 / Render a randomly formatted sheet surrounded by decoy code"""
+    parts = [
+        "/* header ü */\n",
+        "export const BattlePokemonIconIndexesLeft = {egg: 99, 'x': 1 + 1};\n",
+        "const note = `template ${value}` + 'it''s' / 2;\n",
+        "export const BattlePokemonIconIndexes", random_space(rng), "=", random_space(rng), "{", random_space(rng)
+    ]
+    items = list(indexes.items())
+    for number, (key, value) in enumerate(items):
+        parts += [random_key(rng, key), random_space(rng), ":", random_space(rng), random_value(rng, value)]
+        if number < len(items) - 1 or rng.random() < 0.5:
+            parts.append(",")
+        parts.append(random_space(rng))
+    parts += ["};\n", "const BattlePokemonIconIndexesRight = {egg: 5};\n", "// trailing comment without newline"]
+    return "".join(parts)
+
+
+def random_chunks(rng, data):
+    """把字节按随机边界切块 / Cut bytes at random boundaries"""
+    chunks = []
+    position = 0
+    while position < len(data):
+        size = rng.choice([1, 2, 3, 7, 64, 4096, rng.randint(1, 512)])
+        chunks.append(data[position:position + size])
+        position += size
+    return chunks
+
+
+def fuzz_valid_sheets(rng, indexes, iterations):
+    """随机格式的合法表必须解析出期望结果 / Valid sheets in random layouts must parse to the expected result"""
+    failures = 0
+    items = list(indexes.items())
+    for _ in range(iterations):
+        subset = dict(rng.sample(items, rng.randint(1, len(items))))
+        data = render_random_sheet(rng, subset).encode('utf-8')
+        try:
+            result = update_all_data.parse_icon_indexes(random_chunks(rng, data))
+        except ValueError as e:
+            result = e
+        if result != subset:
+            failures += 1
+            if failures <= 3:
+                print(f"  valid sheet mismatch: {str(result)[:200]}")
+    return failures
+
+
+def fuzz_broken_sheets(rng, indexes, iterations):
+    """截断或破坏的表只能返回结果或抛出ValueError / Truncated or corrupted sheets may only return a result or raise ValueError"""
+    failures = 0
+    base = render_random_sheet(rng, indexes).encode('utf-8')
+    for _ in range(iterations):
+        data = bytearray(base[:rng.randint(0, len(base))])
+        for _ in range(rng.randint(0, 5)):
+            if data:
+                data[rng.randrange(len(data))] = rng.randrange(256)
+        try:
+            update_all_data.parse_icon_indexes(random_chunks(rng, bytes(data)))
+        except ValueError:
+            pass
+        except Exception as e:
+            failures += 1
+            if failures <= 3:
+                print(f"  broken sheet raised {type(e).__name__}: {e}")
+    return failures
+
+
+def check_legacy_equivalence(indexes):
+    """规范格式下与旧解析结果一致 / Same result as the old extraction on the canonical layout"""
+    text = render_canonical_sheet(indexes)
+    new_result = update_all_data.parse_icon_indexes([text.encode('utf-8')])
+    if new_result != legacy_parse(text) or new_result != indexes:
+        print("  canonical sheet differs from the legacy extraction")
+        return 1
+    return 0
+
+
+def measure_scaling(rng):
+    """测量不同大小的表的解析时间 / Measure parse time for growing sheet sizes"""
+    print("Scaling (canonical layout, 64 KB chunks):")
+    for entries in (1000, 4000, 16000, 64000):
+        indexes = {f"form{number}": 1000 + number for number in range(entries)}
+        data = render_canonical_sheet(indexes).encode('utf-8')
+        chunks = [data[i:i + 64 * 1024] for i in range(0, len(data), 64 * 1024)]
+        started = time.perf_counter()
+        update_all_data.parse_icon_indexes(chunks)
+        elapsed = time.perf_counter() - started
+        print(f"  {entries:>6} entries, {len(data) / 1024:>6.0f} KB: {elapsed * 1000:>8.1f} ms "
+              f"({elapsed / entries * 1e6:.2f} us/entry)")
+
+
+def main():
+    """主函数 / Main function"""
+    parser = argparse.ArgumentParser(description="Fuzz the icon-index sheet parser offline")
+    parser.add_argument("--iterations", "-n", type=int, default=300, help="Iterations per fuzz kind (default: 300)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--write-fixture", help="Write one canonical fixture sheet and exit")
+
+    args = parser.parse_args()
+    indexes = load_expected_indexes()
+
+    if args.write_fixture:
+        with open(args.write_fixture, 'w', encoding='utf-8') as f:
+            f.write(render_canonical_sheet(indexes))
+        print(f"Fixture written: {args.write_fixture}")
+        return
+
+    rng = random.Random(args.seed)
+    failures = {
+        'legacy equivalence': check_legacy_equivalence(indexes),
+        'valid sheets': fuzz_valid_sheets(rng, indexes, args.iterations),
+        'broken sheets': fuzz_broken_sheets(rng, indexes, args.iterations)
+    }
+    for name, count in failures.items():
+        print(f"{name:<20} {'OK' if not count else f'{count} failure(s)'}")
+    measure_scaling(rng)
+
+    if any(failures.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
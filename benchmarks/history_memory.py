@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Speed History Memory Benchmark
+速度线历史内存基准测试
+Check that speed_history.py's peak RSS stays flat as the number of processed months grows, on a synthetic corpus
+
+用法 / Usage:
+python benchmarks/history_memory.py [options]
+
+例如 / Examples:
+python benchmarks/history_memory.py
+python benchmarks/history_memory.py --months 24 --steps 6 12 24 --memory-budget 64 --workers 1
+python benchmarks/history_memory.py --no-baseline
+
+可选参数 / Optional Arguments:
+--months           合成语料的月份数（默认: 24） / Months in the synthetic corpus (default: 24)
+--steps            依次处理的月份数（默认: 3 6 12 24） / Month counts processed in turn (default: 3 6 12 24)
+--memory-budget    speed_history 的内存预算 MB，较小时会溢出到磁盘（默认: 16） / speed_history's memory budget in MB, small enough to spill (default: 16)
+--workers, -w      speed_history 的工作进程数（默认: 1） / speed_history's worker processes (default: 1)
+--no-baseline      不运行先解析全部文件再归约的对照 / Skip the baseline that parses every file before reducing
+
+在临时工作区中为每个月生成几种大小不同的合成统计文件（见 synthetic_chaos.py），然后对每个月份数各启动一个新进程：
+speed_history 的批处理（清空速度线缓存，确保每个文件都被解析），以及先把所有文件解析到内存再逐个归约的对照。
+报告主进程和最大工作进程的 RSS 峰值，并核对两者输出的历史相同。仅支持Linux/macOS（需要 resource 模块）。
+A temporary workspace gets a few synthetic statistics files of different sizes per month (see synthetic_chaos.py).
+Then, for each month count, fresh processes run speed_history's batch (with the speed tier cache cleared, so every
+file is parsed) and a baseline that parses every file into memory before reducing them one by one. Peak RSS of the
+main process and the largest worker is reported, and both outputs are checked to hold the same history.
+Linux/macOS only (needs the resource module).
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+from contextlib import redirect_stdout
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_ROOT)
+
+import export_speed_tiers as tiers
+import pipeline_profiler as profiler
+import speed_history
+import synthetic_chaos
+
+# 每个月的合成格式：(格式代码, 宝可梦数, 每只的配招数) / Synthetic formats per month: (format code, Pokemon, spreads each)
+CORPUS_FORMATS = [
+    ("gen9synthou", 300, 150),
+    ("gen9synthvgc", 200, 120),
+    ("gen9synthuu", 120, 80),
+    ("gen9synthlc", 60, 40),
+]
+
+# 复制到临时工作区的参考数据 / Reference data copied into the temporary workspace
+REFERENCE_FILES = ["pokedex.json", "forms_index.json", "meta_names.json"]
+
+LAST_MONTH = (2025, 7)
+
+
+def list_corpus_months(count):
+    """以 LAST_MONTH 结束的连续月份 / Consecutive months ending at LAST_MONTH"""
+    year, month = LAST_MONTH
+    months = []
+    for _ in range(count):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return months[::-1]
+
+
+def create_corpus(month_count):
+    """创建带合成语料的临时工作区，返回工作区路径 / Create a temporary workspace holding the synthetic corpus, returning its path"""
+    workspace = tempfile.mkdtemp(prefix="history_memory_")
+    data_directory = os.path.join(workspace, tiers.DATA_DIRECTORY)
+    os.makedirs(data_directory)
+    for name in REFERENCE_FILES:
+        source = os.path.join(REPOSITORY_ROOT, tiers.DATA_DIRECTORY, name)
+        if os.path.exists(source):
+            shutil.copy(source, os.path.join(data_directory, name))
+    for seed, month in enumerate(list_corpus_months(month_count)):
+        for format_code, species_count, spreads_per_species in CORPUS_FORMATS:
+            synthetic_chaos.write_chaos_file(os.path.join(data_directory, f"{month}-{format_code}-0.json"),
+                                             species_count=species_count, spreads_per_species=spreads_per_species,
+                                             teammates=40, metagame=format_code, seed=seed)
+    return workspace
+
+
+def clear_speed_tier_caches():
+    """删除工作区的速度线缓存，让每个文件都被解析 / Remove the workspace's speed tier caches so every file gets parsed"""
+    shutil.rmtree(tiers.SPEED_TIER_CACHE_DIRECTORY, ignore_errors=True)
+
+
+def measure_batch(workspace, months, memory_budget_mb, workers, output_path, results):
+    """新进程：运行 speed_history 的批处理 / Fresh process: run speed_history's batch"""
+    os.chdir(workspace)
+    clear_speed_tier_caches()
+    with redirect_stdout(io.StringIO()):
+        tiers.load_all_data()
+        files = speed_history.list_history_files(months)
+        started = time.perf_counter()
+        summary = speed_history.run_history_batch(files, memory_budget_mb, workers, output_path=output_path)
+    summary['seconds'] = time.perf_counter() - started
+    results.put(summary)
+
+
+def measure_baseline(workspace, months, output_path, results):
+    """新进程：先把所有文件解析到内存，再逐个归约 / Fresh process: parse every file into memory, then reduce them one by one"""
+    os.chdir(workspace)
+    clear_speed_tier_caches()
+    with redirect_stdout(io.StringIO()):
+        tiers.load_all_data()
+        files = speed_history.list_history_files(months)
+        started = time.perf_counter()
+        documents = [tiers.load_usage_file(file['path']) for file in files]
+        state = speed_history.create_history_state(sys.maxsize, None)
+        for file, document in zip(files, documents):
+            records = {}
+            for tier in tiers.calculate_speed_tiers(document['data'], file['format']):
+                for pokemon in tier['pokemon_list']:
+                    record = records.setdefault(pokemon['name'], {'usage': pokemon['usage'], 'speeds': []})
+                    record['speeds'].append([tier['speed'], pokemon['speed_usage_ratio']])
+            speed_history.collect_history_records(state, file, records)
+        lines = speed_history.write_history(state, output_path)
+    results.put({'files': len(files), 'spills': 0, 'lines': lines, 'seconds': time.perf_counter() - started,
+                 'peak_rss_kb': profiler.get_peak_rss_kb(), 'worker_peak_rss_kb': 0})
+
+
+def run_measurement(target, *args):
+    """在新的解释器进程中测量，返回其结果 / Measure in a fresh interpreter process, returning its result"""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=target, args=args + (results,))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def read_history(path):
+    """读取历史输出 / Read a history output"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def main():
+    """主函数 / Main function"""
+    parser = argparse.ArgumentParser(description="Check speed_history.py's peak RSS stays flat as the number of months grows")
+    parser.add_argument("--months", type=int, default=24, help="Months in the synthetic corpus (default: 24)")
+    parser.add_argument("--steps", type=int, nargs='+', default=[3, 6, 12, 24], help="Month counts processed in turn (default: 3 6 12 24)")
+    parser.add_argument("--memory-budget", type=float, default=16, help="speed_history's memory budget in MB, small enough to spill (default: 16)")
+    parser.add_argument("--workers", "-w", type=int, default=1, help="speed_history's worker processes (default: 1)")
+    parser.add_argument("--no-baseline", action="store_true", help="Skip the baseline that parses every file before reducing")
+
+    args = parser.parse_args()
+    os.chdir(REPOSITORY_ROOT)
+    steps = [step for step in args.steps if 0 < step <= args.months]
+    if not steps:
+        print("Error: No month counts within the corpus")
+        sys.exit(1)
+
+    print(f"Generating {args.months} months x {len(CORPUS_FORMATS)} synthetic statistics files...")
+    workspace = create_corpus(args.months)
+    corpus_months = list_corpus_months(args.months)
+    try:
+        corpus_mb = sum(os.path.getsize(os.path.join(workspace, tiers.DATA_DIRECTORY, f"{month}-{code}-0.json"))
+                        for month in corpus_months for code, _, _ in CORPUS_FORMATS) / 1024 ** 2
+        print(f"Corpus: {corpus_mb:.1f} MB; budget {args.memory_budget:g} MB, {args.workers} worker(s)")
+        print(f"{'months':>6} {'files':>6} {'mode':<9} {'main RSS':>10} {'worker RSS':>11} {'spills':>7} {'time':>8}")
+
+        mismatches = 0
+        for step in steps:
+            months = [corpus_months[-step], corpus_months[-1]]
+            batch_output = os.path.join(workspace, f"batch_{step}.jsonl")
+            rows = [("batch", run_measurement(measure_batch, workspace, months, args.memory_budget, args.workers, batch_output))]
+            if not args.no_baseline:
+                baseline_output = os.path.join(workspace, f"baseline_{step}.jsonl")
+                rows.append(("baseline", run_measurement(measure_baseline, workspace, months, baseline_output)))
+                if read_history(batch_output) != read_history(baseline_output):
+                    mismatches += 1
+            for mode, result in rows:
+                print(f"{step:>6} {result['files']:>6} {mode:<9} {result['peak_rss_kb'] / 1024:>7.1f} MB "
+                      f"{result['worker_peak_rss_kb'] / 1024:>8.1f} MB {result['spills']:>7} {result['seconds']:>6.1f} s")
+    finally:
+        shutil.rmtree(workspace)
+
+    if mismatches:
+        print(f"Error: Batch and baseline histories differ for {mismatches} month count(s)")
+        sys.exit(1)
+    if not args.no_baseline:
+        print("Batch and baseline histories identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Monthly Refresh Pipeline Benchmark
+月度更新流水线基准测试
+Serve local statistics files as a fixture Smogon server and time update_all_data's download/cache pipeline
+
+用法 / Usage:
+python benchmarks/refresh_pipeline.py [options]
+
+例如 / Examples:
+python benchmarks/refresh_pipeline.py
+python benchmarks/refresh_pipeline.py --files 40 --rate 4 --workers 2
+python benchmarks/refresh_pipeline.py --serve --port 8000
+
+可选参数 / Optional Arguments:
+--month            作为夹具的统计月份（默认: 数据目录中最新的月份） / Statistics month used as the fixture (default: latest month in data directory)
+--files            使用的文件数，按大小均匀选取（默认: 24，0表示全部） / Number of files, picked evenly across sizes (default: 24, 0 means all)
+--rate             模拟的下载速度 MB/s（默认: 4，0表示不限速） / Simulated download speed in MB/s (default: 4, 0 means unlimited)
+--workers, -w      流水线中构建缓存的进程数（默认: CPU数） / Processes building caches in the pipeline (default: CPU count)
+--serve            只运行夹具服务器，供 update_all_data.py --stats-url 使用 / Only run the fixture server, for update_all_data.py --stats-url
+--port             --serve 时的端口（默认: 8000） / Port for --serve (default: 8000)
+
+夹具服务器对任意月份的 /<月份>/chaos/ 返回目录列表和所选文件，其他目录（DLC、H1等）返回404。
+对比两种方式：先下载全部文件再逐个构建缓存，以及边下载边由进程池构建缓存；并核对两者生成的缓存和目录一致。
+The fixture server answers /<month>/chaos/ for any month with a listing and the selected files; other directories
+(DLC, H1, ...) return 404. It compares downloading everything and then building caches one by one against building
+caches in a process pool while downloads continue, and checks both produce the same caches and catalog.
+"""
+
+import os
+import io
+import re
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import threading
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_ROOT)
+
+import export_speed_tiers as tiers
+import update_all_data
+
+# 复制到临时工作区的参考数据 / Reference data copied into the temporary workspace
+REFERENCE_FILES = ["pokedex.json", "forms_index.json", "meta_names.json"]
+
+# 限速时每次发送的块大小 / Chunk size sent per step when throttling
+SEND_CHUNK_SIZE = 64 * 1024
+
+
+def select_fixture_files(month, count):
+    """按大小均匀选取某个月份的统计文件 {服务器上的文件名: 本地路径} / Pick a month's statistics files evenly across sizes {served name: local path}"""
+    prefix = f"{month}-"
+    names = sorted((name for name in os.listdir(tiers.DATA_DIRECTORY) if name.startswith(prefix) and name.endswith(".json")),
+                   key=lambda name: os.path.getsize(tiers.build_data_path(name)))
+    if count and count < len(names):
+        names = [names[round(i * (len(names) - 1) / (count - 1))] for i in range(count)] if count > 1 else names[:1]
+    return {name[len(prefix):]: os.path.abspath(tiers.build_data_path(name)) for name in names}
+
+
+def make_fixture_handler(files, rate):
+    """生成夹具服务器的请求处理类 / Build the fixture server's request handler class"""
+    listing_pattern = re.compile(r"^/\d{4}-\d{2}/chaos/$")
+    file_pattern = re.compile(r"^/\d{4}-\d{2}/chaos/([^/]+)$")
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if listing_pattern.match(self.path):
+                links = "".join(f'<a href="{name}">{name}</a>\n' for name in files)
+                body = f"<html><body><pre>\n{links}</pre></body></html>".encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+
+            match = file_pattern.match(self.path)
+            if not match or match.group(1) not in files:
+                self.send_error(404)
+                return
+            path = files[match.group(1)]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(os.path.getsize(path)))
+            self.end_headers()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(SEND_CHUNK_SIZE), b''):
+                    self.wfile.write(chunk)
+                    if rate:
+                        time.sleep(len(chunk) / (rate * 1024 * 1024))
+
+        def log_message(self, *args):
+            pass
+
+    return FixtureHandler
+
+
+def start_fixture_server(files, rate, port=0):
+    """在后台线程启动夹具服务器 / Start the fixture server in a background thread"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_fixture_handler(files, rate))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def create_workspace():
+    """创建只含参考数据的临时工作区 / Create a temporary workspace holding only the reference data"""
+    workspace = tempfile.mkdtemp(prefix="refresh_pipeline_")
+    os.makedirs(os.path.join(workspace, tiers.DATA_DIRECTORY))
+    for name in REFERENCE_FILES:
+        source = os.path.join(REPOSITORY_ROOT, tiers.DATA_DIRECTORY, name)
+        if os.path.exists(source):
+            shutil.copy(source, os.path.join(workspace, tiers.DATA_DIRECTORY, name))
+    return workspace
+
+
+def run_sequential(base_url):
+    """先下载全部文件，再逐个构建缓存，返回 (下载耗时, 解析耗时) / Download everything, then build caches one by one; returns (download time, parse time)"""
+    started = time.perf_counter()
+    update_all_data.updateMetagames(base_url, workers=0)
+    downloaded = time.perf_counter()
+
+    tiers.load_all_data()
+    catalog = {}
+    for name in sorted(os.listdir(tiers.DATA_DIRECTORY)):
+        if re.match(r"\d{4}-\d{2}-.+-\d+\.json$", name):
+            _, entry = tiers.build_speed_tier_cache(tiers.build_data_path(name), name.split("-")[-2])
+            if entry:
+                catalog[name] = entry
+    with open(tiers.build_data_path(tiers.CATALOG_NAME), 'w', encoding='utf-8') as f:
+        json.dump(catalog, f, indent=1)
+    return downloaded - started, time.perf_counter() - downloaded
+
+
+def run_pipelined(base_url, workers):
+    """边下载边构建缓存，返回总耗时 / Build caches while downloading; returns the total time"""
+    started = time.perf_counter()
+    update_all_data.updateMetagames(base_url, workers=workers)
+    return time.perf_counter() - started
+
+
+def read_results(workspace):
+    """读取工作区中的缓存（去掉修改时间）和目录 / Read the workspace's caches (without mtimes) and catalog"""
+    cache_directory = os.path.join(workspace, tiers.SPEED_TIER_CACHE_DIRECTORY)
+    caches = {}
+    for name in sorted(os.listdir(cache_directory)) if os.path.isdir(cache_directory) else []:
+        with open(os.path.join(cache_directory, name), 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        caches[name] = (cache['source']['sha256'], cache['speed_tiers'])
+    with open(os.path.join(workspace, tiers.DATA_DIRECTORY, tiers.CATALOG_NAME), 'r', encoding='utf-8') as f:
+        return caches, json.load(f)
+
+
+def in_workspace(function, *args):
+    """在新的临时工作区中运行，返回 (结果, 工作区) / Run in a fresh temporary workspace, returning (result, workspace)"""
+    workspace = create_workspace()
+    original_directory = os.getcwd()
+    os.chdir(workspace)
+    try:
+        with redirect_stdout(io.StringIO()):
+            result = function(*args)
+    finally:
+        os.chdir(original_directory)
+    return result, workspace
+
+
+def main():
+    """主函数 / Main function"""
+    parser = argparse.ArgumentParser(description="Time update_all_data's download/cache pipeline against a local fixture server")
+    parser.add_argument("--month", help="Statistics month used as the fixture (default: latest month in data directory)")
+    parser.add_argument("--files", type=int, default=24, help="Number of files, picked evenly across sizes (default: 24, 0 means all)")
+    parser.add_argument("--rate", type=float, default=4, help="Simulated download speed in MB/s (default: 4, 0 means unlimited)")
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count() or 1, help="Processes building caches in the pipeline (default: CPU count)")
+    parser.add_argument("--serve", action="store_true", help="Only run the fixture server, for update_all_data.py --stats-url")
+    parser.add_argument("--port", type=int, default=8000, help="Port for --serve (default: 8000)")
+
+    args = parser.parse_args()
+    os.chdir(REPOSITORY_ROOT)
+    month = args.month or tiers.get_latest_stats_month()
+    files = select_fixture_files(month, args.files) if month else {}
+    if not files:
+        print("Error: No statistics files found")
+        sys.exit(1)
+    total_mb = sum(os.path.getsize(path) for path in files.values()) / 1024 ** 2
+
+    if args.serve:
+        server = start_fixture_server(files, args.rate, args.port)
+        print(f"Serving {len(files)} files ({total_mb:.1f} MB) from {month} at http://127.0.0.1:{server.server_port}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return
+
+    server = start_fixture_server(files, args.rate)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    print(f"{len(files)} files ({total_mb:.1f} MB) from {month}, download rate "
+          f"{f'{args.rate:g} MB/s' if args.rate else 'unlimited'}, {args.workers} cache worker(s)")
+
+    (download_time, parse_time), sequential_workspace = in_workspace(run_sequential, base_url)
+    pipelined_time, pipelined_workspace = in_workspace(run_pipelined, base_url, args.workers)
+    server.shutdown()
+
+    print(f"{'download only':<24} {download_time:>8.2f} s")
+    print(f"{'download, then parse':<24} {download_time + parse_time:>8.2f} s  (parse {parse_time:.2f} s)")
+    print(f"{'pipelined':<24} {pipelined_time:>8.2f} s")
+
+    sequential_results = read_results(sequential_workspace)
+    pipelined_results = read_results(pipelined_workspace)
+    for workspace in (sequential_workspace, pipelined_workspace):
+        shutil.rmtree(workspace)
+    if sequential_results != pipelined_results or len(sequential_results[0]) != len(files):
+        print("Error: Pipelined caches or catalog differ from the sequential run")
+        sys.exit(1)
+    print(f"Caches and catalog identical for {len(files)} files")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Regression Checks
+回归检查
+Check known results offline: legacy-generation stats against their cartridge values, team member speeds, multi-file live ingestion,
+nested profiler stages
+
+用法 / Usage:
+python benchmarks/regression_check.py [options]
+
+例如 / Examples:
+python benchmarks/regression_check.py
+python benchmarks/regression_check.py --checks legacy-stats
+python benchmarks/regression_check.py --checks team-speeds
+python benchmarks/regression_check.py --checks live-files
+python benchmarks/regression_check.py --checks nested-stages
+
+可选参数 / Optional Arguments:
+--checks           运行的检查（默认: 全部） / Checks to run (default: all)
+
+legacy-stats：第一、二世代的已知属性值（第一世代的特殊、第六、七世代修改前的种族值），以及现代世代的对照值。
+team-speeds：analyze_teams.py 中队员的速度应与同一配招在速度线中的速度相同。
+live-files：把同一份没有队伍标题的导出写成多个文件，经 live_tiers.py 的输入读取后，每个文件应是一支独立的队伍。
+nested-stages：父阶段在子阶段开始前的内存峰值应保留在父阶段的 peak_traced_bytes 中。
+每项检查打印不一致之处，有不一致时以状态1退出。
+legacy-stats: known generation 1 and 2 stat values (generation 1 Special, base stats before the generation 6 and 7
+changes), plus modern-generation counterparts.
+team-speeds: a team member's speed in analyze_teams.py must match the same spread's speed in the speed tiers.
+live-files: the same header-less export written to several files must come out of live_tiers.py's input reading as
+one separate team per file.
+nested-stages: a parent stage's memory peak from before a child stage starts must be kept in its peak_traced_bytes.
+Each check prints its mismatches, and any mismatch exits with status 1.
+"""
+
+import os
+import io
+import sys
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_ROOT)
+
+import export_speed_tiers as tiers
+import stat_tables
+import live_tiers
+import analyze_teams
+import pipeline_profiler as profiler
+
+# 已知属性值：(格式, 宝可梦ID, 属性, 性格, 努力值, 期望值)，满努力值的第一、二世代值即卡带中的满能力经验 /
+# Known stat values: (format, Pokemon ID, stat, nature, EVs, expected); generation 1 and 2 values at 252 EVs are the cartridge's max stat experience
+KNOWN_STATS = [
+    ("gen1ou", "chansey", "spa", "Serious", 252, 308),
+    ("gen1ou", "chansey", "spd", "Serious", 252, 308),
+    ("gen1ou", "chansey", "spe", "Serious", 252, 198),
+    ("gen1ou", "jynx", "spa", "Serious", 252, 288),
+    ("gen1ou", "tentacruel", "spd", "Serious", 252, 338),
+    ("gen1ou", "slowbro", "spa", "Serious", 252, 258),
+    ("gen1ou", "tauros", "spa", "Serious", 252, 238),
+    ("gen1ou", "pidgeot", "spe", "Serious", 252, 280),
+    ("gen1ou", "raichu", "spe", "Serious", 252, 298),
+    ("gen1ou", "dugtrio", "atk", "Serious", 252, 258),
+    ("gen2ou", "tentacruel", "spa", "Serious", 252, 258),
+    ("gen2ou", "tentacruel", "spd", "Serious", 252, 338),
+    ("gen2ou", "chansey", "spa", "Serious", 252, 168),
+    ("gen2ou", "pidgeot", "spe", "Serious", 252, 280),
+    ("gen2ou", "raichu", "spe", "Serious", 252, 298),
+    ("gen2ou", "dugtrio", "atk", "Serious", 252, 258),
+    ("gen2ou", "snorlax", "hp", "Serious", 252, 523),
+    ("gen3ou", "raichu", "spe", "Timid", 252, 328),
+    ("gen6ou", "dugtrio", "atk", "Jolly", 252, 259),
+    ("gen9ou", "raichu", "spe", "Timid", 252, 350),
+    ("gen9ou", "dugtrio", "atk", "Jolly", 252, 299),
+]
+
+
+def check_legacy_stats():
+    """核对已知属性值，返回不一致的数量 / Check the known stat values, returning the number of mismatches"""
+    mismatches = 0
+    for format_code, pokemon_id, stat, nature, evs, expected in KNOWN_STATS:
+        generation = stat_tables.get_format_generation(format_code)
+        base = tiers.get_pokemon_base_stats(pokemon_id, generation)[stat]
+        value = stat_tables.calculate_stat(stat, base, evs, nature, generation, tiers.get_format_level(format_code))
+        if value != expected:
+            print(f"Mismatch: {format_code} {pokemon_id} {stat} = {value} (base {base}), expected {expected}")
+            mismatches += 1
+    print(f"legacy-stats: {len(KNOWN_STATS) - mismatches}/{len(KNOWN_STATS)} known stat values match")
+    return mismatches
+
+
+# 队伍导出及其格式：(格式, 导出, 配招)，队员的速度应等于该配招在速度线中的速度 /
+# Team exports and their formats: (format, export, spread); the member's speed must equal that spread's speed tier
+TEAM_SPEED_EXPORTS = [
+    ("gen2ou", "Pidgeot @ Leftovers\nEVs: 252 HP / 252 Atk / 252 Def / 252 SpA / 252 SpD / 252 Spe\n- Return",
+     "Serious:252/252/252/252/252/252"),
+    ("gen9ou", "Raichu @ Life Orb\nEVs: 4 HP / 252 SpA / 252 Spe\nTimid Nature\n- Thunderbolt",
+     "Timid:4/0/0/252/0/252"),
+]
+
+
+def check_team_speeds():
+    """核对队员速度与速度线一致，返回不一致的数量 / Check team member speeds against the speed tiers, returning the number of mismatches"""
+    mismatches = 0
+    for format_code, export, spread in TEAM_SPEED_EXPORTS:
+        teams = analyze_teams.parse_showdown_teams(export)
+        members, _ = analyze_teams.prepare_team_speeds(teams, format_code, ['neutral'])
+        generation = stat_tables.get_format_generation(format_code)
+        expected = tiers.calculate_spread_speed(spread, members[0]['base_speed'], tiers.get_format_level(format_code), generation)[0]
+        if members[0]['speed'] != expected:
+            print(f"Mismatch: {format_code} {members[0]['species']} speed = {members[0]['speed']}, expected {expected}")
+            mismatches += 1
+    print(f"team-speeds: {len(TEAM_SPEED_EXPORTS) - mismatches}/{len(TEAM_SPEED_EXPORTS)} team member speeds match the speed tiers")
+    return mismatches
+
+
+# 没有队伍标题的两只宝可梦的导出，最后一个配置后没有空行 / A two-Pokemon export without a team header, with no blank line after the last set
+LIVE_EXPORT = """Incineroar @ Safety Goggles
+Ability: Intimidate
+Level: 50
+EVs: 252 HP / 4 Atk / 252 SpD
+Careful Nature
+- Fake Out
+- Knock Off
+
+Flutter Mane @ Booster Energy
+Ability: Protosynthesis
+Level: 50
+EVs: 4 HP / 252 SpA / 252 Spe
+Timid Nature
+- Moonblast
+- Shadow Ball"""
+
+LIVE_FILE_COUNT = 3
+
+
+def check_live_files():
+    """核对多个输入文件各自成为一支队伍，返回不一致的数量 / Check that several input files each become one team, returning the number of mismatches"""
+    with tempfile.TemporaryDirectory(prefix="regression_check_") as directory:
+        paths = []
+        for index in range(LIVE_FILE_COUNT):
+            path = os.path.join(directory, f"team_{index}.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(LIVE_EXPORT)
+            paths.append(path)
+        aggregate = live_tiers.create_live_aggregate("gen9vgc2025regi")
+        live_tiers.ingest_lines(aggregate, live_tiers.iter_input_lines(paths))
+
+    snapshot = live_tiers.build_snapshot(aggregate)
+    expected = {'teams': LIVE_FILE_COUNT, 'sets': 2 * LIVE_FILE_COUNT,
+                'Incineroar usage': 1.0, 'Flutter Mane usage': 1.0}
+    found = {'teams': aggregate['teams'], 'sets': aggregate['sets'],
+             'Incineroar usage': snapshot['data'].get('Incineroar', {}).get('usage'),
+             'Flutter Mane usage': snapshot['data'].get('Flutter Mane', {}).get('usage')}
+    mismatches = 0
+    for key, value in expected.items():
+        if found[key] != value:
+            print(f"Mismatch: {LIVE_FILE_COUNT} files give {key} = {found[key]}, expected {value}")
+            mismatches += 1
+    print(f"live-files: {len(expected) - mismatches}/{len(expected)} values match for {LIVE_FILE_COUNT} input files")
+    return mismatches
+
+
+# 父阶段在子阶段之前临时分配的字节数 / Bytes the parent stage allocates temporarily before its child stage
+NESTED_STAGE_BYTES = 8 * 1024 * 1024
+
+
+def check_nested_stages():
+    """核对嵌套阶段不会丢失父阶段之前的峰值，返回不一致的数量 / Check that a nested stage keeps the parent's earlier peak, returning the number of mismatches"""
+    profiler.start_profiling(trace_memory=True)
+    try:
+        with profiler.profile_stage("parent"):
+            buffer = bytearray(NESTED_STAGE_BYTES)
+            del buffer
+            with profiler.profile_stage("child"):
+                pass
+    finally:
+        profiler.stop_profiling()
+    records = {record['stage']: record for record in profiler.take_stage_records()}
+
+    peak = records['parent']['peak_traced_bytes']
+    if peak < NESTED_STAGE_BYTES:
+        print(f"Mismatch: parent stage peak_traced_bytes = {peak}, expected at least {NESTED_STAGE_BYTES}")
+        print("nested-stages: 0/1 parent peaks kept")
+        return 1
+    print("nested-stages: 1/1 parent peaks kept")
+    return 0
+
+
+# 检查名称 -> 函数 / Check name -> function
+CHECKS = {
+    "legacy-stats": check_legacy_stats,
+    "team-speeds": check_team_speeds,
+    "live-files": check_live_files,
+    "nested-stages": check_nested_stages,
+}
+
+
+def main():
+    """主函数 / Main function"""
+    parser = argparse.ArgumentParser(description="Check known results offline")
+    parser.add_argument("--checks", nargs='+', choices=list(CHECKS), default=list(CHECKS), help="Checks to run (default: all)")
+
+    args = parser.parse_args()
+    os.chdir(REPOSITORY_ROOT)
+    with redirect_stdout(io.StringIO()):
+        tiers.load_all_data()
+
+    mismatches = sum(CHECKS[name]() for name in args.checks)
+    if mismatches:
+        print(f"Error: {mismatches} check(s) failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Speed Tiers Benchmark Suite
+速度线性能基准测试
+Time parsing, species resolution, tier computation, filtering and every exporter offline
+
+用法 / Usage:
+python benchmarks/run_benchmarks.py [options]
+
+例如 / Examples:
+python benchmarks/run_benchmarks.py --save-baseline
+python benchmarks/run_benchmarks.py --cases synthetic-small corpus-smallest --repeats 5
+python benchmarks/run_benchmarks.py --corpus all --exporters csv jsonl --threshold 0.1
+
+可选参数 / Optional Arguments:
+--cases            只运行指定的用例（默认: 全部） / Run only the named cases (default: all)
+--corpus           真实数据用例：none/sample/all（默认: sample） / Real stats cases: none/sample/all (default: sample)
+--exporters        只测试指定的导出格式（默认: 全部） / Benchmark only the named exporters (default: all)
+--repeats, -r      每个阶段的重复次数，取中位数（默认: 3） / Repeats per stage, the median is reported (default: 3)
+--output, -o       结果JSON文件（默认: benchmarks/results.json） / Results JSON file (default: benchmarks/results.json)
+--baseline, -b     基线JSON文件（默认: benchmarks/baseline.json） / Baseline JSON file (default: benchmarks/baseline.json)
+--save-baseline    把本次结果保存为基线 / Save this run as the baseline
+--threshold        中位数超过基线的比例阈值（默认: 0.2，即20%） / Allowed median slowdown versus baseline (default: 0.2, i.e. 20%)
+--min-delta        忽略小于该秒数的变化（默认: 0.005） / Ignore changes smaller than this many seconds (default: 0.005)
+
+合成用例由 synthetic_chaos.py 生成；真实用例使用 stats/ 中的统计文件。
+sample 选取最大、中位和最小的统计文件；all 把所有统计文件合并为一个用例（较慢）。
+发现性能回退时以退出码1结束，可直接用于CI。
+Synthetic cases come from synthetic_chaos.py; corpus cases use the bundled stats/ files. "sample" picks the
+largest, median and smallest statistics file, "all" runs every file as one aggregated case (slow).
+Exits with status 1 when a regression is flagged, so it can gate CI.
+"""
+
+import os
+import io
+import gc
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+from contextlib import redirect_stdout
+from datetime import datetime
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_ROOT)
+
+import export_speed_tiers as tiers
+import synthetic_chaos
+
+# 结果文档版本 / Results document version
+BENCHMARK_VERSION = 1
+
+# 合成用例：名称 -> 生成参数 / Synthetic cases: name -> generator options
+SYNTHETIC_CASES = {
+    'synthetic-small': dict(species_count=50, spreads_per_species=20, teammates=20, metagame="gen9synthetic"),
+    'synthetic-medium': dict(species_count=300, spreads_per_species=200, teammates=100, metagame="gen9synthetic"),
+    'synthetic-large': dict(species_count=800, spreads_per_species=500, teammates=200, metagame="gen9vgcsynthetic")
+}
+
+# 过滤阶段使用的参数 / Parameters used by the filter stage
+FILTER_MIN_USAGE = 0.01
+FILTER_TOP_N = 100
+
+DEFAULT_RESULTS_PATH = os.path.join("benchmarks", "results.json")
+DEFAULT_BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+
+
+def time_stage(func, repeats):
+    """重复运行一个阶段并统计耗时 / Run one stage repeatedly and summarize its timings
+
+    返回 (统计, 最后一次的结果) / Returns (timing summary, result of the last run)
+    """
+    runs = []
+    result = None
+    for _ in range(repeats):
+        gc.collect()
+        # 导出函数会打印进度，计时时屏蔽输出 / Exporters print progress, silence it while timing
+        with redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            result = func()
+            runs.append(time.perf_counter() - started)
+    return {
+        'median_seconds': round(statistics.median(runs), 6),
+        'min_seconds': round(min(runs), 6),
+        'runs': [round(run, 6) for run in runs]
+    }, result
+
+
+def parse_stats_filename(filename):
+    """从统计文件名中解析格式和分段 / Parse format and rating from a statistics filename"""
+    parts = filename[:-len(".json")].split('-')
+    return parts[-2], parts[-1]
+
+
+def list_corpus_files():
+    """列出真实统计文件，按大小排序 / List real statistics files sorted by size"""
+    if not os.path.isdir(tiers.DATA_DIRECTORY):
+        return []
+    files = [name for name in os.listdir(tiers.DATA_DIRECTORY)
+             if name.endswith(".json") and name[:4].isdigit() and name.count('-') >= 3]
+    return sorted(files, key=lambda name: os.path.getsize(tiers.build_data_path(name)))
+
+
+def build_cases(corpus_mode, work_dir):
+    """生成要运行的用例：名称 -> (统计文件列表) / Build the cases to run: name -> list of statistics files"""
+    cases = {}
+    names = synthetic_chaos.load_species_names()
+    for case_name, options in SYNTHETIC_CASES.items():
+        path = os.path.join(work_dir, f"{case_name}-{options['metagame']}-0.json")
+        synthetic_chaos.write_chaos_file(path, species_names=names, **options)
+        cases[case_name] = [path]
+
+    corpus_files = list_corpus_files()
+    if corpus_mode == "sample" and corpus_files:
+        picks = {'corpus-smallest': corpus_files[0], 'corpus-median': corpus_files[len(corpus_files) // 2],
+                 'corpus-largest': corpus_files[-1]}
+        for case_name, filename in picks.items():
+            cases[case_name] = [tiers.build_data_path(filename)]
+    elif corpus_mode == "all" and corpus_files:
+        cases['corpus-all'] = [tiers.build_data_path(filename) for filename in corpus_files]
+    return cases
+
+
+def run_case(paths, exporters, repeats, output_dir):
+    """运行一个用例的所有阶段，多个文件时各阶段耗时相加 / Run every stage of one case, summing stage timings over multiple files"""
+    stages = {}
+    info = {'files': [os.path.basename(path) for path in paths], 'species': 0, 'spreads': 0, 'records': 0}
+
+    def add_timing(stage, timing):
+        if stage not in stages:
+            stages[stage] = timing
+            return
+        entry = stages[stage]
+        entry['runs'] = [round(a + b, 6) for a, b in zip(entry['runs'], timing['runs'])]
+        entry['median_seconds'] = round(statistics.median(entry['runs']), 6)
+        entry['min_seconds'] = round(min(entry['runs']), 6)
+
+    for path in paths:
+        format_code, rating = parse_stats_filename(os.path.basename(path))
+
+        timing, document = time_stage(lambda: tiers.load_data_file(path), repeats)
+        add_timing('parse', timing)
+        if not document:
+            continue
+        usage_data = document.get('data', {})
+        info['species'] += len(usage_data)
+        info['spreads'] += sum(len(entry.get('Spreads', {})) for entry in usage_data.values())
+
+        species_names = [name for name in usage_data if name != "ALL Pokemon"]
+        timing, _ = time_stage(lambda: [tiers.fuzzy_match(name, tiers.pokedexEntries.keys()) for name in species_names],
+                               repeats)
+        add_timing('resolve_species', timing)
+
+        timing, speed_tiers_list = time_stage(lambda: tiers.calculate_speed_tiers(usage_data, format_code), repeats)
+        add_timing('calculate_speed_tiers', timing)
+        info['records'] += tiers.count_speed_tier_records(speed_tiers_list)
+
+        timing, _ = time_stage(lambda: tiers.filter_speed_tiers(speed_tiers_list, FILTER_MIN_USAGE, FILTER_TOP_N), repeats)
+        add_timing('filter_speed_tiers', timing)
+
+        for key in exporters:
+            _, exporter = tiers.EXPORTERS[key]
+            timing, result = time_stage(lambda: exporter(speed_tiers_list, format_code, rating, output_dir), repeats)
+            # 缺少可选依赖时导出函数返回None / Exporters return None when an optional dependency is missing
+            if result is None:
+                stages.setdefault(f"export_{key}", {'skipped': True})
+                continue
+            add_timing(f"export_{key}", timing)
+
+    return {'info': info, 'stages': stages}
+
+
+def compare_with_baseline(results, baseline, threshold, min_delta):
+    """与基线比较，返回回退列表 / Compare against the baseline, returning the list of regressions"""
+    regressions = []
+    for case_name, case in results['cases'].items():
+        baseline_case = baseline.get('cases', {}).get(case_name)
+        if not baseline_case:
+            continue
+        for stage, timing in case['stages'].items():
+            previous = baseline_case['stages'].get(stage)
+            if not previous or 'median_seconds' not in timing or 'median_seconds' not in previous:
+                continue
+            current, reference = timing['median_seconds'], previous['median_seconds']
+            ratio = current / reference if reference > 0 else float('inf')
+            timing['baseline_median_seconds'] = reference
+            timing['ratio'] = round(ratio, 3)
+            if ratio > 1 + threshold and current - reference > min_delta:
+                timing['regression'] = True
+                regressions.append((case_name, stage, reference, current, ratio))
+    return regressions
+
+
+def print_results(results):
+    """打印结果表 / Print the results table"""
+    for case_name, case in results['cases'].items():
+        info = case['info']
+        print(f"\n{case_name}: {len(info['files'])} file(s), {info['species']} Pokemon, "
+              f"{info['spreads']} spreads, {info['records']} records")
+        for stage, timing in case['stages'].items():
+            if timing.get('skipped'):
+                print(f"  {stage:<24} skipped")
+                continue
+            line = f"  {stage:<24} {timing['median_seconds'] * 1000:>10.2f} ms"
+            if 'ratio' in timing:
+                line += f"  x{timing['ratio']:.2f} vs baseline"
+            if timing.get('regression'):
+                line += "  REGRESSION"
+            print(line)
+
+
+def save_json(path, document):
+    """写入JSON文件 / Write a JSON file"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+
+
+def run_benchmarks(case_names=None, corpus_mode="sample", exporters=None, repeats=3):
+    """运行基准测试并返回结果文档 / Run the benchmarks and return the results document"""
+    exporters = exporters or list(tiers.EXPORTERS)
+    with redirect_stdout(io.StringIO()):
+        tiers.load_all_data()
+
+    work_dir = tempfile.mkdtemp(prefix="speed_tier_bench_")
+    try:
+        output_dir = os.path.join(work_dir, "output")
+        os.makedirs(output_dir)
+        cases = build_cases(corpus_mode, work_dir)
+        if case_names:
+            unknown = [name for name in case_names if name not in cases]
+            if unknown:
+                print(f"Warning: Unknown case(s): {', '.join(unknown)}")
+            cases = {name: paths for name, paths in cases.items() if name in case_names}
+
+        results = {
+            'version': BENCHMARK_VERSION,
+            'created': datetime.now().isoformat(timespec="seconds"),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeats': repeats,
+            'cases': {}
+        }
+        for case_name, paths in cases.items():
+            print(f"Running {case_name}...")
+            results['cases'][case_name] = run_case(paths, exporters, repeats, output_dir)
+        return results
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    """主函数 / Main function"""
+    parser = argparse.ArgumentParser(description="Benchmark parsing, tier computation, filtering and exporters")
+    parser.add_argument("--cases", nargs="+", help="Run only the named cases (default: all)")
+    parser.add_argument("--corpus", choices=["none", "sample", "all"], default="sample",
+                        help="Real stats cases: none/sample/all (default: sample)")
+    parser.add_argument("--exporters", nargs="+", choices=list(tiers.EXPORTERS),
+                        help="Benchmark only the named exporters (default: all)")
+    parser.add_argument("--repeats", "-r", type=int, default=3, help="Repeats per stage (default: 3)")
+    parser.add_argument("--output", "-o", default=DEFAULT_RESULTS_PATH, help="Results JSON file (default: benchmarks/results.json)")
+    parser.add_argument("--baseline", "-b", default=DEFAULT_BASELINE_PATH, help="Baseline JSON file (default: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Save this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed median slowdown versus baseline (default: 0.2)")
+    parser.add_argument("--min-delta", type=float, default=0.005, help="Ignore changes smaller than this many seconds (default: 0.005)")
+
+    args = parser.parse_args()
+
+    # 输出路径相对于调用目录，数据路径相对于仓库根目录 / Output paths are relative to the caller, data paths to the repository root
+    output_path = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.baseline)
+    os.chdir(REPOSITORY_ROOT)
+
+    results = run_benchmarks(args.cases, args.corpus, args.exporters, max(args.repeats, 1))
+
+    regressions = []
+    if not args.save_baseline and os.path.exists(baseline_path):
+        baseline = tiers.load_data_file(baseline_path) or {}
+        if baseline.get('version') != BENCHMARK_VERSION:
+            print(f"Warning: Baseline {baseline_path} has a different version, skipping comparison")
+        else:
+            regressions = compare_with_baseline(results, baseline, args.threshold, args.min_delta)
+            results['baseline'] = {'path': baseline_path, 'created': baseline.get('created'),
+                                   'threshold': args.threshold, 'min_delta': args.min_delta}
+    results['regressions'] = [
+        {'case': case_name, 'stage': stage, 'baseline_seconds': reference, 'current_seconds': current, 'ratio': round(ratio, 3)}
+        for case_name, stage, reference, current, ratio in regressions
+    ]
+
+    print_results(results)
+    save_json(output_path, results)
+    print(f"\nResults written: {output_path}")
+    if args.save_baseline:
+        save_json(baseline_path, results)
+        print(f"Baseline saved: {baseline_path}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}:")
+        for case_name, stage, reference, current, ratio in regressions:
+            print(f"  {case_name} {stage}: {reference * 1000:.2f} ms -> {current * 1000:.2f} ms (x{ratio:.2f})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Synthetic Chaos File Generator
+合成Smogon chaos统计文件生成器
+Generate Smogon-shaped chaos JSON files of configurable size for offline benchmarks
+
+用法 / Usage:
+python benchmarks/synthetic_chaos.py [options]
+
+例如 / Examples:
+python benchmarks/synthetic_chaos.py --species 500 --spreads 200 --teammates 100 -o /tmp/synthetic.json
+python benchmarks/synthetic_chaos.py --metagame gen9vgc2025regi --seed 7
+
+可选参数 / Optional Arguments:
+--species          宝可梦数量（默认: 300） / Number of Pokemon (default: 300)
+--spreads          每只宝可梦的配招数量（默认: 200） / Spreads per Pokemon (default: 200)
+--teammates        每只宝可梦的队友数量（默认: 100） / Teammates per Pokemon (default: 100)
+--metagame         写入info的格式代码，含vgc/bss时按50级计算（默认: gen9synthetic） / Format code written to info, vgc/bss means level 50 (default: gen9synthetic)
+--weight-levels    配招权重取0..N的整数，制造并列和恰好20%的情况 / Draw spread weights from integers 0..N to create ties and exact 20% splits
+--seed             随机种子，相同参数生成相同文件（默认: 0） / Random seed, same arguments produce the same file (default: 0)
+--output, -o       输出文件（默认: 标准输出） / Output file (default: stdout)
+
+宝可梦名称取自 stats/pokedex.json，因此生成的文件可以直接交给 calculate_speed_tiers。
+Pokemon names are taken from stats/pokedex.json so the generated files can be fed straight to calculate_speed_tiers.
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_ROOT)
+
+import export_speed_tiers as tiers
+
+# 所有性格 / All natures
+NATURES = ["Adamant", "Bashful", "Bold", "Brave", "Calm", "Careful", "Docile", "Gentle", "Hardy", "Hasty",
+           "Impish", "Jolly", "Lax", "Lonely", "Mild", "Modest", "Naive", "Naughty", "Quiet", "Quirky",
+           "Rash", "Relaxed", "Sassy", "Serious", "Timid"]
+
+# 常见的努力值模板，其余配招随机分配 / Common EV templates; remaining spreads are randomly allocated
+EV_TEMPLATES = [
+    (252, 252, 0, 0, 4, 0), (4, 252, 0, 0, 0, 252), (4, 0, 0, 252, 0, 252), (252, 0, 252, 0, 4, 0),
+    (252, 0, 4, 0, 252, 0), (244, 0, 12, 0, 252, 0), (0, 0, 0, 0, 0, 0), (252, 4, 0, 0, 0, 252)
+]
+
+MAX_TOTAL_EVS = 508
+MAX_STAT_EVS = 252
+
+
+def load_species_names():
+    """从图鉴读取宝可梦名称 / Read Pokemon names from the pokedex"""
+    pokedex = tiers.load_data_file(os.path.join(REPOSITORY_ROOT, tiers.DATA_DIRECTORY, "pokedex.json")) or {}
+    names = [entry['name'] for entry in pokedex.values() if entry.get('name') and entry.get('num', 0) > 0]
+    if not names:
+        print("Error: No Pokemon names found in pokedex.json")
+    return names
+
+
+def random_ev_spread(rng):
+    """随机生成一个合法的努力值分配（4的倍数，总和不超过508） / Generate a random legal EV spread (multiples of 4, total at most 508)"""
+    if rng.random() < 0.5:
+        return rng.choice(EV_TEMPLATES)
+    evs = [0] * 6
+    remaining = MAX_TOTAL_EVS // 4
+    for stat in rng.sample(range(6), 6):
+        points = rng.randint(0, min(remaining, MAX_STAT_EVS // 4))
+        evs[stat] = points * 4
+        remaining -= points
+    return tuple(evs)
+
+
+def generate_spreads(rng, count, weight_levels=None):
+    """生成配招及其权重 / Generate spreads with their weights
+
+    weight_levels 不为空时权重为0..weight_levels的整数 / When weight_levels is set, weights are integers 0..weight_levels
+    """
+    spreads = {}
+    # 有限的努力值组合下可能产生重复键，限制尝试次数 / Duplicate keys are possible, so bound the attempts
+    for _ in range(count * 4):
+        if len(spreads) >= count:
+            break
+        key = f"{rng.choice(NATURES)}:{'/'.join(map(str, random_ev_spread(rng)))}"
+        # 真实数据中存在权重为0的配招 / Real data contains zero-weight spreads
+        if weight_levels:
+            spreads[key] = float(rng.randint(0, weight_levels))
+        else:
+            spreads[key] = 0.0 if rng.random() < 0.05 else rng.paretovariate(1.2)
+    return spreads
+
+
+def generate_weighted_names(rng, names, count):
+    """生成名称 -> 权重的字典 / Generate a name -> weight dictionary"""
+    return {name: rng.paretovariate(1.5) for name in rng.sample(names, min(count, len(names)))}
+
+
+def generate_chaos_document(species_count=300, spreads_per_species=200, teammates=100, metagame="gen9synthetic",
+                            seed=0, species_names=None, weight_levels=None):
+    """生成一个chaos格式的统计文档 / Generate one chaos-format statistics document"""
+    rng = random.Random(seed)
+    names = species_names or load_species_names()
+    if not names:
+        return None
+
+    chosen = rng.sample(names, min(species_count, len(names)))
+    data = {}
+    for rank, name in enumerate(chosen):
+        raw_count = max(int(100000 / (rank + 1) ** 0.9), 1)
+        data[name] = {
+            'Raw count': raw_count,
+            'Viability Ceiling': [raw_count, rng.randint(60, 90), rng.randint(60, 90), rng.randint(50, 80)],
+            'Abilities': generate_weighted_names(rng, ["ability1", "ability2", "hiddenability"], 2),
+            'Items': generate_weighted_names(rng, [f"item{i}" for i in range(40)], 12),
+            'Spreads': generate_spreads(rng, spreads_per_species, weight_levels),
+            'Moves': generate_weighted_names(rng, [f"move{i}" for i in range(80)], 20),
+            'Tera Types': generate_weighted_names(rng, [f"type{i}" for i in range(18)], 8),
+            'Happiness': {'255': float(raw_count)},
+            'Teammates': generate_weighted_names(rng, chosen, teammates),
+            'Checks and Counters': {},
+            'usage': round(0.6 / (rank + 1) ** 0.8, 7)
+        }
+
+    return {
+        'info': {
+            'metagame': metagame,
+            'cutoff': 0.0,
+            'cutoff deviation': 0,
+            'team type': None,
+            'number of battles': 100000
+        },
+        'data': data
+    }
+
+
+def write_chaos_file(path, **options):
+    """生成并写入chaos文件，返回文档 / Generate and write a chaos file, returning the document"""
+    document = generate_chaos_document(**options)
+    if document is None:
+        return None
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f)
+    return document
+
+
+def main():
+    """主函数 / Main function"""
+    parser = argparse.ArgumentParser(description="Generate Smogon-shaped chaos JSON files for benchmarks")
+    parser.add_argument("--species", type=int, default=300, help="Number of Pokemon (default: 300)")
+    parser.add_argument("--spreads", type=int, default=200, help="Spreads per Pokemon (default: 200)")
+    parser.add_argument("--teammates", type=int, default=100, help="Teammates per Pokemon (default: 100)")
+    parser.add_argument("--metagame", default="gen9synthetic", help="Format code written to info (default: gen9synthetic)")
+    parser.add_argument("--weight-levels", type=int, help="Draw spread weights from integers 0..N")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--output", "-o", help="Output file (default: stdout)")
+
+    args = parser.parse_args()
+    options = dict(species_count=args.species, spreads_per_species=args.spreads, teammates=args.teammates,
+                   metagame=args.metagame, seed=args.seed, weight_levels=args.weight_levels)
+
+    if args.output:
+        document = write_chaos_file(args.output, **options)
+        if document is not None:
+            print(f"Wrote {len(document['data'])} Pokemon to {args.output}")
+    else:
+        document = generate_chaos_document(**options)
+        if document is not None:
+            json.dump(document, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Worker Memory Benchmark
+工作进程内存基准测试
+Compare per-worker memory of shared (mmap) reference data against per-worker loading
+
+用法 / Usage:
+python benchmarks/worker_memory.py [options]
+
+例如 / Examples:
+python benchmarks/worker_memory.py --workers 16
+python benchmarks/worker_memory.py --workers 8 --translate --page 2025-07-gen9ou-1500.json
+
+可选参数 / Optional Arguments:
+--workers, -w      同时存活的工作进程数（默认: 16） / Number of simultaneously alive workers (default: 16)
+--translate, -t    同时加载翻译数据 / Also load translations
+--page             每个工作进程生成的统计文件（默认: 最新月份中最小的文件） / Statistics file each worker renders (default: smallest file of the latest month)
+
+每种模式启动N个工作进程，使用站点生成器的初始化函数并生成一个页面，所有进程存活时读取
+/proc/self/smaps_rollup 的 RSS、PSS（按共享进程数分摊）和 USS（私有内存）。仅支持Linux。
+For each mode, N workers run the site builder's initializer and render one page; while all of them are alive each
+reads RSS, PSS (shared pages split between sharers) and USS (private memory) from /proc/self/smaps_rollup. Linux only.
+"""
+
+import os
+import io
+import sys
+import argparse
+import multiprocessing
+from contextlib import redirect_stdout
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_ROOT)
+
+import export_speed_tiers as tiers
+import build_site
+import shared_data
+
+
+def read_memory_kb():
+    """读取本进程的 RSS、PSS 和 USS（KB） / Read this process's RSS, PSS and USS (KB)"""
+    values = {}
+    with open("/proc/self/smaps_rollup", 'r') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':'):
+                values[parts[0][:-1]] = int(parts[1])
+    return {
+        'rss_kb': values.get('Rss', 0),
+        'pss_kb': values.get('Pss', 0),
+        'uss_kb': values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)
+    }
+
+
+def measure_worker(use_translation, shared_data_path, page, barrier, results):
+    """工作进程：初始化、生成一个页面、等所有进程就绪后测量内存 / Worker: initialize, render one page, measure memory once every worker is ready"""
+    with redirect_stdout(io.StringIO()):
+        build_site.init_site_worker(use_translation, None, shared_data_path)
+        build_site.render_site_page(*page)
+    barrier.wait()
+    results.put(read_memory_kb())
+    # 等待其他进程测量完成再退出，保持共享页面的分摊不变 / Wait until every worker has measured before exiting so PSS sharing stays constant
+    barrier.wait()
+
+
+def run_mode(workers, use_translation, page, use_shared_data):
+    """以一种模式运行并返回每个工作进程的内存 / Run one mode and return per-worker memory"""
+    shared_data_path = shared_data.create_shared_data_file(use_translation) if use_shared_data else None
+    barrier = multiprocessing.Barrier(workers)
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=measure_worker,
+                                         args=(use_translation, shared_data_path, page, barrier, results))
+                 for _ in range(workers)]
+    try:
+        for process in processes:
+            process.start()
+        measurements = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+    finally:
+        if shared_data_path:
+            os.remove(shared_data_path)
+    return measurements
+
+
+def find_page(filename):
+    """生成页面任务参数 / Build the page task arguments"""
+    if not filename:
+        month = tiers.get_latest_stats_month()
+        candidates = [name for name in os.listdir(tiers.DATA_DIRECTORY) if month and name.startswith(month + "-")]
+        if not candidates:
+            return None
+        filename = min(candidates, key=lambda name: os.path.getsize(tiers.build_data_path(name)))
+    parts = filename[:-len(".json")].split('-')
+    year_month = f"{parts[0]}-{parts[1]}"
+    return (parts[-2], parts[-1], tiers.build_data_path(filename), year_month, "speed-tiers.css", None, None)
+
+
+def main():
+    """主函数 / Main function"""
+    parser = argparse.ArgumentParser(description="Compare per-worker memory of shared and per-worker reference data")
+    parser.add_argument("--workers", "-w", type=int, default=16, help="Number of simultaneously alive workers (default: 16)")
+    parser.add_argument("--translate", "-t", action="store_true", help="Also load translations")
+    parser.add_argument("--page", help="Statistics file each worker renders (default: smallest file of the latest month)")
+
+    args = parser.parse_args()
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        print("Error: /proc/self/smaps_rollup is required (Linux only)")
+        sys.exit(1)
+    os.chdir(REPOSITORY_ROOT)
+    page = find_page(args.page)
+    if not page:
+        print("Error: No statistics files found")
+        sys.exit(1)
+    # 先编译数据包，避免工作进程各自重建 / Compile the data bundle first so workers do not each rebuild it
+    with redirect_stdout(io.StringIO()):
+        tiers.load_data_bundle()
+
+    print(f"{args.workers} workers rendering {os.path.basename(page[2])}")
+    print(f"{'mode':<10} {'RSS/worker':>12} {'PSS/worker':>12} {'USS/worker':>12} {'total PSS':>12}")
+    totals = {}
+    for mode, use_shared_data in (("per-worker", False), ("shared", True)):
+        measurements = run_mode(args.workers, args.translate, page, use_shared_data)
+        average = {key: sum(m[key] for m in measurements) / len(measurements) for key in measurements[0]}
+        totals[mode] = sum(m['pss_kb'] for m in measurements)
+        print(f"{mode:<10} {average['rss_kb'] / 1024:>9.1f} MB {average['pss_kb'] / 1024:>9.1f} MB "
+              f"{average['uss_kb'] / 1024:>9.1f} MB {totals[mode] / 1024:>9.1f} MB")
+    saved = totals['per-worker'] - totals['shared']
+    print(f"Shared data saves {saved / 1024:.1f} MB in total ({saved / args.workers:.0f} KB per worker)")
+
+
+if __name__ == "__main__":
+    main()
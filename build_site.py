@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Speed Tiers Static Site Builder
+速度线静态网站生成脚本
+Build a static site with speed tier pages for every format and rating
+
+用法 / Usage:
+python build_site.py [options]
+
+例如 / Examples:
+python build_site.py
+python build_site.py --output ./site --translate
+python build_site.py --month 2025-07 --top-n 100
+
+可选参数 / Optional Arguments:
+--output, -o       网站输出目录（默认: site） / Site output directory (default: site)
+--month, -m        统计月份 YYYY-MM（默认: 数据目录中最新的月份） / Statistics month YYYY-MM (default: latest month in data directory)
+--translate, -t    使用中文翻译宝可梦名称 / Use Chinese translation for Pokemon names
+--min-usage, -u    最小使用率过滤器 / Minimum usage rate filter
+--top-n, -n        只导出前N名使用率最高的宝可梦 / Export only top N Pokemon by usage rate
+--force, -f        忽略构建清单，重新生成所有页面 / Ignore build manifest and regenerate every page
+--workers, -w      并行生成页面的进程数（默认: 1） / Number of processes rendering pages in parallel (default: 1)
+--no-shared-data   工作进程各自加载数据，而不是映射共享的只读数据 / Workers load their own data instead of mapping shared read-only data
+--profile          将各阶段耗时、内存和条目数写入JSON文件 / Write per-stage timings, memory and item counts to a JSON file
+
+页面文件名固定为 <format>-<rating>.html，共享的样式表和图标表按内容哈希命名，
+构建清单记录每个页面的输入哈希，只重新生成输入或模板发生变化的页面。
+Page filenames are stable (<format>-<rating>.html) while the shared stylesheet and sprite sheet are
+content-hashed. The build manifest records each page's input hashes so only pages whose inputs or
+templates changed are regenerated.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import export_speed_tiers as tiers
+import atomic_files
+import pipeline_profiler as profiler
+import shared_data
+import stat_tables
+
+# 构建清单文件名和版本 / Build manifest file name and version
+SITE_MANIFEST_NAME = "site_manifest.json"
+SITE_MANIFEST_VERSION = 2
+
+# 共享资源子目录 / Shared asset subdirectory
+SITE_ASSET_DIRECTORY = "assets"
+
+# 模板源文件：内容变化时所有页面都需要重新生成 / Template sources: any change regenerates every page
+TEMPLATE_SOURCES = [os.path.relpath(tiers.__file__), os.path.relpath(stat_tables.__file__), os.path.relpath(__file__)]
+
+
+def hash_json(value):
+    """计算JSON可序列化值的稳定哈希 / Stable hash of a JSON-serializable value"""
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def load_site_manifest(output_dir):
+    """加载构建清单，版本不符时视为空清单 / Load build manifest, treating a version mismatch as empty"""
+    manifest_path = os.path.join(output_dir, SITE_MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == SITE_MANIFEST_VERSION:
+                return manifest
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable build manifest: {e}")
+    return {'version': SITE_MANIFEST_VERSION, 'files': {}, 'assets': {}, 'pages': {}, 'index': {}}
+
+
+def save_site_manifest(output_dir, manifest):
+    """原子地写入构建清单 / Atomically write the build manifest"""
+    manifest_path = os.path.join(output_dir, SITE_MANIFEST_NAME)
+    with atomic_files.atomic_write(manifest_path) as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+
+def write_text_if_changed(path, content):
+    """内容变化时才写入文件 / Write file only when its content changed"""
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
+
+
+def list_site_pages(year_month):
+    """列出指定月份所有格式和评级的页面 / List pages for every format and rating of the given month
+
+    返回 [(页面ID, 格式代码, 评级, 统计文件路径)] / Returns [(page id, format code, rating, stats file path)]
+    """
+    pages = []
+    for format_code, _ in tiers.get_available_formats():
+        for rating in tiers.get_available_ratings(format_code):
+            stats_path, _ = tiers.find_usage_data_file(format_code, rating, year_month)
+            if stats_path:
+                pages.append((f"{format_code}-{rating}", format_code, rating, stats_path))
+    return pages
+
+
+def get_shared_inputs(use_translation):
+    """所有页面共用的输入文件 / Input files shared by every page"""
+    inputs = [
+        tiers.build_data_path("pokedex.json"),
+        tiers.build_data_path("forms_index.json"),
+        tiers.build_data_path("meta_names.json"),
+        tiers.SPRITE_SHEET_PATH
+    ]
+    if use_translation:
+        inputs.append(tiers.TRANSLATION_PATH)
+    return [path for path in inputs if os.path.exists(path)]
+
+
+def write_shared_assets(output_dir, manifest):
+    """写入按内容哈希命名的共享图标表和样式表 / Write content-hashed shared sprite sheet and stylesheet
+
+    返回样式表相对于网站根目录的路径 / Returns the stylesheet path relative to the site root
+    """
+    asset_dir = os.path.join(output_dir, SITE_ASSET_DIRECTORY)
+    os.makedirs(asset_dir, exist_ok=True)
+
+    # 图标表 / Sprite sheet
+    sheet_fingerprint = manifest['files'][tiers.SPRITE_SHEET_PATH]
+    sheet_name = f"pokemonicons-sheet.{sheet_fingerprint['sha256'][:12]}.png"
+    sheet_path = os.path.join(asset_dir, sheet_name)
+    if not os.path.exists(sheet_path):
+        shutil.copyfile(tiers.SPRITE_SHEET_PATH, sheet_path)
+
+    # 样式表引用同目录下的图标表 / Stylesheet references the sprite sheet in the same directory
+    stylesheet = tiers.build_html_stylesheet(sheet_name)
+    stylesheet_name = f"speed-tiers.{hashlib.sha256(stylesheet.encode('utf-8')).hexdigest()[:12]}.css"
+    write_text_if_changed(os.path.join(asset_dir, stylesheet_name), stylesheet)
+
+    # 删除不再引用的旧资源 / Remove assets that are no longer referenced
+    current_assets = {'sprite_sheet': sheet_name, 'stylesheet': stylesheet_name}
+    for old_name in manifest['assets'].values():
+        if old_name not in current_assets.values():
+            old_path = os.path.join(asset_dir, old_name)
+            if os.path.exists(old_path):
+                os.remove(old_path)
+    manifest['assets'] = current_assets
+
+    return f"{SITE_ASSET_DIRECTORY}/{stylesheet_name}"
+
+
+def render_site_page(format_code, rating, stats_path, year_month, stylesheet_href, min_usage_filter, top_n_filter):
+    """生成单个格式/评级页面的HTML，失败时返回None / Render HTML for one format/rating page, or None on failure"""
+    with profiler.profile_stage("load_speed_tier_cache", page=f"{format_code}-{rating}") as stage:
+        all_speed_tiers = tiers.load_cached_speed_tiers(stats_path, format_code)
+        stage['items'] = tiers.count_speed_tier_records(all_speed_tiers)
+    if all_speed_tiers is None:
+        with profiler.profile_stage("load_stats_file", page=f"{format_code}-{rating}") as stage:
+            usage_document = tiers.load_usage_file(stats_path) or {}
+            usage_data = usage_document.get("data", {})
+            stage['items'] = len(usage_data)
+        all_speed_tiers = tiers.calculate_speed_tiers(usage_data, format_code)
+    speed_tiers_list = tiers.filter_speed_tiers(all_speed_tiers, min_usage_filter, top_n_filter)
+    if not speed_tiers_list:
+        return None
+
+    sprite_positions = {pokemon['name']: tiers.get_pokemon_sprite_info(pokemon['name'])
+                        for tier in speed_tiers_list for pokemon in tier['pokemon_list']}
+    # 页面内容只取决于输入，不写入生成时间 / Page content depends only on its inputs, no generation timestamp
+    return tiers.render_html_report(speed_tiers_list, format_code, rating, sprite_positions,
+                                    stylesheet=f'    <link rel="stylesheet" href="{stylesheet_href}">',
+                                    generated_label=f"Statistics: {year_month}")
+
+
+def render_site_index(pages, year_month, stylesheet_href):
+    """生成网站首页 / Render the site index page"""
+    ratings_by_format = {}
+    for page_id, format_code, rating, _ in pages:
+        ratings_by_format.setdefault(format_code, []).append((rating, page_id))
+
+    rows = ""
+    for format_code, display_name in tiers.get_available_formats():
+        if format_code not in ratings_by_format:
+            continue
+        links = " ".join(f'<a href="{page_id}.html">{rating}+</a>' for rating, page_id in ratings_by_format[format_code])
+        rows += f"""
+                    <tr class="pokemon-row">
+                        <td class="pokemon-name">{display_name}</td>
+                        <td style="font-family: monospace;">{format_code}</td>
+                        <td>{links}</td>
+                    </tr>"""
+
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Speed Tiers - {year_month}</title>
+    <link rel="stylesheet" href="{stylesheet_href}">
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>Speed Tiers</h1>
+            <p>Statistics: {year_month} - {len(ratings_by_format)} formats - {len(pages)} reports</p>
+        </div>
+
+        <div class="table-container">
+            <table>
+                <thead>
+                    <tr>
+                        <th>Format</th>
+                        <th>Code</th>
+                        <th>Ratings</th>
+                    </tr>
+                </thead>
+                <tbody>{rows}
+                </tbody>
+            </table>
+        </div>
+    </div>
+</body>
+</html>"""
+
+
+def init_site_worker(use_translation, profile_options, shared_data_path=None):
+    """工作进程初始化：映射共享数据，或加载图鉴等数据 / Worker process initializer: map the shared data, or load pokedex and other data
+
+    profile_options 为父进程的分析设置，None表示未启用 / profile_options mirrors the parent's profiling setup, None if disabled
+    """
+    if profile_options is not None:
+        profiler.start_profiling(**profile_options)
+    if not (shared_data_path and shared_data.attach_shared_data(shared_data_path)):
+        tiers.load_all_data(use_translation=use_translation)
+
+
+def render_site_page_task(task):
+    """工作进程中生成单个页面，同时回传分析记录 / Render a single page in a worker process, shipping profiling records back"""
+    return render_site_page(*task), profiler.take_stage_records()
+
+
+def iter_rendered_pages(render_tasks, workers, use_translation, use_shared_data=True):
+    """按顺序生成页面HTML，workers大于1时使用有界进程池 / Yield page HTML in order, using a bounded process pool when workers > 1
+
+    use_shared_data 时工作进程映射同一份只读数据文件 / With use_shared_data, workers map one read-only data file
+    """
+    if workers <= 1 or len(render_tasks) <= 1:
+        if render_tasks:
+            tiers.load_all_data(use_translation=use_translation)
+        for task in render_tasks:
+            yield render_site_page(*task)
+        return
+
+    profile_options = {'trace_memory': profiler.traceMemory} if profiler.profilingEnabled else None
+    shared_data_path = shared_data.create_shared_data_file(use_translation) if use_shared_data else None
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(render_tasks)), initializer=init_site_worker,
+                                 initargs=(use_translation, profile_options, shared_data_path)) as executor:
+            for html_content, stage_records in executor.map(render_site_page_task, render_tasks):
+                profiler.add_stage_records(stage_records)
+                yield html_content
+    finally:
+        if shared_data_path:
+            os.remove(shared_data_path)
+
+
+def build_site(output_dir="site", year_month=None, use_translation=False, min_usage_filter=None, top_n_filter=None,
+               force=False, only_pages=None, workers=1, use_shared_data=True):
+    """增量构建静态网站 / Incrementally build the static site
+
+    only_pages 限定只检查这些页面ID（其余页面保持不变） / only_pages restricts the check to these page ids (other pages are left as is)
+    workers 为并行生成页面的进程数 / workers is the number of processes rendering pages in parallel
+    use_shared_data 时工作进程映射共享的只读数据而不是各自加载 / With use_shared_data, workers map shared read-only data instead of loading their own
+    返回 {'built': [...], 'skipped': [...], 'failed': [...], 'removed': [...], 'index': bool} /
+    Returns {'built': [...], 'skipped': [...], 'failed': [...], 'removed': [...], 'index': bool}
+    """
+    year_month = year_month or tiers.get_latest_stats_month()
+    result = {'built': [], 'skipped': [], 'failed': [], 'removed': [], 'index': False}
+    if not year_month:
+        print("Error: No statistics files found")
+        return result
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_site_manifest(output_dir)
+    previous_files = manifest['files']
+    manifest['files'] = {}
+
+    # 显示名称决定首页排序，先加载格式名称 / Display names order the index, so load format names first
+    tiers.formatDisplayNames = tiers.load_format_names()
+    pages = list_site_pages(year_month)
+
+    # 计算共享输入和模板的指纹 / Fingerprint shared inputs and templates
+    shared_inputs = get_shared_inputs(use_translation)
+    for path in shared_inputs + TEMPLATE_SOURCES:
+        manifest['files'][path] = tiers.fingerprint_file(path, previous_files.get(path))
+    stylesheet_href = write_shared_assets(output_dir, manifest)
+    config_hash = hash_json({
+        'inputs': {path: info['sha256'] for path, info in manifest['files'].items()},
+        'options': [year_month, use_translation, min_usage_filter, top_n_filter],
+        'stylesheet': stylesheet_href
+    })
+
+    # 找出需要重新生成的页面 / Find pages that need regeneration
+    stale_pages = []
+    for page in pages:
+        page_id, _, _, stats_path = page
+        manifest['files'][stats_path] = tiers.fingerprint_file(stats_path, previous_files.get(stats_path))
+        entry = manifest['pages'].get(page_id, {})
+        # 生成失败的页面在输入变化前不再重试 / Failed pages are not retried until their inputs change
+        is_current = (entry.get('stats_sha256') == manifest['files'][stats_path]['sha256']
+                      and entry.get('config') == config_hash
+                      and (entry.get('failed') or os.path.exists(os.path.join(output_dir, f"{page_id}.html"))))
+        if only_pages is not None and page_id not in only_pages and page_id in manifest['pages']:
+            is_current = True
+        if is_current and not force:
+            result['skipped'].append(page_id)
+        else:
+            stale_pages.append(page)
+
+    # 只有存在需要生成的页面时才加载图鉴等数据 / Only load pokedex and other data when pages need rendering
+    render_tasks = [(format_code, rating, stats_path, year_month, stylesheet_href, min_usage_filter, top_n_filter)
+                    for _, format_code, rating, stats_path in stale_pages]
+    rendered_pages = iter_rendered_pages(render_tasks, workers, use_translation, use_shared_data)
+
+    for (page_id, _, _, stats_path), html_content in zip(stale_pages, rendered_pages):
+        if html_content is None:
+            print(f"Warning: No speed tier data for {page_id}, skipping")
+            # 删除旧页面，并记录失败及其输入，输入不变时跳过 / Remove the old page and record the failure with its inputs, skipped while they are unchanged
+            page_path = os.path.join(output_dir, f"{page_id}.html")
+            if os.path.exists(page_path):
+                os.remove(page_path)
+            manifest['pages'][page_id] = {
+                'inputs': [stats_path] + shared_inputs,
+                'stats_sha256': manifest['files'][stats_path]['sha256'],
+                'config': config_hash,
+                'failed': True
+            }
+            result['failed'].append(page_id)
+            continue
+
+        write_text_if_changed(os.path.join(output_dir, f"{page_id}.html"), html_content)
+        manifest['pages'][page_id] = {
+            # 页面到输入文件的依赖关系，供监视模式使用 / Page-to-input dependencies, used by watch mode
+            'inputs': [stats_path] + shared_inputs,
+            'stats_sha256': manifest['files'][stats_path]['sha256'],
+            'config': config_hash,
+            'sha256': hashlib.sha256(html_content.encode('utf-8')).hexdigest()
+        }
+        result['built'].append(page_id)
+        print(f"Built {page_id}.html")
+
+    # 删除不再存在的页面 / Remove pages whose stats no longer exist
+    current_page_ids = {page[0] for page in pages}
+    for page_id in list(manifest['pages']):
+        if page_id not in current_page_ids:
+            page_path = os.path.join(output_dir, f"{page_id}.html")
+            if os.path.exists(page_path):
+                os.remove(page_path)
+            del manifest['pages'][page_id]
+            result['removed'].append(page_id)
+
+    # 首页只列出生成成功的页面 / The index only lists pages that rendered
+    built_pages = [page for page in pages if page[0] in manifest['pages'] and not manifest['pages'][page[0]].get('failed')]
+    index_hash = hash_json({'config': config_hash, 'pages': [page[0] for page in built_pages]})
+    index_is_current = (manifest['index'].get('config') == index_hash
+                        and os.path.exists(os.path.join(output_dir, "index.html")))
+    if not index_is_current or force:
+        write_text_if_changed(os.path.join(output_dir, "index.html"),
+                              render_site_index(built_pages, year_month, stylesheet_href))
+        manifest['index'] = {'config': index_hash}
+        result['index'] = True
+
+    save_site_manifest(output_dir, manifest)
+    return result
+
+
+def main():
+    """主函数 / Main function"""
+    parser = argparse.ArgumentParser(description="Build a static speed tier site for every format and rating")
+    parser.add_argument("--output", "-o", default="site", help="Site output directory (default: site)")
+    parser.add_argument("--month", "-m", help="Statistics month YYYY-MM (default: latest month in data directory)")
+    parser.add_argument("--translate", "-t", action="store_true", help="Use Chinese translation for Pokemon names")
+    parser.add_argument("--min-usage", "-u", type=float, help="Minimum usage rate threshold (e.g., 0.01 for 1%%)")
+    parser.add_argument("--top-n", "-n", type=int, help="Export only top N Pokemon by usage rate")
+    parser.add_argument("--force", "-f", action="store_true", help="Ignore build manifest and regenerate every page")
+    parser.add_argument("--workers", "-w", type=int, default=1, help="Number of processes rendering pages in parallel (default: 1)")
+    parser.add_argument("--no-shared-data", action="store_true", help="Workers load their own data instead of mapping shared read-only data")
+
+    parser.add_argument("--profile", metavar="PATH", help="Write per-stage wall time, CPU time, peak memory and item counts as JSON")
+    parser.add_argument("--profile-memory", action="store_true", help="Also trace Python heap peaks per stage with tracemalloc (slower)")
+    parser.add_argument("--profile-pstats", metavar="PATH", help="Also write a cProfile/pstats dump of the main process (requires --profile)")
+
+    args = parser.parse_args()
+
+    if args.profile:
+        profiler.start_profiling(trace_memory=args.profile_memory, use_cprofile=bool(args.profile_pstats))
+    try:
+        result = build_site(args.output, args.month, args.translate, args.min_usage, args.top_n, args.force,
+                            workers=args.workers, use_shared_data=not args.no_shared_data)
+    finally:
+        if args.profile:
+            profiler.write_profile_metrics(args.profile, args.profile_pstats)
+    print(f"Site build finished: {len(result['built'])} built, {len(result['skipped'])} unchanged, "
+          f"{len(result['failed'])} failed, {len(result['removed'])} removed"
+          f"{', index rebuilt' if result['index'] else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,27 +21,106 @@ python export_speed_tiers.py gen9vgc2025regi 1630 --top-n 50
 --list-formats, -l 列出可用格式 / List available formats
 --min-usage, -u    最小使用率过滤器（例如：0.01 表示1%） / Minimum usage rate filter (e.g., 0.01 for 1%)
 --top-n, -n        只导出前N名使用率最高的宝可梦 / Export only top N Pokemon by usage rate
+--month, -m        指定统计月份 YYYY-MM / Specify statistics month YYYY-MM
+--interactive, -i  导出为可在浏览器内过滤的虚拟滚动HTML表格 / Export as virtualized HTML table filterable in the browser
+--excel            导出为Excel文件（未选择其他格式时的默认值） / Export as Excel file (default when no other format is selected)
+--parquet          导出为Parquet列式文件（需要pyarrow） / Export as columnar Parquet file (requires pyarrow)
+--arrow            导出为Arrow IPC流文件（需要pyarrow） / Export as Arrow IPC stream file (requires pyarrow)
+--csv              导出为CSV文件 / Export as CSV file
+--jsonl            导出为JSON Lines文件 / Export as JSON Lines file
+--all-stats        另外导出六项属性线到一个CSV文件 / Also export tiers of all six stats to one CSV file
+--profile          将各阶段耗时、内存和条目数写入JSON文件 / Write per-stage timings, memory and item counts to a JSON file
+--sprites          HTML图标来源：sheet/inline/sibling（需要Pillow裁剪图集） / HTML sprite source: sheet/inline/sibling (trimmed atlas requires Pillow)
 """
 
 import os
+import io
 import sys
+import csv
+import base64
+import json
 import math
 import re
 import difflib
+import hashlib
 from datetime import datetime
 import argparse
-import pandas as pd
-from openpyxl.styles import Font, Alignment, PatternFill
 import pyjson5
+import pipeline_profiler as profiler
+import atomic_files
+import stats_archive
+import stat_tables
 
 # 数据目录 / Data directory
 DATA_DIRECTORY = "stats"
 
+# 过去月份的压缩归档目录 / Directory of compressed archives of past months
+ARCHIVE_DIRECTORY = os.path.join(DATA_DIRECTORY, "archive")
+
+# 翻译文件 / Translation file
+TRANSLATION_PATH = "translate.json"
+
+# 预编译数据包：只包含导出需要的字段，源文件变化时自动重建 / Precompiled data bundle: only the fields the exporter needs, rebuilt when a source changes
+DATA_BUNDLE_NAME = "data_bundle.json"
+DATA_BUNDLE_VERSION = 3
+
+# 每个统计文件的未过滤速度线缓存和统计文件目录，由 update_all_data.py 生成 /
+# Per statistics file cache of unfiltered speed tiers and the statistics catalog, built by update_all_data.py
+SPEED_TIER_CACHE_DIRECTORY = os.path.join(DATA_DIRECTORY, "cache")
+# 速度线计算规则变化时需提高版本 / Bump when the speed tier calculation changes
+SPEED_TIER_CACHE_VERSION = 3
+CATALOG_NAME = "catalog.json"
+
+# meta_names.json 中保存格式名称解析缓存的保留键 / Reserved key in meta_names.json holding the format name resolution cache
+FORMAT_NAMES_CACHE_KEY = "_resolver"
+
+# 速度相关性格 / Speed-related natures
+SPEED_BOOST_NATURES = ["Timid", "Hasty", "Jolly", "Naive"]
+SPEED_NERF_NATURES = ["Brave", "Relaxed", "Quiet", "Sassy"]
+
+# 5级的小小杯格式 / Little Cup formats, played at level 5
+LITTLE_CUP_PATTERN = re.compile(r"^gen\d+(?:nationaldex|doubles)?lc")
+
+# Showdown ID中要去掉的字符 / Characters removed from Showdown IDs
+SHOWDOWN_ID_PATTERN = re.compile(r'[^a-z0-9]+')
+
+# 流式导出的列顺序和批大小 / Column order and batch size for streaming exporters
+RECORD_COLUMNS = ['format', 'rating', 'speed', 'pokemon', 'usage', 'nature',
+                  'speed_evs', 'base_speed', 'spread', 'speed_usage_ratio']
+EXPORT_BATCH_SIZE = 1024
+
+# 六项属性线导出的列顺序 / Column order of the six-stat tier export
+STAT_RECORD_COLUMNS = ['format', 'rating', 'stat', 'value', 'pokemon', 'usage', 'nature',
+                       'evs', 'base_stat', 'spread', 'value_usage_ratio']
+
+# 图标表布局 (每行12个sprite，每个sprite 40x30像素) / Sprite sheet layout (12 sprites per row, each sprite 40x30 pixels)
+SPRITE_SHEET_PATH = "pokemonicons-sheet.png"
+SPRITES_PER_ROW = 12
+SPRITE_WIDTH = 40
+SPRITE_HEIGHT = 30
+SPRITE_MODES = ['sheet', 'inline', 'sibling']
+
+# 交互式HTML表格的固定行高（像素），用于虚拟滚动 / Fixed row height (px) of the interactive HTML table, used for virtual scrolling
+INTERACTIVE_ROW_HEIGHT = 44
+
 # 全局变量存储数据 / Global variables for storing data
 formatDisplayNames = {}
 pokedexEntries = {}
 spriteIndex = {}
 translateNames = {}
+spriteSheetImage = None
+spriteCropCache = {}
+showdownIdCache = {}
+
+
+def count_speed_tier_records(speed_tiers_list):
+    """统计速度线中的宝可梦记录数 / Count Pokemon records in speed tiers"""
+    return sum(len(tier['pokemon_list']) for tier in speed_tiers_list or [])
+
+
+def count_exported_records(result, speed_tiers_list, *args, **kwargs):
+    """导出阶段的条目数 / Item count of an export stage"""
+    return count_speed_tier_records(speed_tiers_list)
 
 
 def load_data_file(filepath, mode='r', encoding="utf8"):
@@ -57,6 +136,36 @@ def build_data_path(filename):
     return os.path.join(DATA_DIRECTORY, filename)
 
 
+def load_format_names():
+    """读取格式显示名称，去掉解析缓存 / Read the format display names without the resolution cache"""
+    format_names = load_data_file(build_data_path("meta_names.json")) or {}
+    format_names.pop(FORMAT_NAMES_CACHE_KEY, None)
+    return format_names
+
+
+def list_stats_files():
+    """数据目录中的文件名，包括归档中的统计文件 / File names in the data directory, including archived statistics files"""
+    if not os.path.exists(DATA_DIRECTORY):
+        return []
+    return os.listdir(DATA_DIRECTORY) + stats_archive.list_archived_files(ARCHIVE_DIRECTORY)
+
+
+def locate_stats_file(filename):
+    """查找统计文件，不在数据目录时到所属月份的归档中查找 / Find a statistics file, looking in its month's archive when it is not in the data directory"""
+    file_path = build_data_path(filename)
+    if os.path.exists(file_path):
+        return file_path
+    return stats_archive.find_archived_file(ARCHIVE_DIRECTORY, filename)
+
+
+def load_usage_file(file_path):
+    """读取统计文件，支持归档中的文件 / Read a statistics file, including files inside a monthly archive"""
+    if stats_archive.split_member_path(file_path):
+        data = stats_archive.read_member(file_path)
+        return pyjson5.loads(data.decode('utf-8')) if data is not None else None
+    return load_data_file(file_path)
+
+
 def get_previous_year_month():
     """获取上个月的年份和月份 / Get previous month's year and month"""
     now = datetime.now()
@@ -68,15 +177,20 @@ def get_previous_year_month():
     return str(year), str(month).zfill(2)
 
 
-def fetch_pokemon_usage_data(format_code, rating_threshold):
-    """获取指定格式和评级的使用率数据 / Fetch usage data for specified format and rating"""
+def find_usage_data_file(format_code, rating_threshold, year_month=None):
+    """查找使用率数据文件 / Find usage data file
+    
+    year_month 为 "YYYY-MM"；未指定时使用上个月并回退到前一个月 /
+    year_month is "YYYY-MM"; when omitted, use last month and fall back to the month before
+    返回 (文件路径, 是否为过期数据)，找不到时返回 (None, False) / Returns (file path, is outdated), or (None, False) if not found
+    """
+    if year_month:
+        return locate_stats_file(f"{year_month}-{format_code}-{rating_threshold}.json"), False
+    
     year, month = get_previous_year_month()
-    file_name = f"{year}-{month}-{format_code}-{rating_threshold}.json"
-    file_path = build_data_path(file_name)
-    usage_data = load_data_file(file_path)
-
-    if usage_data:
-        return usage_data.get("data", {})
+    file_path = locate_stats_file(f"{year}-{month}-{format_code}-{rating_threshold}.json")
+    if file_path:
+        return file_path, False
     
     # 回退到前一个月 / Fallback to previous month
     previous_month = int(month) - 1
@@ -85,34 +199,106 @@ def fetch_pokemon_usage_data(format_code, rating_threshold):
         previous_month = 12
         previous_year -= 1
     prev_file_name = f"{previous_year}-{str(previous_month).zfill(2)}-{format_code}-{rating_threshold}.json"
-    prev_file_path = build_data_path(prev_file_name)
-    usage_data = load_data_file(prev_file_path)
+    prev_file_path = locate_stats_file(prev_file_name)
+    if prev_file_path:
+        return prev_file_path, True
+    return None, False
+
+
+def get_latest_stats_month():
+    """获取数据目录中最新的统计月份 "YYYY-MM" / Get latest statistics month "YYYY-MM" in the data directory"""
+    months = set()
+    for file in list_stats_files():
+        parts = file.split("-")
+        if len(parts) >= 4 and parts[0].isdigit() and parts[1].isdigit():
+            months.add(f"{parts[0]}-{parts[1]}")
+    return max(months) if months else None
+
+
+@profiler.profiled_stage(count=lambda result, *args, **kwargs: len(result))
+def fetch_pokemon_usage_data(format_code, rating_threshold, year_month=None):
+    """获取指定格式和评级的使用率数据 / Fetch usage data for specified format and rating"""
+    file_path, is_outdated = find_usage_data_file(format_code, rating_threshold, year_month)
+    if not file_path:
+        return {}
+    
+    usage_data = load_usage_file(file_path)
     if usage_data:
-        print("Warning: Using outdated statistics data")
+        if is_outdated:
+            print("Warning: Using outdated statistics data")
         return usage_data.get("data", {})
     return {}
 
 
+def to_showdown_id(name):
+    """转换为Showdown ID（只含小写字母和数字），如宝可梦、道具、招式和格式的ID / Convert to a Showdown ID (lowercase letters and digits only), as used for Pokemon, items, moves and formats"""
+    showdown_id = showdownIdCache.get(name)
+    if showdown_id is None:
+        showdown_id = showdownIdCache[name] = SHOWDOWN_ID_PATTERN.sub('', name.lower())
+    return showdown_id
+
+
 def fuzzy_match(target, options):
     """使用模糊匹配找到最相似的选项 / Use fuzzy matching to find most similar option"""
     normalized_options = {option.lower(): option for option in options}
+    # 完全相同的名称得分最高，无需逐个比较 / An identical name always scores highest, so skip scoring every option
+    if target.lower() in normalized_options:
+        return normalized_options[target.lower()]
     matches = difflib.get_close_matches(target.lower(), normalized_options.keys(), 10)
     return normalized_options[matches[0]] if matches else None
 
 
+def get_format_level(format_code):
+    """格式的等级：LC为5级，VGC/BSS为50级，其他为100级 / Level of a format: 5 for LC, 50 for VGC/BSS, 100 otherwise"""
+    if LITTLE_CUP_PATTERN.match(format_code.lower()):
+        return 5
+    return 50 if (("vgc" in format_code.lower()) or ("bss" in format_code.lower())) else 100
+
+
 def calculate_stat_value(base, iv, ev, level, multiplier):
     """计算非HP属性值 / Calculate non-HP stat value"""
     return math.floor((math.floor((2 * base + iv + math.floor(ev / 4)) * level / 100) + 5) * multiplier)
 
 
+def get_nature_speed_multiplier(nature):
+    """性格的速度倍率 / Speed multiplier of a nature"""
+    if nature in SPEED_BOOST_NATURES:
+        return 1.1
+    if nature in SPEED_NERF_NATURES:
+        return 0.9
+    return 1.0
+
+
+def get_pokemon_base_stats(pokemon_id, generation=stat_tables.LATEST_GENERATION):
+    """宝可梦在某世代的种族值（第一世代的特殊、之后世代修改前的值） / A Pokemon's base stats in a generation (generation 1 Special, values before later changes)"""
+    return stat_tables.get_generation_base_stats(pokemon_id, pokedexEntries[pokemon_id].get("baseStats", {}), generation)
+
+
+def calculate_spread_speed(spread, base_speed, level, generation=stat_tables.LATEST_GENERATION, nature_rows=None):
+    """查表计算一个配招（"性格:HP/攻/防/特攻/特防/速度"）的速度，返回 (速度, 性格, 速度努力值) /
+    Look up the speed of one spread ("Nature:HP/Atk/Def/SpA/SpD/Spe"), returning (speed, nature, speed EVs)
+
+    速度被降低且没有努力值时使用0个体；第一、二世代使用能力值和能力经验，见 stat_tables。
+    nature_rows 为同一只宝可梦的 {性格: 速度查找行} 缓存 /
+    Uses 0 IVs when Speed is lowered without EVs; generations 1 and 2 use DVs and stat experience, see stat_tables.
+    nature_rows is one Pokemon's {nature: speed lookup row} cache
+    """
+    nature, evs = spread.split(':')
+    speed_text = evs[evs.rfind('/') + 1:]  # 速度是最后一项 / Speed is the last stat
+    row = nature_rows.get(nature) if nature_rows is not None else None
+    if row is None:
+        row = stat_tables.get_nature_row('spe', base_speed, nature, generation, level)
+        if nature_rows is not None:
+            nature_rows[nature] = row
+    return stat_tables.lookup_stat(row, speed_text), nature, int(speed_text)
+
+
+@profiler.profiled_stage(count=lambda result, *args, **kwargs: count_speed_tier_records(result))
 def calculate_speed_tiers(usage_data, format_code="", min_usage_filter=None, top_n_filter=None):
     """计算速度线数据 / Calculate speed tier data"""
     speed_tiers = {}
-    level = 50 if (("vgc" in format_code.lower()) or ("bss" in format_code.lower())) else 100
-    
-    # 速度相关性格 / Speed-related natures
-    speed_boost_natures = ["Timid", "Hasty", "Jolly", "Naive"]
-    speed_nerf_natures = ["Brave", "Relaxed", "Quiet", "Sassy"]
+    level = get_format_level(format_code)
+    generation = stat_tables.get_format_generation(format_code)
     
     for pokemon_name, pokemon_data in usage_data.items():
         if pokemon_name == "ALL Pokemon":
@@ -123,7 +309,7 @@ def calculate_speed_tiers(usage_data, format_code="", min_usage_filter=None, top
         if not matched_name:
             continue
             
-        base_speed = pokedexEntries[matched_name]["baseStats"]["spe"]
+        base_speed = get_pokemon_base_stats(matched_name, generation)["spe"]
         spreads = pokemon_data.get("Spreads", {})
         
         if not spreads:
@@ -132,26 +318,10 @@ def calculate_speed_tiers(usage_data, format_code="", min_usage_filter=None, top
         # 计算所有配招的速度值并找到最常见的速度 / Calculate speed values for all spreads and find most common speeds
         speed_frequencies = {}
         total_spread_usage = sum(spreads.values())
+        nature_rows = {}
         
         for spread, spread_usage in spreads.items():
-            parts = spread.split(':')
-            nature = parts[0]
-            evs = list(map(int, parts[1].split('/')))
-            speed_evs = evs[5]  # 速度是第6个属性值(索引5) / Speed is the 6th stat (index 5)
-            
-            # 基于性格计算速度倍率 / Calculate speed multiplier based on nature
-            if nature in speed_boost_natures:
-                multiplier = 1.1
-            elif nature in speed_nerf_natures:
-                multiplier = 0.9
-            else:
-                multiplier = 1.0
-                
-            # 如果速度被降低且没有努力值则使用0个体，否则使用31个体 / Use 0 IV if speed is hindered and no EVs, otherwise use 31 IV
-            speed_iv = 0 if (multiplier == 0.9 and speed_evs == 0) else 31
-            
-            # 计算最终速度值 / Calculate final speed value
-            speed_value = calculate_stat_value(base_speed, speed_iv, speed_evs, level, multiplier)
+            speed_value, nature, speed_evs = calculate_spread_speed(spread, base_speed, level, generation, nature_rows)
             
             # 记录速度频率和配招细节 / Record speed frequency and spread details
             if speed_value not in speed_frequencies:
@@ -171,45 +341,61 @@ def calculate_speed_tiers(usage_data, format_code="", min_usage_filter=None, top
         # 确定该宝可梦要包含哪些速度 / Determine which speeds to include for this Pokemon
         if speed_frequencies:
             usage_weight = pokemon_data.get("usage", 0)
-            
-            # 计算每个速度的百分比 / Calculate percentage for each speed
-            speeds_with_percentages = []
-            for speed_value, speed_data in speed_frequencies.items():
-                percentage = (speed_data['total_usage'] / total_spread_usage) * 100
-                speeds_with_percentages.append((speed_value, speed_data, percentage))
-            
-            # 找到使用率>20%的速度 / Find speeds with usage > 20%
-            high_usage_speeds = [(speed, data, perc) for speed, data, perc in speeds_with_percentages if perc > 20]
-            
-            # 如果多个速度使用率>20%则全部包含，否则只包含最常见的速度 / If multiple speeds > 20% usage include all, otherwise include only most common
-            if len(high_usage_speeds) > 1:
-                speeds_to_include = high_usage_speeds
-            else:
-                # 只包含最常见的速度 / Include only most common speed
-                most_common_speed = max(speed_frequencies.keys(), key=lambda x: speed_frequencies[x]['total_usage'])
-                most_common_data = speed_frequencies[most_common_speed]
-                most_common_percentage = (most_common_data['total_usage'] / total_spread_usage) * 100
-                speeds_to_include = [(most_common_speed, most_common_data, most_common_percentage)]
-            
-            # 将每个选定的速度添加到速度线中 / Add each selected speed to speed tiers
-            for speed_value, speed_data, speed_percentage in speeds_to_include:
-                # 找到实现该速度的最常见配招 / Find most common spread that achieves this speed
-                most_common_spread_for_speed = max(speed_data['spreads'], key=lambda x: x['usage'])
-                
+            for speed_value, spread_entry, speed_usage_ratio in select_species_speeds(speed_frequencies, total_spread_usage):
                 # 存储到速度线中 / Store in speed tiers
                 if speed_value not in speed_tiers:
                     speed_tiers[speed_value] = []
-                    
-                speed_tiers[speed_value].append({
-                    'name': pokemon_name,
-                    'usage': usage_weight,
-                    'spread': most_common_spread_for_speed['spread'],
-                    'base_speed': base_speed,
-                    'nature': most_common_spread_for_speed['nature'],
-                    'speed_evs': most_common_spread_for_speed['speed_evs'],
-                    'speed_usage_ratio': speed_percentage / 100
-                })
+                speed_tiers[speed_value].append(
+                    build_tier_entry(pokemon_name, usage_weight, base_speed, spread_entry, speed_usage_ratio))
+    
+    return filter_speed_tiers(sort_speed_tiers(speed_tiers), min_usage_filter, top_n_filter)
+
+
+def select_species_speeds(speed_frequencies, total_spread_usage):
+    """选出一只宝可梦列入速度线的速度，返回 [(速度, 最常见配招, 速度占比)] / Pick the speeds one Pokemon is listed at, returning [(speed, most common spread, speed share)]
+
+    speed_frequencies 为 {速度: {'total_usage', 'spreads': [{'spread', 'nature', 'speed_evs', 'usage'}]}} /
+    speed_frequencies is {speed: {'total_usage', 'spreads': [{'spread', 'nature', 'speed_evs', 'usage'}]}}
+    """
+    # 计算每个速度的百分比 / Calculate percentage for each speed
+    speeds_with_percentages = []
+    for speed_value, speed_data in speed_frequencies.items():
+        percentage = (speed_data['total_usage'] / total_spread_usage) * 100
+        speeds_with_percentages.append((speed_value, speed_data, percentage))
     
+    # 找到使用率>20%的速度 / Find speeds with usage > 20%
+    high_usage_speeds = [(speed, data, perc) for speed, data, perc in speeds_with_percentages if perc > 20]
+    
+    # 如果多个速度使用率>20%则全部包含，否则只包含最常见的速度 / If multiple speeds > 20% usage include all, otherwise include only most common
+    if len(high_usage_speeds) > 1:
+        speeds_to_include = high_usage_speeds
+    else:
+        # 只包含最常见的速度 / Include only most common speed
+        most_common_speed = max(speed_frequencies.keys(), key=lambda x: speed_frequencies[x]['total_usage'])
+        most_common_data = speed_frequencies[most_common_speed]
+        most_common_percentage = (most_common_data['total_usage'] / total_spread_usage) * 100
+        speeds_to_include = [(most_common_speed, most_common_data, most_common_percentage)]
+    
+    # 找到实现每个速度的最常见配招 / Find the most common spread that achieves each speed
+    return [(speed_value, max(speed_data['spreads'], key=lambda x: x['usage']), speed_percentage / 100)
+            for speed_value, speed_data, speed_percentage in speeds_to_include]
+
+
+def build_tier_entry(pokemon_name, usage_weight, base_speed, spread_entry, speed_usage_ratio):
+    """速度线中一只宝可梦的条目 / One Pokemon's entry in a speed tier"""
+    return {
+        'name': pokemon_name,
+        'usage': usage_weight,
+        'spread': spread_entry['spread'],
+        'base_speed': base_speed,
+        'nature': spread_entry['nature'],
+        'speed_evs': spread_entry['speed_evs'],
+        'speed_usage_ratio': speed_usage_ratio
+    }
+
+
+def sort_speed_tiers(speed_tiers, value_key='speed'):
+    """把 {速度: [条目]} 转换为按速度降序的速度线列表（value_key 为属性线的数值键） / Convert {speed: [entries]} into a speed tier list, fastest first (value_key is a stat tier's value key)"""
     # 在每个速度线内按使用率排序 / Sort by usage within each speed tier
     for speed_value in speed_tiers:
         speed_tiers[speed_value].sort(key=lambda x: x['usage'], reverse=True)
@@ -220,18 +406,73 @@ def calculate_speed_tiers(usage_data, format_code="", min_usage_filter=None, top
         tier_pokemon = speed_tiers[speed_value]
         
         sorted_speed_tiers.append({
-            'speed': speed_value,
+            value_key: speed_value,
             'pokemon_list': tier_pokemon,
             'total_usage': sum(p['usage'] for p in tier_pokemon)
         })
     
+    return sorted_speed_tiers
+
+
+@profiler.profiled_stage(count=lambda result, *args, **kwargs: sum(count_speed_tier_records(t) for t in result.values()))
+def calculate_stat_tiers(usage_data, format_code=""):
+    """一次遍历所有配招，计算六项属性的属性线 {属性: 属性线列表} / Calculate tiers of all six stats in one pass over the spreads {stat: tier list}
+
+    每项属性的选取规则与速度线相同；条目为 name、usage、spread、base_stat、nature、evs、value_usage_ratio，
+    属性线的数值键为 'value' / Each stat is selected with the same rules as speed tiers; entries hold name, usage, spread,
+    base_stat, nature, evs and value_usage_ratio, and tiers are keyed by 'value'
+    """
+    stat_tiers = {stat: {} for stat in stat_tables.STAT_KEYS}
+    level = get_format_level(format_code)
+    generation = stat_tables.get_format_generation(format_code)
+
+    for pokemon_name, pokemon_data in usage_data.items():
+        if pokemon_name == "ALL Pokemon":
+            continue
+        matched_name = fuzzy_match(pokemon_name, pokedexEntries.keys())
+        base_stats = get_pokemon_base_stats(matched_name, generation) if matched_name else {}
+        spreads = pokemon_data.get("Spreads", {})
+        if len(base_stats) < len(stat_tables.STAT_KEYS) or not spreads:
+            continue
+
+        # 每项属性的 {属性值: 频率}，与速度线的 speed_frequencies 形状相同 / Per stat {value: frequency}, shaped like speed tiers' speed_frequencies
+        frequencies = [{} for _ in stat_tables.STAT_KEYS]
+        total_spread_usage = sum(spreads.values())
+        nature_rows = {}
+        for spread, spread_usage in spreads.items():
+            values, nature, evs = stat_tables.calculate_spread_stats(spread, base_stats, generation, level, nature_rows)
+            for index, value in enumerate(values):
+                value_data = frequencies[index].get(value)
+                if value_data is None:
+                    value_data = frequencies[index][value] = {'total_usage': 0, 'spreads': []}
+                value_data['total_usage'] += spread_usage
+                value_data['spreads'].append({'spread': spread, 'nature': nature, 'evs': evs[index], 'usage': spread_usage})
+
+        usage_weight = pokemon_data.get("usage", 0)
+        for index, stat in enumerate(stat_tables.STAT_KEYS):
+            for value, spread_entry, value_usage_ratio in select_species_speeds(frequencies[index], total_spread_usage):
+                stat_tiers[stat].setdefault(value, []).append({
+                    'name': pokemon_name,
+                    'usage': usage_weight,
+                    'spread': spread_entry['spread'],
+                    'base_stat': stat_tables.get_base_stat(base_stats, stat, generation),
+                    'nature': spread_entry['nature'],
+                    'evs': int(spread_entry['evs']),
+                    'value_usage_ratio': value_usage_ratio
+                })
+
+    return {stat: sort_speed_tiers(tiers, 'value') for stat, tiers in stat_tiers.items()}
+
+
+def filter_speed_tiers(sorted_speed_tiers, min_usage_filter=None, top_n_filter=None, value_key='speed'):
+    """按最小使用率和前N名过滤速度线（value_key 为属性线的数值键） / Filter speed tiers by minimum usage and top N (value_key is a stat tier's value key)"""
     # 应用过滤条件 / Apply filters
     if min_usage_filter is not None or top_n_filter is not None:
         # 收集所有宝可梦记录用于过滤 / Collect all Pokemon records for filtering
         all_pokemon_records = []
         for tier in sorted_speed_tiers:
             for pokemon in tier['pokemon_list']:
-                all_pokemon_records.append((pokemon, tier['speed']))
+                all_pokemon_records.append((pokemon, tier[value_key]))
         
         # 按使用率排序 / Sort by usage rate
         all_pokemon_records.sort(key=lambda x: x[0]['usage'], reverse=True)
@@ -259,7 +500,7 @@ def calculate_speed_tiers(usage_data, format_code="", min_usage_filter=None, top
             tier_pokemon = filtered_speed_tiers[speed_value]
             
             sorted_speed_tiers.append({
-                'speed': speed_value,
+                value_key: speed_value,
                 'pokemon_list': tier_pokemon,
                 'total_usage': sum(p['usage'] for p in tier_pokemon)
             })
@@ -267,23 +508,174 @@ def calculate_speed_tiers(usage_data, format_code="", min_usage_filter=None, top
     return sorted_speed_tiers
 
 
+def fingerprint_file(path, previous=None):
+    """计算文件指纹，大小和修改时间未变时复用上次的哈希 / Fingerprint a file, reusing the previous hash when size and mtime are unchanged"""
+    if stats_archive.split_member_path(path):
+        return stats_archive.fingerprint_member(path)
+    stat = os.stat(path)
+    if previous and previous.get('size') == stat.st_size and previous.get('mtime_ns') == stat.st_mtime_ns:
+        return previous
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return {'sha256': digest.hexdigest(), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def get_data_bundle_sources():
+    """数据包的源文件 / Source files of the data bundle"""
+    return [build_data_path("meta_names.json"), build_data_path("pokedex.json"),
+            build_data_path("forms_index.json"), TRANSLATION_PATH]
+
+
+def fingerprint_bundle_sources(previous_sources=None):
+    """计算所有源文件的指纹，不存在的文件记为None / Fingerprint every source file, recording missing files as None"""
+    previous_sources = previous_sources or {}
+    return {path: fingerprint_file(path, previous_sources.get(path)) if os.path.exists(path) else None
+            for path in get_data_bundle_sources()}
+
+
+def compile_data_bundle():
+    """从源文件编译数据包并写入数据目录 / Compile the data bundle from the source files and write it to the data directory
+
+    返回数据包；写入失败时仍返回编译结果 / Returns the bundle, even when it could not be written
+    """
+    # 先记录指纹再读取，读取期间的修改会让数据包在下次加载时重建 / Fingerprint before reading so changes made meanwhile trigger a rebuild on next load
+    sources = fingerprint_bundle_sources()
+    bundle_pokedex = {}
+    for pokemon_id, entry in (load_data_file(build_data_path("pokedex.json")) or {}).items():
+        # 保留所有ID（模糊匹配的候选项），只保留编号、名称和六项种族值 / Keep every id (fuzzy match candidates) but only the number, name and six base stats
+        bundle_entry = {}
+        if "num" in entry:
+            bundle_entry["num"] = entry["num"]
+        if "name" in entry:
+            bundle_entry["name"] = entry["name"]
+        base_stats = {stat: entry["baseStats"][stat] for stat in stat_tables.STAT_KEYS if stat in entry.get("baseStats", {})}
+        if base_stats:
+            bundle_entry["baseStats"] = base_stats
+        bundle_pokedex[pokemon_id] = bundle_entry
+
+    bundle = {
+        'version': DATA_BUNDLE_VERSION,
+        'sources': sources,
+        'format_names': load_format_names(),
+        'pokedex': bundle_pokedex,
+        'sprite_index': load_data_file(build_data_path("forms_index.json")) or {},
+        'translations': load_data_file(TRANSLATION_PATH) or {}
+    }
+
+    bundle_path = build_data_path(DATA_BUNDLE_NAME)
+    try:
+        os.makedirs(DATA_DIRECTORY, exist_ok=True)
+        with atomic_files.atomic_write(bundle_path) as f:
+            json.dump(bundle, f, ensure_ascii=False, separators=(',', ':'))
+    except OSError as e:
+        print(f"Warning: Unable to write data bundle: {e}")
+    return bundle
+
+
+def load_data_bundle():
+    """加载数据包，缺失、版本不符或源文件变化时重新编译 / Load the data bundle, recompiling when missing, of another version or stale"""
+    bundle_path = build_data_path(DATA_BUNDLE_NAME)
+    bundle = None
+    if os.path.exists(bundle_path):
+        try:
+            with open(bundle_path, 'r', encoding='utf-8') as f:
+                bundle = json.load(f)
+        except (OSError, ValueError):
+            bundle = None
+
+    if bundle and bundle.get('version') == DATA_BUNDLE_VERSION:
+        recorded = bundle.get('sources', {})
+        current = fingerprint_bundle_sources(recorded)
+        if all((current[path] or {}).get('sha256') == (recorded.get(path) or {}).get('sha256') for path in current):
+            return bundle
+
+    print("Compiling data bundle...")
+    return compile_data_bundle()
+
+
+def get_speed_tier_cache_path(stats_path):
+    """统计文件对应的速度线缓存路径（归档中的文件同样适用） / Speed tier cache path of a statistics file (archived files included)"""
+    name = os.path.basename(stats_path)
+    return os.path.join(SPEED_TIER_CACHE_DIRECTORY, name[:-len(".json")] + ".tiers.json")
+
+
+def load_cached_speed_tiers(stats_path, format_code):
+    """读取未过滤的速度线缓存，缺失、版本不符或统计文件、图鉴变化时返回None /
+    Read the cached unfiltered speed tiers, or None when missing, of another version, or the statistics file or pokedex changed
+    """
+    cache = load_data_file(get_speed_tier_cache_path(stats_path))
+    if not cache or cache.get('version') != SPEED_TIER_CACHE_VERSION or cache.get('format') != format_code:
+        return None
+    pokedex_path = build_data_path("pokedex.json")
+    if not (os.path.exists(stats_path) or stats_archive.split_member_path(stats_path)) or not os.path.exists(pokedex_path):
+        return None
+    # 大小和修改时间未变时只需stat / Only a stat is needed when size and mtime are unchanged
+    if fingerprint_file(stats_path, cache['source'])['sha256'] != cache['source']['sha256']:
+        return None
+    if fingerprint_file(pokedex_path, cache['pokedex'])['sha256'] != cache['pokedex']['sha256']:
+        return None
+    return cache['speed_tiers']
+
+
+def build_speed_tier_cache(stats_path, format_code):
+    """解析统计文件，计算未过滤的速度线并写入缓存 / Parse a statistics file, calculate its unfiltered speed tiers and write the cache
+
+    返回 (速度线, 目录条目)，文件没有数据时返回 (None, None) / Returns (speed tiers, catalog entry), or (None, None) when the file has no data
+    """
+    # 先记录指纹再读取，读取期间的修改会让缓存在下次使用时失效 / Fingerprint before reading so changes made meanwhile invalidate the cache
+    source = fingerprint_file(stats_path)
+    pokedex = fingerprint_file(build_data_path("pokedex.json"))
+    usage_document = load_usage_file(stats_path) or {}
+    usage_data = usage_document.get("data", {})
+    if not usage_data:
+        return None, None
+    speed_tiers_list = calculate_speed_tiers(usage_data, format_code)
+
+    cache_path = get_speed_tier_cache_path(stats_path)
+    try:
+        os.makedirs(SPEED_TIER_CACHE_DIRECTORY, exist_ok=True)
+        with atomic_files.atomic_write(cache_path) as f:
+            json.dump({'version': SPEED_TIER_CACHE_VERSION, 'format': format_code, 'source': source, 'pokedex': pokedex,
+                       'speed_tiers': speed_tiers_list}, f, ensure_ascii=False, separators=(',', ':'))
+    except OSError as e:
+        print(f"Warning: Unable to write speed tier cache: {e}")
+
+    parts = os.path.basename(stats_path)[:-len(".json")].split("-")
+    catalog_entry = {
+        'month': f"{parts[0]}-{parts[1]}",
+        'format': format_code,
+        'rating': parts[-1],
+        'sha256': source['sha256'],
+        'pokemon': len(usage_data),
+        'battles': usage_document.get("info", {}).get("number of battles"),
+        'speed_tiers': len(speed_tiers_list),
+        'records': count_speed_tier_records(speed_tiers_list)
+    }
+    return speed_tiers_list, catalog_entry
+
+
+@profiler.profiled_stage(count=lambda result, *args, **kwargs: len(pokedexEntries))
 def load_all_data(use_translation=False):
-    """加载所有必要的数据文件 / Load all necessary data files"""
-    global formatDisplayNames, pokedexEntries, translateNames
-    
-    # 加载格式显示名称 / Load format display names
-    formatDisplayNames = load_data_file(build_data_path("meta_names.json")) or {}
-    
-    # 加载宝可梦图鉴数据 / Load Pokemon pokedex data
-    pokedexEntries = load_data_file(build_data_path("pokedex.json")) or {}
-    
-    # 如果需要翻译则加载翻译文件 / Load translation file if needed
+    """加载所有必要的数据（来自预编译数据包） / Load all necessary data (from the precompiled data bundle)"""
+    global formatDisplayNames, pokedexEntries, spriteIndex, translateNames
+
+    bundle = load_data_bundle()
+
+    # 格式显示名称、宝可梦图鉴数据和图标索引 / Format display names, Pokemon pokedex data and sprite index
+    formatDisplayNames = bundle['format_names']
+    pokedexEntries = bundle['pokedex']
+    spriteIndex = bundle['sprite_index']
+
+    # 如果需要翻译则使用翻译数据 / Use translations if needed
     if use_translation:
-        translateNames = load_data_file("translate.json") or {}
+        translateNames = bundle['translations']
         print(f"Loaded {len(translateNames)} Pokemon translations")
     else:
         translateNames = {}
-    
+
     print(f"Loaded {len(formatDisplayNames)} format names")
     print(f"Loaded {len(pokedexEntries)} Pokemon data")
 
@@ -295,56 +687,143 @@ def translate_pokemon_name(pokemon_name):
     return pokemon_name
 
 
-def get_pokemon_sprite_info(pokemon_name):
-    """获取宝可梦图标信息，使用与app.py相同的逻辑 / Get Pokemon sprite info using same logic as app.py"""
+def get_pokemon_sprite_number(pokemon_name):
+    """获取宝可梦在图标表中的编号 / Get Pokemon's index in the sprite sheet"""
     # 加载图标索引（如果还未加载） / Load sprite index (if not already loaded)
     global spriteIndex
     if not spriteIndex:
         spriteIndex = load_data_file(build_data_path("forms_index.json")) or {}
     
     if pokemon_name == "ALL Pokemon":
-        return {'x': 0, 'y': 0, 'w': 40, 'h': 30}
+        return 0
     
     # 标准化宝可梦名称（与app.py中get_pokemon_sprite函数相同） / Normalize Pokemon name (same as get_pokemon_sprite function in app.py)
-    word = pokemon_name.lower()
-    word = re.sub(r'[^a-z0-9]+', '', word)
+    word = to_showdown_id(pokemon_name)
     
     sprite_num = 0
     if word in spriteIndex.keys():
         sprite_num = spriteIndex[word]
     elif word in pokedexEntries.keys():
         sprite_num = pokedexEntries[word].get("num", 0)
+    return sprite_num
+
+
+def get_pokemon_sprite_info(pokemon_name):
+    """获取宝可梦图标信息，使用与app.py相同的逻辑 / Get Pokemon sprite info using same logic as app.py"""
+    sprite_num = get_pokemon_sprite_number(pokemon_name)
     
     # 计算sprite坐标 (每行12个sprite，每个sprite 40x30像素) / Calculate sprite coordinates (12 sprites per row, each sprite 40x30 pixels)
-    row, col = divmod(sprite_num, 12)
-    x = col * 40
-    y = row * 30
+    row, col = divmod(sprite_num, SPRITES_PER_ROW)
+    x = col * SPRITE_WIDTH
+    y = row * SPRITE_HEIGHT
     
-    return {'x': x, 'y': y, 'w': 40, 'h': 30}
+    return {'x': x, 'y': y, 'w': SPRITE_WIDTH, 'h': SPRITE_HEIGHT}
 
 
-def export_to_html(speed_tiers_list, format_code, rating_threshold, output_dir="."):
-    """导出速度线数据到美化的HTML表格文件 / Export speed tier data to beautiful HTML table file"""
-    if not speed_tiers_list:
-        print("Error: No speed tier data to export")
-        return None
+def load_sprite_sheet_image():
+    """加载并缓存解码后的图标表，图标表更新后自动失效 / Load and cache the decoded sprite sheet, invalidated when the sheet changes"""
+    global spriteSheetImage, spriteCropCache
+    from PIL import Image
     
-    # 生成文件名 / Generate filename
+    stat = os.stat(SPRITE_SHEET_PATH)
+    cache_key = (stat.st_mtime_ns, stat.st_size)
+    if spriteSheetImage is None or spriteSheetImage[0] != cache_key:
+        with Image.open(SPRITE_SHEET_PATH) as sheet:
+            spriteSheetImage = (cache_key, sheet.convert("RGBA"))
+        spriteCropCache = {}
+    return spriteSheetImage[1]
+
+
+def crop_pokemon_sprite(sprite_num):
+    """裁剪单个图标，结果按图标编号跨报告缓存 / Crop a single sprite, cached per sprite number across reports"""
+    sheet = load_sprite_sheet_image()
+    if sprite_num not in spriteCropCache:
+        row, col = divmod(sprite_num, SPRITES_PER_ROW)
+        box = (col * SPRITE_WIDTH, row * SPRITE_HEIGHT, (col + 1) * SPRITE_WIDTH, (row + 1) * SPRITE_HEIGHT)
+        spriteCropCache[sprite_num] = sheet.crop(box)
+    return spriteCropCache[sprite_num]
+
+
+def build_sprite_atlas(pokemon_names):
+    """只用报告中出现的图标构建紧凑图集 / Build a compact atlas containing only the sprites used by a report
+    
+    返回 (PNG字节, {宝可梦名称: 图集中的坐标}) / Returns (PNG bytes, {pokemon name: position in the atlas})
+    """
+    from PIL import Image
+    
+    # 同一图标只放一次 / Each distinct sprite is placed once
+    atlas_slots = {}
+    name_slots = {}
+    for name in pokemon_names:
+        sprite_num = get_pokemon_sprite_number(name)
+        name_slots[name] = atlas_slots.setdefault(sprite_num, len(atlas_slots))
+    
+    columns = max(1, min(len(atlas_slots), SPRITES_PER_ROW))
+    rows = max(1, math.ceil(len(atlas_slots) / columns))
+    atlas = Image.new("RGBA", (columns * SPRITE_WIDTH, rows * SPRITE_HEIGHT), (0, 0, 0, 0))
+    for sprite_num, slot in atlas_slots.items():
+        row, col = divmod(slot, columns)
+        atlas.paste(crop_pokemon_sprite(sprite_num), (col * SPRITE_WIDTH, row * SPRITE_HEIGHT))
+    
+    buffer = io.BytesIO()
+    atlas.save(buffer, format="PNG", optimize=True)
+    
+    positions = {}
+    for name, slot in name_slots.items():
+        row, col = divmod(slot, columns)
+        positions[name] = {'x': col * SPRITE_WIDTH, 'y': row * SPRITE_HEIGHT, 'w': SPRITE_WIDTH, 'h': SPRITE_HEIGHT}
+    return buffer.getvalue(), positions
+
+
+def prepare_report_sprites(pokemon_names, sprite_mode, report_path):
+    """根据图标模式准备图标URL和坐标 / Prepare sprite URL and positions for the chosen sprite mode
+    
+    sheet: 引用完整图标表 / reference the full sprite sheet
+    inline: 将裁剪后的图集嵌入为data URI / embed the trimmed atlas as a data URI
+    sibling: 将裁剪后的图集写在报告旁边 / write the trimmed atlas next to the report
+    """
+    if sprite_mode != 'sheet':
+        try:
+            atlas_bytes, positions = build_sprite_atlas(pokemon_names)
+        except ImportError:
+            print("Warning: Trimmed sprite atlas requires Pillow (pip install Pillow), referencing full sprite sheet")
+            sprite_mode = 'sheet'
+        except OSError as e:
+            print(f"Warning: Unable to build sprite atlas ({e}), referencing full sprite sheet")
+            sprite_mode = 'sheet'
+    
+    if sprite_mode == 'sibling':
+        atlas_path = os.path.splitext(report_path)[0] + "_sprites.png"
+        try:
+            with open(atlas_path, 'wb') as f:
+                f.write(atlas_bytes)
+        except OSError as e:
+            print(f"Error writing sprite atlas {atlas_path}: {e}, referencing full sprite sheet")
+            sprite_mode = 'sheet'
+    
+    if sprite_mode == 'inline':
+        sprite_url = "data:image/png;base64," + base64.b64encode(atlas_bytes).decode("ascii")
+    elif sprite_mode == 'sibling':
+        sprite_url = os.path.basename(atlas_path)
+    else:
+        sprite_url = SPRITE_SHEET_PATH
+        positions = {name: get_pokemon_sprite_info(name) for name in pokemon_names}
+    
+    return sprite_url, positions
+
+
+def build_output_filepath(format_code, rating_threshold, extension, output_dir=".", prefix="Speed_Tiers"):
+    """生成带时间戳的导出文件路径 / Build timestamped export file path"""
     format_display_name = formatDisplayNames.get(format_code, format_code)
     clean_format_name = re.sub(r'[^\w\-_\.]', '_', format_display_name)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"Speed_Tiers_{clean_format_name}_{rating_threshold}_{timestamp}.html"
-    filepath = os.path.join(output_dir, filename)
-    
-    # HTML模板 / HTML template
-    html_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Speed Tiers Table - {format_display_name} ({rating_threshold}+)</title>
-    <style>
-        :root {{
+    filename = f"{prefix}_{clean_format_name}_{rating_threshold}_{timestamp}.{extension}"
+    return os.path.join(output_dir, filename)
+
+
+def build_html_stylesheet(sprite_url=SPRITE_SHEET_PATH):
+    """生成HTML报告共用的样式表 / Build the stylesheet shared by HTML reports"""
+    return f"""        :root {{
             --bg-color: #f2e6ff;
             --primary-color: #ff80bf;
             --secondary-color: #a64dff;
@@ -456,7 +935,7 @@ def export_to_html(speed_tiers_list, format_code, rating_threshold, output_dir="
         .pokemon-sprite {{
             width: 40px;
             height: 30px;
-            background-image: url('pokemonicons-sheet.png');
+            background-image: url('{sprite_url}');
             background-repeat: no-repeat;
             display: inline-block;
             vertical-align: middle;
@@ -508,6 +987,13 @@ def export_to_html(speed_tiers_list, format_code, rating_threshold, output_dir="
             color: var(--dark-text);
         }}
         
+        .section-title {{
+            margin: 0;
+            padding: 20px 30px 10px;
+            color: var(--secondary-color);
+            font-size: 1.4em;
+        }}
+        
         @media (max-width: 768px) {{
             .container {{
                 margin: 10px;
@@ -531,13 +1017,71 @@ def export_to_html(speed_tiers_list, format_code, rating_threshold, output_dir="
                 padding: 8px 5px;
             }}
         }}
-    </style>
+"""
+
+
+@profiler.profiled_stage(count=count_exported_records)
+def export_to_html(speed_tiers_list, format_code, rating_threshold, output_dir=".", sprite_mode='sheet', speed_creep=None):
+    """导出速度线数据到美化的HTML表格文件 / Export speed tier data to beautiful HTML table file
+
+    speed_creep 为 speed_creep.py 的卡速记录，给出时在速度线后附加卡速表 /
+    speed_creep holds speed_creep.py's records; when given, a speed creep table follows the speed tiers
+    """
+    if not speed_tiers_list:
+        print("Error: No speed tier data to export")
+        return None
+    
+    # 生成文件名 / Generate filename
+    format_display_name = formatDisplayNames.get(format_code, format_code)
+    filepath = build_output_filepath(format_code, rating_threshold, "html", output_dir)
+    
+    # 准备图标 / Prepare sprites
+    report_names = [pokemon['name'] for tier in speed_tiers_list for pokemon in tier['pokemon_list']]
+    for record in speed_creep or []:
+        report_names.extend((record['pokemon'], record['target']))
+    sprite_url, sprite_positions = prepare_report_sprites(list(dict.fromkeys(report_names)), sprite_mode, filepath)
+    html_content = render_html_report(speed_tiers_list, format_code, rating_threshold, sprite_positions,
+                                      stylesheet=f"    <style>\n{build_html_stylesheet(sprite_url)}    </style>",
+                                      speed_creep=speed_creep)
+    
+    # 写入文件 / Write to file
+    try:
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        print(f"HTML file exported: {filepath}")
+        return filepath
+    except Exception as e:
+        print(f"Error exporting HTML file: {e}")
+        return None
+
+
+@profiler.profiled_stage(count=count_exported_records)
+def render_html_report(speed_tiers_list, format_code, rating_threshold, sprite_positions, stylesheet, generated_label=None,
+                       speed_creep=None):
+    """生成HTML报告内容 / Render HTML report content
+    
+    stylesheet 为放入<head>的样式标签（内联<style>或外部<link>） / stylesheet is the tag placed in <head> (inline <style> or external <link>)
+    generated_label 默认为当前时间 / generated_label defaults to the current time
+    speed_creep 给出时在速度线后附加卡速表 / speed_creep, when given, adds a speed creep table after the speed tiers
+    """
+    format_display_name = formatDisplayNames.get(format_code, format_code)
+    if generated_label is None:
+        generated_label = f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    
+    # HTML模板 / HTML template
+    html_content = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Speed Tiers Table - {format_display_name} ({rating_threshold}+)</title>
+{stylesheet}
 </head>
 <body>
     <div class="container">
         <div class="header">
             <h1>Speed Tiers Table</h1>
-            <p>{format_display_name} - Rating {rating_threshold}+ - Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+            <p>{format_display_name} - Rating {rating_threshold}+ - {generated_label}</p>
         </div>
         
         <div class="stats-summary">
@@ -579,17 +1123,13 @@ def export_to_html(speed_tiers_list, format_code, rating_threshold, output_dir="
     # 计算最大使用率以进行比例缩放 / Calculate max usage for proportional scaling
     max_usage = max(pokemon['usage'] for tier in speed_tiers_list for pokemon in tier['pokemon_list']) if speed_tiers_list else 1
     
-    # 速度相关性格 / Speed-related natures
-    speed_boost_natures = ["Timid", "Hasty", "Jolly", "Naive"]
-    speed_nerf_natures = ["Brave", "Relaxed", "Quiet", "Sassy"]
-    
     # 生成表格行 / Generate table rows
     for tier in speed_tiers_list:
         speed_value = tier['speed']
         
         for i, pokemon in enumerate(tier['pokemon_list']):
             translated_name = translate_pokemon_name(pokemon['name'])
-            sprite_info = get_pokemon_sprite_info(pokemon['name'])
+            sprite_info = sprite_positions[pokemon['name']]
             
             # 计算使用率百分比和条形图宽度 / Calculate usage percentage and bar width
             usage_percent = pokemon['usage'] * 100
@@ -597,9 +1137,9 @@ def export_to_html(speed_tiers_list, format_code, rating_threshold, output_dir="
             
             # 性格颜色类 / Nature color class
             nature = pokemon['nature']
-            if nature in speed_boost_natures:
+            if nature in SPEED_BOOST_NATURES:
                 nature_class = 'nature-positive'
-            elif nature in speed_nerf_natures:
+            elif nature in SPEED_NERF_NATURES:
                 nature_class = 'nature-negative'
             else:
                 nature_class = 'nature-neutral'
@@ -632,24 +1172,381 @@ def export_to_html(speed_tiers_list, format_code, rating_threshold, output_dir="
     html_content += """
                 </tbody>
             </table>
+        </div>"""
+    if speed_creep:
+        html_content += render_speed_creep_section(speed_creep, sprite_positions)
+    html_content += """
+    </div>
+</body>
+</html>"""
+    return html_content
+
+
+def render_speed_creep_section(speed_creep, sprite_positions):
+    """生成卡速表的HTML / Render the speed creep table's HTML"""
+    def render_pokemon_cell(name):
+        sprite_info = sprite_positions[name]
+        return f"""<div style="display: flex; align-items: center;">
+                                <div class="pokemon-sprite" style="background-position: -{sprite_info['x']}px -{sprite_info['y']}px;"></div>
+                                <span class="pokemon-name">{translate_pokemon_name(name)}</span>
+                            </div>"""
+
+    section = """
+        <div class="table-container">
+            <h2 class="section-title">Speed Creep Benchmarks</h2>
+            <table>
+                <thead>
+                    <tr>
+                        <th>Speed</th>
+                        <th>Pokemon</th>
+                        <th>Creep Share</th>
+                        <th>Reference EV Config</th>
+                        <th>Outspeeds</th>
+                        <th>Target Speed</th>
+                        <th>Target Share</th>
+                        <th>Gained Usage</th>
+                    </tr>
+                </thead>
+                <tbody>"""
+    for record in speed_creep:
+        speed_range = str(record['speed']) if record['speed'] == record['speed_max'] else f"{record['speed']}-{record['speed_max']}"
+        section += f"""
+                    <tr class="pokemon-row">
+                        <td class="speed-tier">{speed_range}</td>
+                        <td>
+                            {render_pokemon_cell(record['pokemon'])}
+                        </td>
+                        <td>{record['creep_share'] * 100:.1f}%</td>
+                        <td style="font-size: 12px; font-family: monospace;">{record['spread']}</td>
+                        <td>
+                            {render_pokemon_cell(record['target'])}
+                        </td>
+                        <td>{record['target_speed']}</td>
+                        <td>{record['target_share'] * 100:.1f}%</td>
+                        <td>{record['gained_usage'] * 100:.2f}%</td>
+                    </tr>"""
+    section += """
+                </tbody>
+            </table>
+        </div>"""
+    return section
+
+
+def build_interactive_payload(speed_tiers_list, sprite_positions, min_usage_filter=None, top_n_filter=None):
+    """构建交互式HTML内嵌的紧凑列式数据 / Build compact column-oriented data embedded in the interactive HTML"""
+    species_index = {}
+    nature_index = {}
+    species = []
+    natures = []
+    records = []
+
+    for tier in speed_tiers_list:
+        for pokemon in tier['pokemon_list']:
+            name = pokemon['name']
+            if name not in species_index:
+                species_index[name] = len(species)
+                translated_name = translate_pokemon_name(name)
+                sprite_info = sprite_positions[name]
+                search_key = f"{name} {translated_name}".lower()
+                species.append([translated_name, search_key, sprite_info['x'], sprite_info['y']])
+
+            nature = pokemon['nature']
+            if nature not in nature_index:
+                nature_index[nature] = len(natures)
+                if nature in SPEED_BOOST_NATURES:
+                    nature_class = 'nature-positive'
+                elif nature in SPEED_NERF_NATURES:
+                    nature_class = 'nature-negative'
+                else:
+                    nature_class = 'nature-neutral'
+                natures.append([nature, nature_class])
+
+            # 记录顺序与速度线顺序一致（速度降序，线内使用率降序） / Records keep tier order (speed desc, usage desc within tier)
+            records.append([
+                tier['speed'],
+                species_index[name],
+                pokemon['usage'],
+                nature_index[nature],
+                pokemon['speed_evs'],
+                pokemon['base_speed'],
+                pokemon['spread'],
+                round(pokemon['speed_usage_ratio'], 4)
+            ])
+
+    return {
+        'species': species,
+        'natures': natures,
+        'records': records,
+        'initial': {
+            'minUsage': min_usage_filter * 100 if min_usage_filter is not None else None,
+            'topN': top_n_filter
+        }
+    }
+
+
+@profiler.profiled_stage(count=count_exported_records)
+def export_to_interactive_html(speed_tiers_list, format_code, rating_threshold, output_dir=".", sprite_mode='sheet',
+                               min_usage_filter=None, top_n_filter=None):
+    """导出可在浏览器内过滤的虚拟滚动HTML表格 / Export virtualized HTML table that filters in the browser
+
+    speed_tiers_list 应为未过滤的速度线，过滤条件只作为页面的初始值 /
+    speed_tiers_list should be unfiltered; the filters only seed the page's initial values
+    """
+    if not speed_tiers_list:
+        print("Error: No speed tier data to export")
+        return None
+
+    # 生成文件名，与静态HTML报告区分 / Generate filename, kept apart from the static HTML report
+    format_display_name = formatDisplayNames.get(format_code, format_code)
+    filepath = build_output_filepath(format_code, rating_threshold, "html", output_dir, prefix="Speed_Tiers_Interactive")
+
+    # 准备图标和内嵌数据 / Prepare sprites and embedded data
+    report_names = [pokemon['name'] for tier in speed_tiers_list for pokemon in tier['pokemon_list']]
+    sprite_url, sprite_positions = prepare_report_sprites(report_names, sprite_mode, filepath)
+    payload = build_interactive_payload(speed_tiers_list, sprite_positions, min_usage_filter, top_n_filter)
+    # 防止数据中的"</"提前结束script标签 / Keep "</" in the data from closing the script tag early
+    payload_json = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+
+    html_content = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Speed Tiers Table - {format_display_name} ({rating_threshold}+)</title>
+    <style>
+{build_html_stylesheet(sprite_url)}
+        .filter-bar {{
+            display: flex;
+            flex-wrap: wrap;
+            gap: 15px;
+            padding: 15px 20px;
+            border-bottom: 2px solid #e6ccff;
+        }}
+
+        .filter-bar label {{
+            font-size: 14px;
+            font-weight: bold;
+        }}
+
+        .filter-bar input {{
+            width: 80px;
+            margin-left: 5px;
+            padding: 4px;
+            border: 1px solid #e6ccff;
+            border-radius: 5px;
+        }}
+
+        .filter-bar input[type="search"] {{
+            width: 160px;
+        }}
+
+        .table-container.virtual {{
+            max-height: 70vh;
+            overflow-y: auto;
+        }}
+
+        .virtual td {{
+            height: {INTERACTIVE_ROW_HEIGHT}px;
+            padding-top: 0;
+            padding-bottom: 0;
+            white-space: nowrap;
+        }}
+
+        .virtual tr.spacer td {{
+            padding: 0;
+            border: 0;
+        }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>Speed Tiers Table</h1>
+            <p>{format_display_name} - Rating {rating_threshold}+ - Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+        </div>
+
+        <div class="stats-summary">
+            <div class="stat-item">
+                <div class="stat-number" id="stat-tiers">0</div>
+                <div class="stat-label">Speed Tiers</div>
+            </div>
+            <div class="stat-item">
+                <div class="stat-number" id="stat-records">0</div>
+                <div class="stat-label">Pokemon Records</div>
+            </div>
+            <div class="stat-item">
+                <div class="stat-number" id="stat-highest">0</div>
+                <div class="stat-label">Highest Speed</div>
+            </div>
+            <div class="stat-item">
+                <div class="stat-number" id="stat-lowest">0</div>
+                <div class="stat-label">Lowest Speed</div>
+            </div>
+        </div>
+
+        <div class="filter-bar">
+            <label>Min Usage (%)<input type="number" id="filter-min-usage" min="0" step="0.1"></label>
+            <label>Top N<input type="number" id="filter-top-n" min="1" step="1"></label>
+            <label>Search<input type="search" id="filter-name"></label>
+            <label>Speed from<input type="number" id="filter-speed-min"></label>
+            <label>to<input type="number" id="filter-speed-max"></label>
+        </div>
+
+        <div class="table-container virtual" id="viewport">
+            <table>
+                <thead>
+                    <tr>
+                        <th>Speed</th>
+                        <th>Pokemon</th>
+                        <th>Usage Rate</th>
+                        <th>Nature</th>
+                        <th>Speed EVs</th>
+                        <th>Base Speed</th>
+                        <th>Reference EV Config</th>
+                        <th>Speed Usage Rate</th>
+                    </tr>
+                </thead>
+                <tbody id="rows"></tbody>
+            </table>
         </div>
     </div>
+    <script type="application/json" id="tier-data">{payload_json}</script>
+    <script>
+    (function () {{
+        const ROW_HEIGHT = {INTERACTIVE_ROW_HEIGHT};
+        const OVERSCAN = 10;
+        const data = JSON.parse(document.getElementById('tier-data').textContent);
+        const records = data.records;
+        const viewport = document.getElementById('viewport');
+        const tbody = document.getElementById('rows');
+        const inputs = {{
+            minUsage: document.getElementById('filter-min-usage'),
+            topN: document.getElementById('filter-top-n'),
+            name: document.getElementById('filter-name'),
+            speedMin: document.getElementById('filter-speed-min'),
+            speedMax: document.getElementById('filter-speed-max')
+        }};
+
+        // 与filter_speed_tiers相同：按使用率稳定排序后应用最小使用率和前N名 / Same as filter_speed_tiers: stable usage sort, then min usage and top N
+        const byUsage = records.map((r, i) => i).sort((a, b) => (records[b][2] - records[a][2]) || (a - b));
+        let visible = [];
+        let maxUsage = 1;
+
+        function escapeHtml(text) {{
+            return String(text).replace(/[&<>"']/g, c => ({{'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}})[c]);
+        }}
+
+        function numberOrNull(input) {{
+            return input.value === '' ? null : Number(input.value);
+        }}
+
+        function applyFilters() {{
+            const minUsage = numberOrNull(inputs.minUsage);
+            const topN = numberOrNull(inputs.topN);
+            const query = inputs.name.value.trim().toLowerCase();
+            const speedMin = numberOrNull(inputs.speedMin);
+            const speedMax = numberOrNull(inputs.speedMax);
+
+            const keep = new Uint8Array(records.length);
+            let kept = 0;
+            for (const i of byUsage) {{
+                if (minUsage !== null && records[i][2] * 100 < minUsage) continue;
+                if (topN !== null && kept >= topN) break;
+                keep[i] = 1;
+                kept++;
+            }}
+
+            visible = [];
+            maxUsage = 0;
+            for (let i = 0; i < records.length; i++) {{
+                const r = records[i];
+                if (!keep[i]) continue;
+                if (speedMin !== null && r[0] < speedMin) continue;
+                if (speedMax !== null && r[0] > speedMax) continue;
+                if (query && data.species[r[1]][1].indexOf(query) === -1) continue;
+                visible.push(i);
+                maxUsage = Math.max(maxUsage, r[2]);
+            }}
+            maxUsage = maxUsage || 1;
+
+            let tiers = 0;
+            for (let k = 0; k < visible.length; k++) {{
+                if (k === 0 || records[visible[k]][0] !== records[visible[k - 1]][0]) tiers++;
+            }}
+            document.getElementById('stat-tiers').textContent = tiers;
+            document.getElementById('stat-records').textContent = visible.length;
+            document.getElementById('stat-highest').textContent = visible.length ? records[visible[0]][0] : 0;
+            document.getElementById('stat-lowest').textContent = visible.length ? records[visible[visible.length - 1]][0] : 0;
+
+            viewport.scrollTop = 0;
+            render();
+        }}
+
+        function renderRow(k) {{
+            const r = records[visible[k]];
+            const species = data.species[r[1]];
+            const nature = data.natures[r[3]];
+            const firstInTier = k === 0 || records[visible[k - 1]][0] !== r[0];
+            const usageWidth = Math.min(r[2] / maxUsage * 100, 100);
+            return '<tr class="pokemon-row">' +
+                (firstInTier ? '<td class="speed-tier">' + r[0] + '</td>' : '<td></td>') +
+                '<td><div style="display: flex; align-items: center;">' +
+                '<div class="pokemon-sprite" style="background-position: -' + species[2] + 'px -' + species[3] + 'px;"></div>' +
+                '<span class="pokemon-name">' + escapeHtml(species[0]) + '</span></div></td>' +
+                '<td><div class="usage-bar"><div class="usage-fill" style="width: ' + usageWidth + '%;"></div>' +
+                '<div class="usage-text">' + (r[2] * 100).toFixed(2) + '%</div></div></td>' +
+                '<td class="' + nature[1] + '">' + escapeHtml(nature[0]) + '</td>' +
+                '<td>' + r[4] + '</td>' +
+                '<td>' + r[5] + '</td>' +
+                '<td style="font-size: 12px; font-family: monospace;">' + escapeHtml(r[6]) + '</td>' +
+                '<td>' + (r[7] * 100).toFixed(1) + '%</td>' +
+                '</tr>';
+        }}
+
+        // 只渲染可见区域内的行，上下用占位行撑开滚动高度 / Render only rows in view, spacer rows keep the scroll height
+        function render() {{
+            const first = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN);
+            const last = Math.min(visible.length, Math.ceil((viewport.scrollTop + viewport.clientHeight) / ROW_HEIGHT) + OVERSCAN);
+            let html = '<tr class="spacer"><td colspan="8" style="height: ' + first * ROW_HEIGHT + 'px;"></td></tr>';
+            for (let k = first; k < last; k++) html += renderRow(k);
+            html += '<tr class="spacer"><td colspan="8" style="height: ' + (visible.length - last) * ROW_HEIGHT + 'px;"></td></tr>';
+            tbody.innerHTML = html;
+        }}
+
+        let scheduled = false;
+        viewport.addEventListener('scroll', () => {{
+            if (scheduled) return;
+            scheduled = true;
+            requestAnimationFrame(() => {{ scheduled = false; render(); }});
+        }});
+        window.addEventListener('resize', render);
+        for (const input of Object.values(inputs)) input.addEventListener('input', applyFilters);
+
+        if (data.initial.minUsage !== null) inputs.minUsage.value = data.initial.minUsage;
+        if (data.initial.topN !== null) inputs.topN.value = data.initial.topN;
+        applyFilters();
+    }})();
+    </script>
 </body>
 </html>"""
-    
+
     # 写入文件 / Write to file
     try:
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(html_content)
-        print(f"HTML file exported: {filepath}")
+        print(f"Interactive HTML file exported: {filepath}")
         return filepath
     except Exception as e:
-        print(f"Error exporting HTML file: {e}")
+        print(f"Error exporting interactive HTML file: {e}")
         return None
 
 
-def export_to_excel(speed_tiers_list, format_code, rating_threshold, output_dir="."):
-    """导出速度线数据到Excel文件 / Export speed tier data to Excel file"""
+@profiler.profiled_stage(count=count_exported_records)
+def export_to_excel(speed_tiers_list, format_code, rating_threshold, output_dir=".", speed_creep=None):
+    """导出速度线数据到Excel文件 / Export speed tier data to Excel file
+
+    speed_creep 给出时增加卡速工作表 / speed_creep, when given, adds a speed creep sheet
+    """
     if not speed_tiers_list:
         print("Error: No speed tier data to export")
         return None
@@ -673,15 +1570,15 @@ def export_to_excel(speed_tiers_list, format_code, rating_threshold, output_dir=
                 'Speed Usage Ratio (%)': round(pokemon['speed_usage_ratio'] * 100, 1)
             })
     
+    # pandas导入较慢，只在导出Excel时加载 / pandas is slow to import, so load it only for Excel export
+    import pandas as pd
+    from openpyxl.styles import Font, Alignment, PatternFill
+
     # 创建DataFrame / Create DataFrame
     df = pd.DataFrame(excel_data)
     
     # 生成文件名 / Generate filename
-    format_display_name = formatDisplayNames.get(format_code, format_code)
-    clean_format_name = re.sub(r'[^\w\-_\.]', '_', format_display_name)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"Speed_Tiers_{clean_format_name}_{rating_threshold}_{timestamp}.xlsx"
-    filepath = os.path.join(output_dir, filename)
+    filepath = build_output_filepath(format_code, rating_threshold, "xlsx", output_dir)
     
     # 创建Excel文件 / Create Excel file
     with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
@@ -748,42 +1645,291 @@ def export_to_excel(speed_tiers_list, format_code, rating_threshold, output_dir=
             cell.font = header_font
             cell.fill = header_fill
             cell.alignment = header_alignment
+        
+        # 创建卡速表 / Create speed creep sheet
+        if speed_creep:
+            creep_df = pd.DataFrame([{
+                'Speed': record['speed'],
+                'Max Speed': record['speed_max'],
+                'Pokemon': translate_pokemon_name(record['pokemon']),
+                'Creep Share (%)': round(record['creep_share'] * 100, 1),
+                'Spread': record['spread'],
+                'Outspeeds': translate_pokemon_name(record['target']),
+                'Target Speed': record['target_speed'],
+                'Target Share (%)': round(record['target_share'] * 100, 1),
+                'Gained Usage (%)': round(record['gained_usage'] * 100, 3)
+            } for record in speed_creep])
+            creep_df.to_excel(writer, sheet_name='Speed Creep', index=False)
+            
+            creep_ws = writer.sheets['Speed Creep']
+            creep_column_widths = {
+                'A': 8,   # Speed
+                'B': 10,  # Max Speed
+                'C': 20,  # Pokemon
+                'D': 15,  # Creep Share (%)
+                'E': 25,  # Spread
+                'F': 20,  # Outspeeds
+                'G': 13,  # Target Speed
+                'H': 16,  # Target Share (%)
+                'I': 17   # Gained Usage (%)
+            }
+            
+            for column, width in creep_column_widths.items():
+                creep_ws.column_dimensions[column].width = width
+            
+            for cell in creep_ws[1]:
+                cell.font = header_font
+                cell.fill = header_fill
+                cell.alignment = header_alignment
     
     print(f"Excel file exported: {filepath}")
     return filepath
 
 
+def iter_speed_tier_records(speed_tiers_list, format_code, rating_threshold):
+    """逐条生成扁平化的速度线记录 / Yield flattened speed tier records one at a time"""
+    for tier in speed_tiers_list:
+        for pokemon in tier['pokemon_list']:
+            yield {
+                'format': format_code,
+                'rating': int(rating_threshold),
+                'speed': tier['speed'],
+                'pokemon': translate_pokemon_name(pokemon['name']),
+                'usage': pokemon['usage'],
+                'nature': pokemon['nature'],
+                'speed_evs': pokemon['speed_evs'],
+                'base_speed': pokemon['base_speed'],
+                'spread': pokemon['spread'],
+                'speed_usage_ratio': pokemon['speed_usage_ratio']
+            }
+
+
+def iter_record_batches(speed_tiers_list, format_code, rating_threshold, batch_size=EXPORT_BATCH_SIZE):
+    """按批次生成扁平化记录 / Yield flattened records in fixed-size batches"""
+    batch = []
+    for record in iter_speed_tier_records(speed_tiers_list, format_code, rating_threshold):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+@profiler.profiled_stage(count=count_exported_records)
+def export_to_csv(speed_tiers_list, format_code, rating_threshold, output_dir="."):
+    """流式导出速度线数据到CSV文件 / Stream speed tier data to CSV file"""
+    if not speed_tiers_list:
+        print("Error: No speed tier data to export")
+        return None
+
+    filepath = build_output_filepath(format_code, rating_threshold, "csv", output_dir)
+
+    try:
+        with open(filepath, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=RECORD_COLUMNS)
+            writer.writeheader()
+            for batch in iter_record_batches(speed_tiers_list, format_code, rating_threshold):
+                writer.writerows(batch)
+        print(f"CSV file exported: {filepath}")
+        return filepath
+    except Exception as e:
+        print(f"Error exporting CSV file: {e}")
+        return None
+
+
+@profiler.profiled_stage(count=count_exported_records)
+def export_to_jsonl(speed_tiers_list, format_code, rating_threshold, output_dir="."):
+    """流式导出速度线数据到JSON Lines文件 / Stream speed tier data to JSON Lines file"""
+    if not speed_tiers_list:
+        print("Error: No speed tier data to export")
+        return None
+
+    filepath = build_output_filepath(format_code, rating_threshold, "jsonl", output_dir)
+
+    try:
+        with open(filepath, 'w', encoding='utf-8') as f:
+            for batch in iter_record_batches(speed_tiers_list, format_code, rating_threshold):
+                f.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in batch))
+        print(f"JSON Lines file exported: {filepath}")
+        return filepath
+    except Exception as e:
+        print(f"Error exporting JSON Lines file: {e}")
+        return None
+
+
+def build_arrow_schema(pa):
+    """构建列式导出的Arrow模式（宝可梦和性格使用字典编码） / Build Arrow schema for columnar export (species and nature dictionary-encoded)"""
+    return pa.schema([
+        ('format', pa.dictionary(pa.int32(), pa.string())),
+        ('rating', pa.int32()),
+        ('speed', pa.int32()),
+        ('pokemon', pa.dictionary(pa.int32(), pa.string())),
+        ('usage', pa.float64()),
+        ('nature', pa.dictionary(pa.int32(), pa.string())),
+        ('speed_evs', pa.int32()),
+        ('base_speed', pa.int32()),
+        ('spread', pa.string()),
+        ('speed_usage_ratio', pa.float64())
+    ])
+
+
+def iter_arrow_batches(pa, schema, speed_tiers_list, format_code, rating_threshold):
+    """生成共享增量字典的Arrow记录批次 / Yield Arrow record batches sharing an append-only dictionary per encoded column"""
+    dictionary_columns = [field.name for field in schema if pa.types.is_dictionary(field.type)]
+    dictionaries = {column: {} for column in dictionary_columns}
+
+    for batch in iter_record_batches(speed_tiers_list, format_code, rating_threshold):
+        arrays = []
+        for field in schema:
+            values = [record[field.name] for record in batch]
+            if field.name in dictionaries:
+                # 新值追加到字典末尾，使后续批次只需写出增量 / Append new values so later batches only emit dictionary deltas
+                lookup = dictionaries[field.name]
+                indices = [lookup.setdefault(value, len(lookup)) for value in values]
+                arrays.append(pa.DictionaryArray.from_arrays(
+                    pa.array(indices, type=pa.int32()), pa.array(list(lookup), type=pa.string())))
+            else:
+                arrays.append(pa.array(values, type=field.type))
+        yield pa.record_batch(arrays, schema=schema)
+
+
+@profiler.profiled_stage(count=count_exported_records)
+def export_to_parquet(speed_tiers_list, format_code, rating_threshold, output_dir="."):
+    """分批导出速度线数据到Parquet文件 / Export speed tier data to Parquet file in batches"""
+    if not speed_tiers_list:
+        print("Error: No speed tier data to export")
+        return None
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("Error: Parquet export requires pyarrow (pip install pyarrow)")
+        return None
+
+    filepath = build_output_filepath(format_code, rating_threshold, "parquet", output_dir)
+    schema = build_arrow_schema(pa)
+
+    try:
+        with pq.ParquetWriter(filepath, schema) as writer:
+            for record_batch in iter_arrow_batches(pa, schema, speed_tiers_list, format_code, rating_threshold):
+                writer.write_batch(record_batch)
+        print(f"Parquet file exported: {filepath}")
+        return filepath
+    except Exception as e:
+        print(f"Error exporting Parquet file: {e}")
+        return None
+
+
+@profiler.profiled_stage(count=count_exported_records)
+def export_to_arrow(speed_tiers_list, format_code, rating_threshold, output_dir="."):
+    """分批导出速度线数据到Arrow IPC流文件 / Export speed tier data to Arrow IPC stream file in batches"""
+    if not speed_tiers_list:
+        print("Error: No speed tier data to export")
+        return None
+
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+    except ImportError:
+        print("Error: Arrow export requires pyarrow (pip install pyarrow)")
+        return None
+
+    filepath = build_output_filepath(format_code, rating_threshold, "arrows", output_dir)
+    schema = build_arrow_schema(pa)
+
+    try:
+        # IPC文件格式不支持字典增量，因此使用流格式 / IPC file format rejects dictionary deltas, so use the stream format
+        options = ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+        with pa.OSFile(filepath, 'wb') as sink, ipc.new_stream(sink, schema, options=options) as writer:
+            for record_batch in iter_arrow_batches(pa, schema, speed_tiers_list, format_code, rating_threshold):
+                writer.write_batch(record_batch)
+        print(f"Arrow file exported: {filepath}")
+        return filepath
+    except Exception as e:
+        print(f"Error exporting Arrow file: {e}")
+        return None
+
+
+def iter_stat_tier_records(stat_tiers, format_code, rating_threshold):
+    """逐条生成扁平化的六项属性线记录 / Yield flattened six-stat tier records one at a time"""
+    for stat, tiers_list in stat_tiers.items():
+        for tier in tiers_list:
+            for pokemon in tier['pokemon_list']:
+                yield {
+                    'format': format_code,
+                    'rating': int(rating_threshold),
+                    'stat': stat,
+                    'value': tier['value'],
+                    'pokemon': translate_pokemon_name(pokemon['name']),
+                    'usage': pokemon['usage'],
+                    'nature': pokemon['nature'],
+                    'evs': pokemon['evs'],
+                    'base_stat': pokemon['base_stat'],
+                    'spread': pokemon['spread'],
+                    'value_usage_ratio': pokemon['value_usage_ratio']
+                }
+
+
+@profiler.profiled_stage(count=lambda result, stat_tiers, *args, **kwargs: sum(count_speed_tier_records(t) for t in stat_tiers.values()) if result else 0)
+def export_stat_tiers_to_csv(stat_tiers, format_code, rating_threshold, output_dir="."):
+    """流式导出六项属性线到一个CSV文件（stat 列区分属性） / Stream the six stat tiers to one CSV file (the stat column tells them apart)"""
+    if not any(stat_tiers.values()):
+        print("Error: No stat tier data to export")
+        return None
+
+    filepath = build_output_filepath(format_code, rating_threshold, "csv", output_dir, prefix="Stat_Tiers")
+    try:
+        with open(filepath, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=STAT_RECORD_COLUMNS)
+            writer.writeheader()
+            writer.writerows(iter_stat_tier_records(stat_tiers, format_code, rating_threshold))
+        print(f"Stat tier CSV file exported: {filepath}")
+        return filepath
+    except Exception as e:
+        print(f"Error exporting stat tier CSV file: {e}")
+        return None
+
+
+# 导出格式注册表：命令行参数 -> (显示名称, 导出函数) / Export format registry: CLI flag -> (display name, exporter)
+EXPORTERS = {
+    'html': ("HTML", export_to_html),
+    'interactive': ("Interactive HTML", export_to_interactive_html),
+    'parquet': ("Parquet", export_to_parquet),
+    'arrow': ("Arrow", export_to_arrow),
+    'csv': ("CSV", export_to_csv),
+    'jsonl': ("JSON Lines", export_to_jsonl),
+    'excel': ("Excel", export_to_excel)
+}
+
+
 def get_available_formats():
     """获取可用的格式列表 / Get list of available formats"""
-    if not os.path.exists(DATA_DIRECTORY):
-        return []
-    
-    format_files = [f for f in os.listdir(DATA_DIRECTORY) if f.endswith("-0.json")]
-    formats = []
+    format_files = [f for f in list_stats_files() if f.endswith("-0.json")]
+    formats = set()
     
     for file in format_files:
         parts = file.split("-")
         if len(parts) >= 3:
             format_code = parts[-2]
             display_name = formatDisplayNames.get(format_code, format_code)
-            formats.append((format_code, display_name))
+            formats.add((format_code, display_name))
     
-    return sorted(formats, key=lambda x: x[1])
+    return sorted(formats, key=lambda x: (x[1], x[0]))
 
 
 def get_available_ratings(format_code):
     """获取指定格式的可用评级列表 / Get list of available ratings for specified format"""
-    if not os.path.exists(DATA_DIRECTORY):
-        return []
-    
-    files = [f for f in os.listdir(DATA_DIRECTORY) if format_code in f.split("-")]
-    ratings = sorted([f.split("-")[-1].split(".")[0] for f in files], key=int)
+    files = [f for f in list_stats_files() if format_code in f.split("-")]
+    # 多个月份的同一评级只列一次 / List a rating once when several months have it
+    ratings = sorted({f.split("-")[-1].split(".")[0] for f in files}, key=int)
     return ratings
 
 
 def main():
     """主函数 / Main function"""
-    parser = argparse.ArgumentParser(description="Export Pokemon battle speed tiers to Excel or HTML file")
+    parser = argparse.ArgumentParser(description="Export Pokemon battle speed tiers to Excel, HTML or columnar data files")
     parser.add_argument("format", nargs='?', help="Format code (e.g.: gen9vgc2025regi)")
     parser.add_argument("rating", nargs='?', help="Rating threshold (e.g.: 1630)")
     parser.add_argument("--output", "-o", default=".", help="Output directory (default: current directory)")
@@ -792,9 +1938,35 @@ def main():
     parser.add_argument("--html", "-H", action="store_true", help="Export as beautiful HTML table file (with Pokemon icons)")
     parser.add_argument("--min-usage", "-u", type=float, help="Minimum usage rate threshold (e.g., 0.01 for 1%%)")
     parser.add_argument("--top-n", "-n", type=int, help="Export only top N Pokemon by usage rate")
+    parser.add_argument("--month", "-m", help="Statistics month YYYY-MM (default: last month, falling back to the month before)")
+    parser.add_argument("--interactive", "-i", action="store_true",
+                        help="Export as interactive HTML table that filters by usage, top N, name and speed in the browser")
+    parser.add_argument("--excel", action="store_true", help="Export as Excel file (default when no other format is selected)")
+    parser.add_argument("--parquet", action="store_true", help="Export as columnar Parquet file (requires pyarrow)")
+    parser.add_argument("--arrow", action="store_true", help="Export as Arrow IPC stream file (requires pyarrow)")
+    parser.add_argument("--csv", action="store_true", help="Export as CSV file")
+    parser.add_argument("--jsonl", action="store_true", help="Export as JSON Lines file")
+    parser.add_argument("--all-stats", action="store_true", help="Also export tiers of all six stats (HP, Atk, Def, SpA, SpD, Spe) to one CSV file")
+    parser.add_argument("--sprites", choices=SPRITE_MODES, default="sheet",
+                        help="HTML sprite source: full sheet by relative URL, trimmed atlas inlined as data URI, or trimmed atlas as sibling file (default: sheet)")
+    
+    parser.add_argument("--profile", metavar="PATH", help="Write per-stage wall time, CPU time, peak memory and item counts as JSON")
+    parser.add_argument("--profile-memory", action="store_true", help="Also trace Python heap peaks per stage with tracemalloc (slower)")
+    parser.add_argument("--profile-pstats", metavar="PATH", help="Also write a cProfile/pstats dump (requires --profile)")
     
     args = parser.parse_args()
     
+    if args.profile:
+        profiler.start_profiling(trace_memory=args.profile_memory, use_cprofile=bool(args.profile_pstats))
+    try:
+        run_export(args)
+    finally:
+        if args.profile:
+            profiler.write_profile_metrics(args.profile, args.profile_pstats)
+
+
+def run_export(args):
+    """根据命令行参数执行导出 / Run the export described by command line arguments"""
     # 加载数据 / Load data
     print("Loading data...")
     load_all_data(use_translation=args.translate)
@@ -850,23 +2022,33 @@ def main():
         print(f"Available ratings: {', '.join(available_ratings)}")
         return
     
-    # 获取使用率数据 / Get usage data
+    # 获取使用率数据，有最新的速度线缓存时跳过解析 / Get usage data, skipping the parse when the speed tier cache is current
     print(f"Getting usage data for {format_code} (rating {rating_threshold}+)...")
-    usage_data = fetch_pokemon_usage_data(format_code, rating_threshold)
-    
-    if not usage_data:
-        print("Error: Unable to get usage data")
-        return
+    stats_path, is_outdated = find_usage_data_file(format_code, rating_threshold, args.month)
+    all_speed_tiers = load_cached_speed_tiers(stats_path, format_code) if stats_path else None
     
-    print(f"Loaded data for {len(usage_data)} Pokemon")
+    if all_speed_tiers is not None:
+        if is_outdated:
+            print("Warning: Using outdated statistics data")
+        print(f"Loaded {len(all_speed_tiers)} cached speed tiers")
+    else:
+        usage_data = fetch_pokemon_usage_data(format_code, rating_threshold, args.month)
+        
+        if not usage_data:
+            print("Error: Unable to get usage data")
+            return
+        
+        print(f"Loaded data for {len(usage_data)} Pokemon")
+        
+        # 计算速度线 / Calculate speed tiers
+        print("Calculating speed tiers...")
+        all_speed_tiers = calculate_speed_tiers(usage_data, format_code)
     
-    # 计算速度线 / Calculate speed tiers
-    print("Calculating speed tiers...")
     if args.min_usage:
         print(f"Applying minimum usage filter: {args.min_usage * 100:.2f}%")
     if args.top_n:
         print(f"Applying top N filter: {args.top_n} Pokemon")
-    speed_tiers_list = calculate_speed_tiers(usage_data, format_code, args.min_usage, args.top_n)
+    speed_tiers_list = filter_speed_tiers(all_speed_tiers, args.min_usage, args.top_n)
     
     if not speed_tiers_list:
         print("Error: No speed tier data calculated")
@@ -874,25 +2056,39 @@ def main():
     
     print(f"Calculated {len(speed_tiers_list)} speed tiers")
     
-    # 选择导出格式并导出文件 / Choose export format and export file
-    if args.html:
-        print("Exporting HTML file...")
-        if args.translate and translateNames:
-            print("Using Chinese translation for HTML export")
-        output_file = export_to_html(speed_tiers_list, format_code, rating_threshold, args.output)
-        file_type = "HTML"
-    else:
-        print("Exporting Excel file...")
-        if args.translate and translateNames:
-            print("Using Chinese translation for Excel export")
-        output_file = export_to_excel(speed_tiers_list, format_code, rating_threshold, args.output)
-        file_type = "Excel"
+    # 选择导出格式并导出文件 / Choose export formats and export files
+    selected_formats = [name for name in EXPORTERS if getattr(args, name)]
+    if not selected_formats:
+        selected_formats = ['excel']
     
-    if output_file:
-        print(f"{file_type} export successful! File saved at: {output_file}")
-        print(f"Contains {sum(len(tier['pokemon_list']) for tier in speed_tiers_list)} Pokemon speed records")
-    else:
-        print(f"{file_type} export failed")
+    record_count = sum(len(tier['pokemon_list']) for tier in speed_tiers_list)
+    exporter_options = {
+        'html': {'sprite_mode': args.sprites},
+        # 交互式表格内嵌全部记录，过滤条件作为页面初始值 / Interactive table embeds all records, filters become the page's initial values
+        'interactive': {'sprite_mode': args.sprites, 'min_usage_filter': args.min_usage, 'top_n_filter': args.top_n}
+    }
+    for export_format in selected_formats:
+        file_type, exporter = EXPORTERS[export_format]
+        print(f"Exporting {file_type} file...")
+        if args.translate and translateNames:
+            print(f"Using Chinese translation for {file_type} export")
+        export_tiers = all_speed_tiers if export_format == 'interactive' else speed_tiers_list
+        output_file = exporter(export_tiers, format_code, rating_threshold, args.output,
+                               **exporter_options.get(export_format, {}))
+        
+        if output_file:
+            print(f"{file_type} export successful! File saved at: {output_file}")
+            print(f"Contains {record_count} Pokemon speed records")
+        else:
+            print(f"{file_type} export failed")
+
+    if args.all_stats:
+        print("Calculating tiers of all six stats...")
+        usage_document = load_usage_file(stats_path) or {}
+        stat_tiers = calculate_stat_tiers(usage_document.get("data", {}), format_code)
+        stat_tiers = {stat: filter_speed_tiers(stat_tier_list, args.min_usage, args.top_n, 'value')
+                      for stat, stat_tier_list in stat_tiers.items()}
+        export_stat_tiers_to_csv(stat_tiers, format_code, rating_threshold, args.output)
 
 
 if __name__ == "__main__":
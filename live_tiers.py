@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Live Speed Tiers
+实时速度线
+Build speed tiers incrementally from a stream of Showdown team exports or replay team dumps
+
+用法 / Usage:
+python live_tiers.py format_code [input ...] [options]
+
+例如 / Examples:
+python live_tiers.py gen9vgc2025regi team_sheets/*.txt --export html
+tail -f -n +1 replays.log | python live_tiers.py gen9vgc2025regi --checkpoint 500 --export html csv
+python live_tiers.py gen9vgc2025regi day2.txt --resume --snapshot live_gen9vgc2025regi.json
+
+可选参数 / Optional Arguments:
+--snapshot         快照文件（默认: 输出目录中的 live_<格式>.json） / Snapshot file (default: live_<format>.json in the output directory)
+--resume           从已有快照继续累积 / Continue accumulating from an existing snapshot
+--checkpoint       每N个配置写一次快照并导出（默认: 0，仅在结束时） / Write the snapshot and exports every N sets (default: 0, only at the end)
+--export           导出格式：html/interactive/csv/jsonl/excel/parquet/arrow / Export formats: html/interactive/csv/jsonl/excel/parquet/arrow
+--output, -o       指定输出目录 / Specify output directory
+--min-usage, -u    最小使用率阈值 / Minimum usage rate threshold
+--top-n, -n        只导出使用率前N的宝可梦 / Export only top N Pokemon by usage rate
+--translate, -t    使用中文翻译宝可梦名称 / Use Chinese translation for Pokemon names
+
+输入为文件或标准输入（"-"，默认），逐行读取，可以是Showdown导出文本（可含 "=== [format] 名称 ===" 分隔的多支队伍）、
+回放中的 "|showteam|p1|..." 行，或每行一支的打包队伍；每个输入文件结束时也结束其最后的配置和队伍。
+每个配置转换为与统计数据相同的 "性格:HP/攻/防/特攻/特防/速度" 配招键，以O(1)更新该宝可梦的累计计数和速度频率；
+速度线随时可得，只重新选择有新配置的宝可梦的速度。
+快照与月度统计的 data 部分形状相同（Raw count、usage、Abilities、Items、Moves、Spreads），可用 --resume 继续，
+对快照运行 calculate_speed_tiers 得到的速度线与实时结果相同。每个配置计数为1，不按评级加权。
+Inputs are files or standard input ("-", the default), read line by line: Showdown export text (optionally several
+teams separated by "=== [format] Name ==="), "|showteam|p1|..." lines from replays, or packed teams one per line.
+The end of each input file also ends its last set and team. Each set becomes the same "Nature:HP/Atk/Def/SpA/SpD/Spe"
+spread key as the usage statistics and updates that Pokemon's running counts and speed frequencies in O(1). Speed
+tiers are available at any moment; only Pokemon with new sets have their speeds selected again. Snapshots have the
+shape of a monthly statistics data block (Raw count, usage, Abilities, Items, Moves, Spreads), can be resumed with
+--resume, and calculate_speed_tiers on a snapshot gives the same speed tiers as the live result. Every set counts
+once; there is no rating weighting.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+import export_speed_tiers as tiers
+import atomic_files
+import stat_tables
+import analyze_teams
+
+# 导出和快照使用的评级：实时数据包含所有对战，相当于统计数据的0评级 / Rating used for exports and snapshots: live data
+# includes every battle, like the usage statistics' 0 cutoff
+LIVE_RATING = "0"
+
+# 没有性格时使用的性格（与统计数据一致） / Nature used when none is given (as in the usage statistics)
+DEFAULT_NATURE = "Serious"
+
+# 回放中公开队伍的行前缀 / Line prefix of team sheets in replays
+SHOWTEAM_PREFIX = "|showteam|"
+
+# 打包队伍中每只宝可梦至少有的字段数 / Minimum number of fields of one Pokemon in a packed team
+PACKED_FIELD_COUNT = 11
+
+
+# iter_input_lines 在每个输入结束时产生的分隔标记 / Marker yielded by iter_input_lines at the end of each input
+INPUT_BOUNDARY = None
+
+
+def build_spread_key(nature, evs):
+    """生成 "性格:HP/攻/防/特攻/特防/速度" 配招键 / Build the "Nature:HP/Atk/Def/SpA/SpD/Spe" spread key"""
+    return f"{nature or DEFAULT_NATURE}:{'/'.join(map(str, evs))}"
+
+
+def unpack_team(packed):
+    """解析打包队伍（Showdown的 packTeam 格式），返回与 parse_showdown_set 相同形状的配置列表 /
+    Parse a packed team (Showdown's packTeam format), returning sets shaped like parse_showdown_set's"""
+    sets = []
+    for packed_set in packed.split(']'):
+        fields = packed_set.split('|')
+        if len(fields) < PACKED_FIELD_COUNT:
+            continue
+        nickname, species, item, ability, moves, nature, evs = fields[:7]
+        ev_values = evs.split(',') if evs else []
+        sets.append({
+            'species': species or nickname,
+            'nickname': nickname if species else None,
+            'item': item or None,
+            # 特性位置代码（0/1/H）无法不查图鉴解析 / Ability slot codes (0/1/H) cannot be resolved without the dex
+            'ability': ability if ability and ability not in ('0', '1', 'H') else None,
+            'level': int(fields[10]) if fields[10].isdigit() else None,
+            'nature': nature or None,
+            'evs': [int(value) if value.isdigit() else 0 for value in (ev_values + [''] * 6)[:6]],
+            'moves': [move for move in moves.split(',') if move]
+        })
+    return sets
+
+
+def iter_stream_events(lines):
+    """逐行解析输入，产生 ('team', 格式) 和 ('set', 配置) 事件 / Parse input line by line, yielding ('team', format) and ('set', set) events
+
+    不在任何队伍中的配置会先产生一个隐式的队伍事件；INPUT_BOUNDARY 结束当前配置和队伍 /
+    A set outside any team first yields an implicit team event; INPUT_BOUNDARY ends the current set and team
+    """
+    block = []
+    in_team = False
+    for raw_line in lines:
+        # 一个输入文件结束：不把它的最后一个配置和下一个文件合并 / End of one input file: keep its last set apart from the next file
+        if raw_line is INPUT_BOUNDARY:
+            if block:
+                pokemon_set = analyze_teams.parse_showdown_set(block)
+                block = []
+                if pokemon_set:
+                    yield 'set', pokemon_set
+            in_team = False
+            continue
+        line = raw_line.strip()
+        # 大多数行是配置内容，先走最快的判断 / Most lines are set content, so take the cheapest checks first
+        if line and line[0] != '=' and '|' not in line:
+            if not in_team:
+                yield 'team', None
+                in_team = True
+            block.append(line)
+            continue
+
+        if block:
+            pokemon_set = analyze_teams.parse_showdown_set(block)
+            block = []
+            if pokemon_set:
+                yield 'set', pokemon_set
+
+        if line.startswith(SHOWTEAM_PREFIX) or line.count('|') >= PACKED_FIELD_COUNT - 1:
+            yield 'team', None
+            for pokemon_set in unpack_team(line.split('|', 3)[3] if line.startswith(SHOWTEAM_PREFIX) else line):
+                yield 'set', pokemon_set
+            in_team = False
+            continue
+
+        # 其他回放协议行（|j|、|turn| 等）只结束当前配置 / Other replay protocol lines (|j|, |turn|, ...) only end the current set
+        header = analyze_teams.TEAM_HEADER_PATTERN.match(line)
+        if header:
+            yield 'team', header.group(1)
+            in_team = True
+
+    if block:
+        pokemon_set = analyze_teams.parse_showdown_set(block)
+        if pokemon_set:
+            yield 'set', pokemon_set
+
+
+def create_live_aggregate(format_code):
+    """创建空的累计数据 / Create an empty running aggregate"""
+    return {
+        'format': format_code,
+        'level': tiers.get_format_level(format_code),
+        'generation': stat_tables.get_format_generation(format_code),
+        'teams': 0,
+        'sets': 0,
+        'species': {},
+        'names': {}
+    }
+
+
+def resolve_species_name(aggregate, species):
+    """把导出中的名称或打包队伍中的ID转换为显示名称 / Convert an export name or packed-team ID to a display name"""
+    name = aggregate['names'].get(species)
+    if name is None:
+        entry = tiers.pokedexEntries.get(tiers.to_showdown_id(species))
+        name = entry['name'] if species.islower() and entry and 'name' in entry else species
+        aggregate['names'][species] = name
+    return name
+
+
+def get_species_entry(aggregate, name):
+    """取得或创建一只宝可梦的累计条目 / Get or create one Pokemon's running entry"""
+    entry = aggregate['species'].get(name)
+    if entry is None:
+        # 与 calculate_speed_tiers 相同的种族值查找 / The same base stat lookup as calculate_speed_tiers
+        matched_name = tiers.fuzzy_match(name, tiers.pokedexEntries.keys())
+        entry = {
+            'raw_count': 0,
+            'abilities': {},
+            'items': {},
+            'moves': {},
+            'spreads': {},
+            'base_speed': tiers.get_pokemon_base_stats(matched_name, aggregate['generation'])["spe"] if matched_name else None,
+            'speed_frequencies': {},
+            'spread_speeds': {},
+            'total_spread_usage': 0,
+            'selected': None
+        }
+        aggregate['species'][name] = entry
+    return entry
+
+
+def record_spread(aggregate, entry, spread, count):
+    """累加一个配招的计数及其速度频率 / Add to one spread's count and its speed frequency"""
+    entry['spreads'][spread] = entry['spreads'].get(spread, 0) + count
+    if entry['base_speed'] is None:
+        return
+    located = entry['spread_speeds'].get(spread)
+    if located is None:
+        speed_value, nature, speed_evs = tiers.calculate_spread_speed(spread, entry['base_speed'], aggregate['level'],
+                                                                        aggregate['generation'])
+        speed_data = entry['speed_frequencies'].setdefault(speed_value, {'total_usage': 0, 'spreads': []})
+        located = (speed_data, {'spread': spread, 'nature': nature, 'speed_evs': speed_evs, 'usage': 0})
+        speed_data['spreads'].append(located[1])
+        entry['spread_speeds'][spread] = located
+    located[0]['total_usage'] += count
+    located[1]['usage'] += count
+    entry['total_spread_usage'] += count
+    entry['selected'] = None
+
+
+def add_set(aggregate, pokemon_set):
+    """把一个配置加入累计数据，O(1) / Add one set to the aggregate in O(1)"""
+    entry = get_species_entry(aggregate, resolve_species_name(aggregate, pokemon_set['species']))
+    entry['raw_count'] += 1
+    aggregate['sets'] += 1
+    for counts, value in ((entry['items'], pokemon_set['item']), (entry['abilities'], pokemon_set['ability'])):
+        if value:
+            key = tiers.to_showdown_id(value)
+            counts[key] = counts.get(key, 0) + 1
+    for move in pokemon_set['moves']:
+        key = tiers.to_showdown_id(move)
+        entry['moves'][key] = entry['moves'].get(key, 0) + 1
+    record_spread(aggregate, entry, build_spread_key(pokemon_set['nature'], pokemon_set['evs']), 1)
+
+
+def ingest_lines(aggregate, lines, checkpoint=0, on_checkpoint=None):
+    """把输入行加入累计数据，每 checkpoint 个配置调用一次 on_checkpoint / Add input lines to the aggregate, calling on_checkpoint every checkpoint sets"""
+    for kind, value in iter_stream_events(lines):
+        if kind == 'team':
+            aggregate['teams'] += 1
+            continue
+        add_set(aggregate, value)
+        if checkpoint and on_checkpoint and aggregate['sets'] % checkpoint == 0:
+            on_checkpoint(aggregate)
+
+
+def get_live_speed_tiers(aggregate, min_usage_filter=None, top_n_filter=None):
+    """当前的速度线，只重新选择有新配置的宝可梦的速度 / Current speed tiers, selecting speeds again only for Pokemon with new sets"""
+    speed_tiers = {}
+    teams = max(aggregate['teams'], 1)
+    for name, entry in aggregate['species'].items():
+        if entry['base_speed'] is None or not entry['total_spread_usage']:
+            continue
+        if entry['selected'] is None:
+            entry['selected'] = tiers.select_species_speeds(entry['speed_frequencies'], entry['total_spread_usage'])
+        usage_weight = entry['raw_count'] / teams
+        for speed_value, spread_entry, speed_usage_ratio in entry['selected']:
+            speed_tiers.setdefault(speed_value, []).append(
+                tiers.build_tier_entry(name, usage_weight, entry['base_speed'], spread_entry, speed_usage_ratio))
+    return tiers.filter_speed_tiers(tiers.sort_speed_tiers(speed_tiers), min_usage_filter, top_n_filter)
+
+
+def build_snapshot(aggregate):
+    """生成与月度统计形状相同的快照 / Build a snapshot shaped like a monthly statistics file"""
+    teams = max(aggregate['teams'], 1)
+    return {
+        'info': {
+            'metagame': aggregate['format'],
+            'cutoff': int(LIVE_RATING),
+            'number of teams': aggregate['teams'],
+            'number of sets': aggregate['sets'],
+            'generated': datetime.now().isoformat(timespec='seconds')
+        },
+        'data': {name: {
+            'Raw count': entry['raw_count'],
+            'usage': entry['raw_count'] / teams,
+            'Abilities': entry['abilities'],
+            'Items': entry['items'],
+            'Moves': entry['moves'],
+            'Spreads': entry['spreads']
+        } for name, entry in aggregate['species'].items()}
+    }
+
+
+def write_snapshot(aggregate, filepath):
+    """原子地写入快照 / Write the snapshot atomically"""
+    try:
+        with atomic_files.atomic_write(filepath) as f:
+            json.dump(build_snapshot(aggregate), f, ensure_ascii=False)
+        return filepath
+    except OSError as e:
+        print(f"Error writing snapshot {filepath}: {e}")
+        return None
+
+
+def load_snapshot(aggregate, filepath):
+    """把快照中的计数加入累计数据 / Add a snapshot's counts to the aggregate"""
+    document = tiers.load_data_file(filepath)
+    if not document or 'data' not in document:
+        print(f"Error: {filepath} is not a live snapshot")
+        return False
+    aggregate['teams'] += document.get('info', {}).get('number of teams', 0)
+    aggregate['sets'] += document.get('info', {}).get('number of sets', 0)
+    for name, data in document['data'].items():
+        entry = get_species_entry(aggregate, name)
+        entry['raw_count'] += data.get('Raw count', 0)
+        for key, field in (('abilities', 'Abilities'), ('items', 'Items'), ('moves', 'Moves')):
+            for value, count in data.get(field, {}).items():
+                entry[key][value] = entry[key].get(value, 0) + count
+        for spread, count in data.get('Spreads', {}).items():
+            record_spread(aggregate, entry, spread, count)
+    return True
+
+
+def iter_input_lines(inputs):
+    """依次读取所有输入文件的行，"-" 为标准输入，每个输入之后产生 INPUT_BOUNDARY /
+    Read the lines of every input in turn, "-" meaning standard input, yielding INPUT_BOUNDARY after each input"""
+    for path in inputs:
+        if path == "-":
+            yield from sys.stdin
+        else:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    yield from f
+            except OSError as e:
+                print(f"Error reading {path}: {e}")
+        yield INPUT_BOUNDARY
+
+
+def main():
+    """主函数 / Main function"""
+    parser = argparse.ArgumentParser(description="Build speed tiers incrementally from streamed Showdown team exports")
+    parser.add_argument("format", help="Format code (e.g.: gen9vgc2025regi)")
+    parser.add_argument("inputs", nargs='*', default=["-"], help="Team export or replay files, '-' for standard input (default: standard input)")
+    parser.add_argument("--snapshot", help="Snapshot file (default: live_<format>.json in the output directory)")
+    parser.add_argument("--resume", action="store_true", help="Continue accumulating from an existing snapshot")
+    parser.add_argument("--checkpoint", type=int, default=0, help="Write the snapshot and exports every N sets (default: 0, only at the end)")
+    parser.add_argument("--export", nargs='+', choices=list(tiers.EXPORTERS), default=[], help="Export formats")
+    parser.add_argument("--output", "-o", default=".", help="Output directory (default: current directory)")
+    parser.add_argument("--min-usage", "-u", type=float, help="Minimum usage rate threshold (e.g., 0.01 for 1%%)")
+    parser.add_argument("--top-n", "-n", type=int, help="Export only top N Pokemon by usage rate")
+    parser.add_argument("--translate", "-t", action="store_true", help="Use Chinese translation for Pokemon names")
+
+    args = parser.parse_args()
+
+    print("Loading data...")
+    tiers.load_all_data(use_translation=args.translate)
+    os.makedirs(args.output, exist_ok=True)
+    snapshot_path = args.snapshot or os.path.join(args.output, f"live_{args.format}.json")
+
+    aggregate = create_live_aggregate(args.format)
+    if args.resume and os.path.exists(snapshot_path):
+        if not load_snapshot(aggregate, snapshot_path):
+            return
+        print(f"Resumed {aggregate['sets']} sets from {aggregate['teams']} teams")
+
+    started = time.perf_counter()
+
+    def checkpoint(aggregate):
+        elapsed = time.perf_counter() - started
+        speed_tiers_list = get_live_speed_tiers(aggregate, args.min_usage, args.top_n)
+        print(f"{aggregate['sets']} sets from {aggregate['teams']} teams, {len(aggregate['species'])} Pokemon, "
+              f"{len(speed_tiers_list)} speed tiers ({elapsed:.1f} s)")
+        write_snapshot(aggregate, snapshot_path)
+        for name in args.export:
+            tiers.EXPORTERS[name][1](speed_tiers_list, args.format, LIVE_RATING, args.output)
+
+    sets_before = aggregate['sets']
+    ingest_lines(aggregate, iter_input_lines(args.inputs), args.checkpoint, checkpoint)
+    elapsed = time.perf_counter() - started
+    ingested = aggregate['sets'] - sets_before
+    print(f"Ingested {ingested} sets in {elapsed:.2f} s ({ingested / elapsed if elapsed else 0:.0f} sets/s)")
+    if not aggregate['sets']:
+        print("Error: No sets found")
+        return
+    # 最后一个配置刚好触发过检查点时不再重复 / Skip when the last set has just triggered a checkpoint
+    if not (args.checkpoint and ingested and aggregate['sets'] % args.checkpoint == 0):
+        checkpoint(aggregate)
+    print(f"Snapshot written: {snapshot_path}")
+
+
+if __name__ == "__main__":
+    main()
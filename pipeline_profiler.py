@@ -0,0 +1,216 @@
+"""
+Export Pipeline Profiler
+导出流程分阶段性能分析
+Per-stage wall time, CPU time, peak memory and item counts for the export pipeline
+
+用法 / Usage:
+import pipeline_profiler as profiler
+profiler.start_profiling(trace_memory=True, use_cprofile=True)
+... # 调用带 @profiled_stage 的函数或 with profiler.profile_stage("name") / call functions decorated with @profiled_stage or use with profiler.profile_stage("name")
+profiler.write_profile_metrics("metrics.json", "profile.pstats")
+
+未启用时，所有钩子几乎没有开销。 / When profiling is not enabled, every hook is close to free.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import functools
+import tracemalloc
+import cProfile
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 指标文档版本 / Metrics document version
+METRICS_VERSION = 1
+
+# 全局变量存储分析状态 / Global variables for storing profiling state
+profilingEnabled = False
+traceMemory = False
+stageRecords = []
+stageStack = []
+cpuProfiler = None
+profilingStarted = None
+
+
+def get_peak_rss_kb():
+    """获取进程常驻内存峰值(KB) / Get process peak resident memory (KB)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS以字节为单位，Linux以KB为单位 / macOS reports bytes, Linux reports KB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def get_children_peak_rss_kb():
+    """获取已结束子进程中最大的常驻内存峰值(KB) / Get the largest peak resident memory of finished child processes (KB)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def start_profiling(trace_memory=False, use_cprofile=False):
+    """开始记录各阶段指标 / Start recording per-stage metrics
+
+    trace_memory 使用tracemalloc记录Python堆峰值（有额外开销） / trace_memory records Python heap peaks with tracemalloc (adds overhead)
+    use_cprofile 同时运行cProfile / use_cprofile also runs cProfile
+    """
+    global profilingEnabled, traceMemory, stageRecords, stageStack, cpuProfiler, profilingStarted
+    profilingEnabled = True
+    traceMemory = trace_memory
+    stageRecords = []
+    stageStack = []
+    profilingStarted = (datetime.now().isoformat(timespec="seconds"), time.perf_counter(), time.process_time())
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if use_cprofile:
+        cpuProfiler = cProfile.Profile()
+        cpuProfiler.enable()
+
+
+def stop_profiling():
+    """停止记录 / Stop recording"""
+    global profilingEnabled
+    profilingEnabled = False
+    if cpuProfiler is not None:
+        cpuProfiler.disable()
+    if traceMemory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+@contextmanager
+def profile_stage(name, **labels):
+    """记录一个阶段的耗时、内存和条目数 / Record time, memory and item count of one stage
+
+    with profile_stage("calculate_speed_tiers", format="gen9ou") as stage:
+        stage['items'] = ...
+    """
+    if not profilingEnabled:
+        yield {}
+        return
+
+    stage = {'items': None, 'child_peak': 0}
+    if traceMemory:
+        # 嵌套阶段会重置峰值，子阶段结束时把峰值传给父阶段 / Nested stages reset the peak, so children hand their peak up on exit
+        traced_start, traced_peak = tracemalloc.get_traced_memory()
+        # 重置前先把父阶段到目前的峰值记下 / Keep the parent's peak so far before resetting it
+        if stageStack:
+            stageStack[-1]['child_peak'] = max(stageStack[-1]['child_peak'], traced_peak)
+        tracemalloc.reset_peak()
+    stageStack.append(stage)
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield stage
+    finally:
+        record = {
+            'stage': name,
+            'wall_seconds': round(time.perf_counter() - wall_start, 6),
+            'cpu_seconds': round(time.process_time() - cpu_start, 6),
+            'peak_rss_kb': get_peak_rss_kb(),
+            'items': stage['items'],
+            'pid': os.getpid()
+        }
+        stageStack.pop()
+        if traceMemory:
+            peak = max(tracemalloc.get_traced_memory()[1], stage['child_peak'])
+            record['peak_traced_bytes'] = max(peak - traced_start, 0)
+            if stageStack:
+                stageStack[-1]['child_peak'] = max(stageStack[-1]['child_peak'], peak)
+        if labels:
+            record['labels'] = labels
+        stageRecords.append(record)
+
+
+def profiled_stage(name=None, count=None):
+    """函数装饰器：把整个函数调用记录为一个阶段 / Function decorator recording the whole call as one stage
+
+    count(result, *args, **kwargs) 返回该阶段处理的条目数 / count(result, *args, **kwargs) returns the number of items processed
+    """
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profilingEnabled:
+                return func(*args, **kwargs)
+            with profile_stage(stage_name) as stage:
+                result = func(*args, **kwargs)
+                if count is not None:
+                    stage['items'] = count(result, *args, **kwargs)
+                return result
+        return wrapper
+    return decorator
+
+
+def take_stage_records():
+    """取出并清空已记录的阶段（用于从工作进程回传） / Take and clear recorded stages (used to ship them back from worker processes)"""
+    global stageRecords
+    records, stageRecords = stageRecords, []
+    return records
+
+
+def add_stage_records(records):
+    """合并其他进程记录的阶段 / Merge stages recorded by other processes"""
+    stageRecords.extend(records)
+
+
+def summarize_stage_records(records):
+    """按阶段名称汇总 / Summarize by stage name"""
+    summary = {}
+    for record in records:
+        entry = summary.setdefault(record['stage'], {
+            'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'items': 0,
+            'max_wall_seconds': 0.0, 'peak_rss_kb': None, 'peak_traced_bytes': None
+        })
+        entry['calls'] += 1
+        entry['wall_seconds'] += record['wall_seconds']
+        entry['cpu_seconds'] += record['cpu_seconds']
+        entry['max_wall_seconds'] = max(entry['max_wall_seconds'], record['wall_seconds'])
+        entry['items'] += record['items'] or 0
+        for key in ('peak_rss_kb', 'peak_traced_bytes'):
+            if record.get(key) is not None:
+                entry[key] = max(entry[key] or 0, record[key])
+    for entry in summary.values():
+        entry['wall_seconds'] = round(entry['wall_seconds'], 6)
+        entry['cpu_seconds'] = round(entry['cpu_seconds'], 6)
+    return summary
+
+
+def build_metrics_document():
+    """生成JSON指标文档 / Build the JSON metrics document"""
+    started, wall_start, cpu_start = profilingStarted or (None, time.perf_counter(), time.process_time())
+    return {
+        'version': METRICS_VERSION,
+        'started': started,
+        'argv': sys.argv,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'trace_memory': traceMemory,
+        'total_wall_seconds': round(time.perf_counter() - wall_start, 6),
+        'total_cpu_seconds': round(time.process_time() - cpu_start, 6),
+        'peak_rss_kb': get_peak_rss_kb(),
+        'summary': summarize_stage_records(stageRecords),
+        'stages': stageRecords
+    }
+
+
+def write_profile_metrics(metrics_path, pstats_path=None):
+    """停止分析并写入指标文档和可选的pstats文件 / Stop profiling and write the metrics document and optional pstats dump"""
+    document = build_metrics_document()
+    stop_profiling()
+    with open(metrics_path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+    print(f"Profile metrics written: {metrics_path}")
+    if pstats_path and cpuProfiler is not None:
+        cpuProfiler.dump_stats(pstats_path)
+        print(f"cProfile stats written: {pstats_path}")
+    return document
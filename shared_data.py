@@ -0,0 +1,230 @@
+"""
+Shared Reference Data
+共享只读参考数据
+Pack the reference data used by the exporter into one read-only file that worker processes mmap
+
+用法 / Usage:
+import shared_data
+path = shared_data.create_shared_data_file(use_translation=True)   # 父进程 / parent process
+shared_data.attach_shared_data(path)                                # 每个工作进程 / each worker process
+
+文件放在 /dev/shm（可用时），所有工作进程映射同一份页面，不再各自解析和保存一份图鉴、图标索引和翻译。
+映射视图实现了只读字典接口，export_speed_tiers 中的查找代码无需修改。
+The file lives in /dev/shm when available, so every worker maps the same pages instead of parsing and holding its
+own copy of the pokedex, sprite index and translations. The mapped views implement the read-only dict interface,
+so lookups in export_speed_tiers work unchanged.
+"""
+
+import os
+import mmap
+import struct
+import tempfile
+from collections.abc import Mapping
+import export_speed_tiers as tiers
+import stat_tables
+import pipeline_profiler as profiler
+
+# 文件头：魔数、版本、表数量 / File header: magic, version, table count
+SHARED_DATA_MAGIC = b"SPDTIERS"
+SHARED_DATA_VERSION = 3
+HEADER = struct.Struct("<8sII")
+
+# 表目录项：名称、偏移 / Table directory entry: name, offset
+TABLE_ENTRY = struct.Struct("<16sQ")
+
+# 表头：条目数、值类型 / Table header: entry count, value kind
+TABLE_HEADER = struct.Struct("<II")
+KIND_POKEDEX = 1
+KIND_INT = 2
+KIND_STRING = 3
+
+# 图鉴中缺失字段的占位值 / Placeholder for fields missing from a pokedex entry
+MISSING_INT = -2 ** 31
+
+# 图鉴条目的整数字段：编号和六项种族值，名称另存为字符串 / Integer fields of a pokedex entry: number and six base stats; names are stored as strings
+POKEDEX_INT_FIELDS = 1 + len(stat_tables.STAT_KEYS)
+
+# 当前进程映射的文件，保持引用以免被关闭 / File mapped by this process, referenced so it stays open
+sharedDataMap = None
+
+
+def align(data):
+    """补齐到4字节边界 / Pad to a 4-byte boundary"""
+    return data + b"\0" * (-len(data) % 4)
+
+
+def pack_strings(strings):
+    """打包字符串：偏移数组 + 字节块 / Pack strings as an offset array plus a byte blob"""
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = [0]
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    return struct.pack(f"<{len(offsets)}I", *offsets) + align(b"".join(encoded)), encoded
+
+
+def pack_table(mapping, kind):
+    """把一个字典打包为表，保留原有顺序并附带按键排序的索引 / Pack one dict as a table, keeping its order plus an index sorted by key"""
+    keys = list(mapping)
+    key_block, encoded_keys = pack_strings(keys)
+    sorted_index = sorted(range(len(keys)), key=lambda i: encoded_keys[i])
+    parts = [TABLE_HEADER.pack(len(keys), kind), key_block, struct.pack(f"<{len(keys)}I", *sorted_index)]
+
+    if kind == KIND_POKEDEX:
+        values = []
+        for key in keys:
+            entry = mapping[key]
+            values.append(entry.get("num", MISSING_INT))
+            values.extend(entry.get("baseStats", {}).get(stat, MISSING_INT) for stat in stat_tables.STAT_KEYS)
+        parts.append(struct.pack(f"<{len(values)}i", *values))
+        parts.append(pack_strings([mapping[key].get("name", "") for key in keys])[0])
+    elif kind == KIND_INT:
+        parts.append(struct.pack(f"<{len(keys)}i", *(int(mapping[key]) for key in keys)))
+    else:
+        parts.append(pack_strings([mapping[key] for key in keys])[0])
+    return b"".join(parts)
+
+
+def write_shared_data(path, tables):
+    """写入共享数据文件 / Write the shared data file
+
+    tables 为 {名称: (字典, 值类型)} / tables is {name: (dict, value kind)}
+    """
+    directory_size = HEADER.size + TABLE_ENTRY.size * len(tables)
+    blocks = []
+    entries = []
+    offset = directory_size
+    for name, (mapping, kind) in tables.items():
+        block = pack_table(mapping, kind)
+        entries.append(TABLE_ENTRY.pack(name.encode('ascii'), offset))
+        blocks.append(block)
+        offset += len(block)
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(SHARED_DATA_MAGIC, SHARED_DATA_VERSION, len(tables)))
+        f.write(b"".join(entries))
+        f.write(b"".join(blocks))
+
+
+class SharedTable(Mapping):
+    """映射文件中一个表的只读字典视图 / Read-only dict view of one table in the mapped file"""
+
+    def __init__(self, buffer, offset):
+        self.buffer = buffer
+        self.count, self.kind = TABLE_HEADER.unpack_from(buffer, offset)
+        position = offset + TABLE_HEADER.size
+        self.key_offsets = position
+        self.key_blob = position + 4 * (self.count + 1)
+        key_blob_size = struct.unpack_from("<I", buffer, self.key_blob - 4)[0]
+        self.sorted_index = self.key_blob + key_blob_size + (-key_blob_size % 4)
+        self.values = self.sorted_index + 4 * self.count
+        # 字符串值同样是偏移数组 + 字节块；图鉴的名称跟在整数字段之后 / String values are also an offset array plus a byte blob;
+        # pokedex names follow the integer fields
+        if self.kind == KIND_POKEDEX:
+            self.values_end = self.values + 4 * POKEDEX_INT_FIELDS * self.count
+            self.value_blob = self.values_end + 4 * (self.count + 1)
+        else:
+            self.value_blob = self.values + 4 * (self.count + 1)
+
+    def read_bytes(self, offsets, blob, index):
+        """读取第index个字符串的字节 / Read the bytes of string number index"""
+        start, end = struct.unpack_from("<II", self.buffer, offsets + 4 * index)
+        return self.buffer[blob + start:blob + end]
+
+    def find(self, key):
+        """在排序索引上二分查找，返回条目序号或-1 / Binary search the sorted index, returning the entry number or -1"""
+        target = key.encode('utf-8')
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            index = struct.unpack_from("<I", self.buffer, self.sorted_index + 4 * middle)[0]
+            candidate = self.read_bytes(self.key_offsets, self.key_blob, index)
+            if candidate < target:
+                low = middle + 1
+            elif candidate > target:
+                high = middle
+            else:
+                return index
+        return -1
+
+    def value(self, index):
+        """读取第index个条目的值 / Read the value of entry number index"""
+        if self.kind == KIND_POKEDEX:
+            fields = struct.unpack_from(f"<{POKEDEX_INT_FIELDS}i", self.buffer, self.values + 4 * POKEDEX_INT_FIELDS * index)
+            entry = {}
+            if fields[0] != MISSING_INT:
+                entry["num"] = fields[0]
+            name = self.read_bytes(self.values_end, self.value_blob, index).decode('utf-8')
+            if name:
+                entry["name"] = name
+            base_stats = {stat: value for stat, value in zip(stat_tables.STAT_KEYS, fields[1:]) if value != MISSING_INT}
+            if base_stats:
+                entry["baseStats"] = base_stats
+            return entry
+        if self.kind == KIND_INT:
+            return struct.unpack_from("<i", self.buffer, self.values + 4 * index)[0]
+        return self.read_bytes(self.values, self.value_blob, index).decode('utf-8')
+
+    def __getitem__(self, key):
+        index = self.find(key) if isinstance(key, str) else -1
+        if index < 0:
+            raise KeyError(key)
+        return self.value(index)
+
+    def __contains__(self, key):
+        return isinstance(key, str) and self.find(key) >= 0
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.read_bytes(self.key_offsets, self.key_blob, index).decode('utf-8')
+
+    def __len__(self):
+        return self.count
+
+
+def create_shared_data_file(use_translation=False, directory=None):
+    """从数据包生成共享数据文件，返回路径（由调用方删除） / Build the shared data file from the data bundle, returning its path (the caller removes it)
+
+    不设置本进程的全局数据，避免工作进程继承一份私有副本 / Does not set this process's globals, so forked workers do not inherit a private copy
+    """
+    if directory is None:
+        directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    bundle = tiers.load_data_bundle()
+    tables = {
+        'format_names': (bundle['format_names'], KIND_STRING),
+        'pokedex': (bundle['pokedex'], KIND_POKEDEX),
+        'sprite_index': (bundle['sprite_index'], KIND_INT),
+        'translations': (bundle['translations'] if use_translation else {}, KIND_STRING)
+    }
+    fd, path = tempfile.mkstemp(prefix="speed_tiers_", suffix=".bin", dir=directory)
+    os.close(fd)
+    write_shared_data(path, tables)
+    return path
+
+
+@profiler.profiled_stage(count=lambda result, *args, **kwargs: len(tiers.pokedexEntries))
+def attach_shared_data(path):
+    """映射共享数据文件并把 export_speed_tiers 的全局数据指向它 / Map the shared data file and point export_speed_tiers globals at it
+
+    成功返回True，文件无效时返回False / Returns True on success, False when the file is invalid
+    """
+    global sharedDataMap
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, table_count = HEADER.unpack_from(buffer, 0)
+    if magic != SHARED_DATA_MAGIC or version != SHARED_DATA_VERSION:
+        print(f"Error: {path} is not a shared data file of version {SHARED_DATA_VERSION}")
+        buffer.close()
+        return False
+
+    tables = {}
+    for number in range(table_count):
+        name, offset = TABLE_ENTRY.unpack_from(buffer, HEADER.size + TABLE_ENTRY.size * number)
+        tables[name.rstrip(b"\0").decode('ascii')] = SharedTable(buffer, offset)
+
+    sharedDataMap = buffer
+    tiers.formatDisplayNames = tables['format_names']
+    tiers.pokedexEntries = tables['pokedex']
+    tiers.spriteIndex = tables['sprite_index']
+    tiers.translateNames = tables['translations']
+    return True
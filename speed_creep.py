@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Speed Creep Benchmarks
+速度线卡速检测
+Find spreads tuned to sit just above another Pokemon's dominant speed, for one format or every format in a batch
+
+用法 / Usage:
+python speed_creep.py format_code [rating] [options]
+python speed_creep.py --all [options]
+
+例如 / Examples:
+python speed_creep.py gen9ou 1500
+python speed_creep.py gen9vgc2025regi 1760 --html --excel --translate
+python speed_creep.py --all --month 2025-07 --csv -o ./reports/
+
+可选参数 / Optional Arguments:
+--all              处理该月份的所有格式和评级 / Process every format and rating of the month
+--month, -m        指定统计月份 YYYY-MM（--all 默认: 数据目录中最新的月份） / Statistics month YYYY-MM (--all default: latest month in data directory)
+--window           比目标速度最多快几点仍算卡速（默认: 2） / How many points above the target speed still count as creep (default: 2)
+--min-usage, -u    参与检测的最低使用率（默认: 0.01） / Minimum usage rate of Pokemon considered (default: 0.01)
+--min-share        卡速配招至少占该宝可梦配招的比例（默认: 0.05） / Minimum share of a Pokemon's spreads in the creep cluster (default: 0.05)
+--top-n, -n        打印的卡速记录数（默认: 20） / Number of creep records printed (default: 20)
+--html, -H         导出带卡速表的HTML速度线报告 / Export HTML speed tier reports with a speed creep table
+--excel            导出带卡速工作表的Excel速度线报告 / Export Excel speed tier reports with a speed creep sheet
+--csv              导出卡速记录CSV（--all 时合并为一个文件） / Export speed creep records as CSV (one combined file with --all)
+--sprites          HTML图标来源（默认: sheet） / HTML sprite source (default: sheet)
+--translate, -t    使用中文宝可梦名称 / Use Chinese Pokemon names
+--output, -o       输出目录（默认: 当前目录） / Output directory (default: current directory)
+
+每只宝可梦的速度分布来自统计数据中的全部配招，按使用量加权，规则与速度线相同；占比最高的速度为其主流速度。
+速度努力值在8到248之间的配招视为刻意调整（4点剩余努力值和满努力值不算）。把所有 (宝可梦, 速度) 点按速度排序后，
+按主流速度从低到高扫描一个 (目标速度, 目标速度 + window] 的滑动窗口：窗口内某只其他宝可梦调整过的配招合计
+达到 --min-share 时，记为针对该目标的卡速。每个点进出窗口各一次，因此总耗时为排序的 O(n log n)
+加上输出的记录数，而不是两两比较。"获得的使用率" 为目标的使用率乘以其主流速度的占比，即卡速后从同速或被超越
+变为稳定先手的对局份额。
+Each Pokemon's speed distribution comes from every spread in the statistics, weighted by usage, with the same rules
+as the speed tiers; its most used speed is its dominant speed. Spreads with 8 to 248 Speed EVs count as deliberately
+tuned (4 leftover EVs and maxed Speed do not). All (Pokemon, speed) points are sorted by speed, then a sliding window
+(target speed, target speed + window] is swept over the dominant speeds from slowest to fastest: when another
+Pokemon's tuned spreads inside the window add up to --min-share, they are recorded as creeping that target. Every
+point enters and leaves the window once, so the cost is the O(n log n) sort plus the records produced, not all
+pairs. "Gained usage" is the target's usage times its dominant speed's share: the share of games in which the creep
+turns a speed tie or a loss into moving first.
+"""
+
+import os
+import re
+import csv
+import argparse
+from collections import deque
+import export_speed_tiers as tiers
+import stat_tables
+
+# 调整过的速度努力值范围 [下限, 上限)：4点的剩余努力值和满努力值不算 / Range [low, high) of tuned Speed EVs: 4 leftover EVs and maxed EVs do not count
+TUNED_SPEED_EVS = (8, 252)
+
+DEFAULT_WINDOW = 2
+DEFAULT_MIN_USAGE = 0.01
+DEFAULT_MIN_SHARE = 0.05
+DEFAULT_PRINTED = 20
+
+# 卡速记录的CSV列 / CSV columns of speed creep records
+SPEED_CREEP_COLUMNS = ['format', 'rating', 'pokemon', 'usage', 'speed', 'speed_max', 'creep_share', 'nature',
+                       'speed_evs', 'spread', 'target', 'target_usage', 'target_speed', 'target_share', 'gained_usage']
+
+STATS_FILE_PATTERN = re.compile(r"^(\d{4}-\d{2})-(.+)-(\d+)\.json$")
+
+
+def build_speed_profiles(usage_data, format_code, min_usage=DEFAULT_MIN_USAGE):
+    """每只宝可梦按使用量加权的速度分布 / Usage-weighted speed distribution of each Pokemon
+
+    返回 {宝可梦: {'usage', 'base_speed', 'dominant_speed', 'speeds': {速度: {'share', 'tuned_share', 'tuned_spread'}}}} /
+    Returns {Pokemon: {'usage', 'base_speed', 'dominant_speed', 'speeds': {speed: {'share', 'tuned_share', 'tuned_spread'}}}}
+    """
+    level = tiers.get_format_level(format_code)
+    generation = stat_tables.get_format_generation(format_code)
+    profiles = {}
+    for pokemon_name, pokemon_data in usage_data.items():
+        # 先按使用率过滤，避免对冷门宝可梦做模糊匹配 / Filter by usage first to skip fuzzy matching rarely used Pokemon
+        if pokemon_name == "ALL Pokemon" or pokemon_data.get("usage", 0) < min_usage:
+            continue
+        spreads = pokemon_data.get("Spreads", {})
+        total_spread_usage = sum(spreads.values())
+        matched_name = tiers.fuzzy_match(pokemon_name, tiers.pokedexEntries.keys()) if total_spread_usage else None
+        if not matched_name:
+            continue
+
+        base_speed = tiers.get_pokemon_base_stats(matched_name, generation)["spe"]
+        speeds = {}
+        nature_rows = {}
+        for spread, spread_usage in spreads.items():
+            speed_value, nature, speed_evs = tiers.calculate_spread_speed(spread, base_speed, level, generation, nature_rows)
+            speed_data = speeds.get(speed_value)
+            if speed_data is None:
+                speed_data = speeds[speed_value] = {'share': 0.0, 'tuned_share': 0.0, 'tuned_spread': None}
+            share = spread_usage / total_spread_usage
+            speed_data['share'] += share
+            if TUNED_SPEED_EVS[0] <= speed_evs < TUNED_SPEED_EVS[1]:
+                speed_data['tuned_share'] += share
+                if speed_data['tuned_spread'] is None or spread_usage > speed_data['tuned_spread']['usage']:
+                    speed_data['tuned_spread'] = {'spread': spread, 'nature': nature, 'speed_evs': speed_evs, 'usage': spread_usage}
+
+        profiles[pokemon_name] = {
+            'usage': pokemon_data.get("usage", 0),
+            'base_speed': base_speed,
+            'dominant_speed': max(speeds, key=lambda speed: speeds[speed]['share']),
+            'speeds': speeds
+        }
+    return profiles
+
+
+def build_creep_record(pokemon_name, profile, cluster_speeds, target_name, target_profile):
+    """一条卡速记录 / One speed creep record"""
+    cluster = [profile['speeds'][speed] for speed in cluster_speeds]
+    spread_entry = max((speed_data['tuned_spread'] for speed_data in cluster), key=lambda entry: entry['usage'])
+    target_speed = target_profile['dominant_speed']
+    target_share = target_profile['speeds'][target_speed]['share']
+    return {
+        'pokemon': pokemon_name,
+        'usage': profile['usage'],
+        'speed': cluster_speeds[0],
+        'speed_max': cluster_speeds[-1],
+        'creep_share': sum(speed_data['tuned_share'] for speed_data in cluster),
+        'nature': spread_entry['nature'],
+        'speed_evs': spread_entry['speed_evs'],
+        'spread': spread_entry['spread'],
+        'target': target_name,
+        'target_usage': target_profile['usage'],
+        'target_speed': target_speed,
+        'target_share': target_share,
+        'gained_usage': target_profile['usage'] * target_share
+    }
+
+
+def find_speed_creep(profiles, window=DEFAULT_WINDOW, min_share=DEFAULT_MIN_SHARE):
+    """扫描所有 (宝可梦, 速度) 点，找出恰好高于其他宝可梦主流速度的调整配招，按获得的使用率降序 /
+    Sweep every (Pokemon, speed) point for tuned spreads just above another Pokemon's dominant speed, by gained usage
+    """
+    points = sorted((speed, pokemon_name) for pokemon_name, profile in profiles.items()
+                    for speed, speed_data in profile['speeds'].items() if speed_data['tuned_share'] > 0)
+    targets = sorted((profile['dominant_speed'], pokemon_name) for pokemon_name, profile in profiles.items())
+
+    # 窗口内每只宝可梦的速度（升序），以及调整配招合计达到 min_share 的宝可梦 /
+    # Speeds of each Pokemon inside the window (ascending), and the Pokemon whose tuned spreads reach min_share
+    window_speeds = {}
+    qualifying = {}
+
+    def update_qualifying(pokemon_name):
+        cluster_speeds = window_speeds.get(pokemon_name, ())
+        speeds = profiles[pokemon_name]['speeds']
+        if sum(speeds[speed]['tuned_share'] for speed in cluster_speeds) >= min_share:
+            qualifying[pokemon_name] = True
+        else:
+            qualifying.pop(pokemon_name, None)
+
+    lower = upper = 0
+    records = []
+    for target_speed, target_name in targets:
+        # 窗口为 (目标速度, 目标速度 + window] / The window is (target speed, target speed + window]
+        while upper < len(points) and points[upper][0] <= target_speed + window:
+            speed, pokemon_name = points[upper]
+            window_speeds.setdefault(pokemon_name, deque()).append(speed)
+            update_qualifying(pokemon_name)
+            upper += 1
+        while lower < upper and points[lower][0] <= target_speed:
+            speed, pokemon_name = points[lower]
+            cluster_speeds = window_speeds[pokemon_name]
+            cluster_speeds.popleft()
+            if not cluster_speeds:
+                del window_speeds[pokemon_name]
+            update_qualifying(pokemon_name)
+            lower += 1
+
+        # 只遍历达标的宝可梦，耗时与输出成正比 / Only qualifying Pokemon are visited, so the cost follows the output
+        for pokemon_name in qualifying:
+            if pokemon_name != target_name:
+                records.append(build_creep_record(pokemon_name, profiles[pokemon_name], list(window_speeds[pokemon_name]),
+                                                  target_name, profiles[target_name]))
+
+    records.sort(key=lambda record: (record['gained_usage'], record['creep_share']), reverse=True)
+    return records
+
+
+def calculate_speed_creep(usage_data, format_code, window=DEFAULT_WINDOW, min_usage=DEFAULT_MIN_USAGE, min_share=DEFAULT_MIN_SHARE):
+    """计算一个格式的卡速记录 / Calculate a format's speed creep records"""
+    return find_speed_creep(build_speed_profiles(usage_data, format_code, min_usage), window, min_share)
+
+
+def print_speed_creep(records, limit=DEFAULT_PRINTED):
+    """打印卡速记录 / Print speed creep records"""
+    print(f"{'Pokemon':<22} {'Speed':>9} {'Creep':>7}  {'Spread':<30} {'Target':<22} {'Target speed':>12} {'Gained':>8}")
+    for record in records[:limit]:
+        speed_range = str(record['speed']) if record['speed'] == record['speed_max'] else f"{record['speed']}-{record['speed_max']}"
+        print(f"{tiers.translate_pokemon_name(record['pokemon']):<22} {speed_range:>9} {record['creep_share'] * 100:>6.1f}%  "
+              f"{record['spread']:<30} {tiers.translate_pokemon_name(record['target']):<22} {record['target_speed']:>12} "
+              f"{record['gained_usage'] * 100:>7.2f}%")
+    if len(records) > limit:
+        print(f"... {len(records) - limit} more")
+
+
+def iter_speed_creep_rows(records, format_code, rating_threshold):
+    """逐条生成卡速记录的CSV行 / Yield speed creep records as CSV rows"""
+    for record in records:
+        yield dict(record, format=format_code, rating=int(rating_threshold),
+                   pokemon=tiers.translate_pokemon_name(record['pokemon']), target=tiers.translate_pokemon_name(record['target']))
+
+
+def export_speed_creep_csv(rows, filepath):
+    """把卡速记录写入CSV / Write speed creep records to CSV"""
+    try:
+        with open(filepath, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=SPEED_CREEP_COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Speed creep CSV file exported: {filepath}")
+        return filepath
+    except Exception as e:
+        print(f"Error exporting speed creep CSV file: {e}")
+        return None
+
+
+def export_speed_creep_reports(records, usage_data, stats_path, format_code, rating_threshold, args):
+    """导出带卡速表的HTML/Excel速度线报告 / Export HTML/Excel speed tier reports with the speed creep table"""
+    all_speed_tiers = tiers.load_cached_speed_tiers(stats_path, format_code)
+    if all_speed_tiers is None:
+        all_speed_tiers = tiers.calculate_speed_tiers(usage_data, format_code)
+    speed_tiers_list = tiers.filter_speed_tiers(all_speed_tiers, args.min_usage)
+    if args.html:
+        tiers.export_to_html(speed_tiers_list, format_code, rating_threshold, args.output, args.sprites, speed_creep=records)
+    if args.excel:
+        tiers.export_to_excel(speed_tiers_list, format_code, rating_threshold, args.output, speed_creep=records)
+
+
+def list_month_files(year_month):
+    """某个月份的所有统计文件 [(格式, 评级, 路径)] / Every statistics file of a month [(format, rating, path)]"""
+    files = []
+    for name in sorted(set(tiers.list_stats_files())):
+        match = STATS_FILE_PATTERN.match(name)
+        if match and match.group(1) == year_month:
+            file_path = tiers.locate_stats_file(name)
+            if file_path:
+                files.append((match.group(2), match.group(3), file_path))
+    return files
+
+
+def run_batch(args):
+    """处理一个月份的所有格式和评级 / Process every format and rating of a month"""
+    year_month = args.month or tiers.get_latest_stats_month()
+    files = list_month_files(year_month) if year_month else []
+    if not files:
+        print("Error: No statistics files found")
+        return
+
+    print(f"Detecting speed creep in {len(files)} statistics files from {year_month}...")
+    rows = []
+    for format_code, rating_threshold, stats_path in files:
+        usage_data = (tiers.load_usage_file(stats_path) or {}).get("data", {})
+        if not usage_data:
+            print(f"Warning: No usage data in {os.path.basename(stats_path)}")
+            continue
+        records = calculate_speed_creep(usage_data, format_code, args.window, args.min_usage, args.min_share)
+        print(f"  {format_code:<28} {rating_threshold:>5}: {len(records)} creep record(s)")
+        rows.extend(iter_speed_creep_rows(records, format_code, rating_threshold))
+        if records and (args.html or args.excel):
+            export_speed_creep_reports(records, usage_data, stats_path, format_code, rating_threshold, args)
+
+    print(f"Found {len(rows)} speed creep records")
+    if args.csv:
+        export_speed_creep_csv(rows, tiers.build_output_filepath("all", year_month, "csv", args.output, prefix="Speed_Creep"))
+
+
+def run_format(args):
+    """处理一个格式 / Process one format"""
+    available_ratings = tiers.get_available_ratings(args.format)
+    if not available_ratings:
+        print(f"Error: No data files found for format '{args.format}'")
+        return
+    rating_threshold = args.rating
+    if not rating_threshold:
+        rating_threshold = available_ratings[-1]
+        print(f"Rating not specified, using highest rating: {rating_threshold}")
+    elif rating_threshold not in available_ratings:
+        print(f"Error: Rating '{rating_threshold}' is not available for format '{args.format}'")
+        print(f"Available ratings: {', '.join(available_ratings)}")
+        return
+
+    stats_path, is_outdated = tiers.find_usage_data_file(args.format, rating_threshold, args.month)
+    usage_data = (tiers.load_usage_file(stats_path) or {}).get("data", {}) if stats_path else {}
+    if not usage_data:
+        print("Error: Unable to get usage data")
+        return
+    if is_outdated:
+        print("Warning: Using outdated statistics data")
+
+    records = calculate_speed_creep(usage_data, args.format, args.window, args.min_usage, args.min_share)
+    print(f"Found {len(records)} speed creep records in {args.format} (rating {rating_threshold}+)")
+    if records:
+        print_speed_creep(records, args.top_n)
+    if args.csv and records:
+        export_speed_creep_csv(iter_speed_creep_rows(records, args.format, rating_threshold),
+                               tiers.build_output_filepath(args.format, rating_threshold, "csv", args.output, prefix="Speed_Creep"))
+    if args.html or args.excel:
+        export_speed_creep_reports(records, usage_data, stats_path, args.format, rating_threshold, args)
+
+
+def main():
+    """主函数 / Main function"""
+    parser = argparse.ArgumentParser(description="Find spreads tuned to sit just above another Pokemon's dominant speed")
+    parser.add_argument("format", nargs='?', help="Format code (e.g.: gen9ou)")
+    parser.add_argument("rating", nargs='?', help="Rating threshold (default: highest rating)")
+    parser.add_argument("--all", action="store_true", help="Process every format and rating of the month")
+    parser.add_argument("--month", "-m", help="Statistics month YYYY-MM (--all default: latest month in data directory)")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help=f"How many points above the target speed still count as creep (default: {DEFAULT_WINDOW})")
+    parser.add_argument("--min-usage", "-u", type=float, default=DEFAULT_MIN_USAGE, help=f"Minimum usage rate of Pokemon considered (default: {DEFAULT_MIN_USAGE})")
+    parser.add_argument("--min-share", type=float, default=DEFAULT_MIN_SHARE, help=f"Minimum share of a Pokemon's spreads in the creep cluster (default: {DEFAULT_MIN_SHARE})")
+    parser.add_argument("--top-n", "-n", type=int, default=DEFAULT_PRINTED, help=f"Number of creep records printed (default: {DEFAULT_PRINTED})")
+    parser.add_argument("--html", "-H", action="store_true", help="Export HTML speed tier reports with a speed creep table")
+    parser.add_argument("--excel", action="store_true", help="Export Excel speed tier reports with a speed creep sheet")
+    parser.add_argument("--csv", action="store_true", help="Export speed creep records as CSV (one combined file with --all)")
+    parser.add_argument("--sprites", choices=tiers.SPRITE_MODES, default="sheet", help="HTML sprite source (default: sheet)")
+    parser.add_argument("--translate", "-t", action="store_true", help="Use Chinese Pokemon names")
+    parser.add_argument("--output", "-o", default=".", help="Output directory (default: current directory)")
+
+    args = parser.parse_args()
+    if not args.all and not args.format:
+        parser.error("Specify a format code or --all")
+    if args.window < 1:
+        parser.error("--window must be at least 1")
+
+    print("Loading data...")
+    tiers.load_all_data(use_translation=args.translate)
+    if args.all:
+        run_batch(args)
+    else:
+        run_format(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Speed Tier History
+速度线历史
+Reduce every statistics file of many months to per-Pokemon speed histories within a memory budget
+
+用法 / Usage:
+python speed_history.py [options]
+
+例如 / Examples:
+python speed_history.py
+python speed_history.py --formats gen9ou gen9vgc2025regi --ratings 1500 1760
+python speed_history.py --months 2024-08 2025-07 --memory-budget 512 --workers 2 -o history.jsonl
+
+可选参数 / Optional Arguments:
+--months           月份范围 起始 [结束]（默认: 数据目录和归档中的全部月份） / Month range FROM [TO] (default: every month in the data directory and archives)
+--formats          只处理这些格式（默认: 全部） / Only these formats (default: all)
+--ratings          只处理这些评级（默认: 全部） / Only these ratings (default: all)
+--memory-budget    内存预算 MB（默认: 1024） / Memory budget in MB (default: 1024)
+--workers, -w      解析统计文件的进程数，0表示在本进程中解析（默认: CPU数） / Processes parsing statistics files, 0 parses in this process (default: CPU count)
+--spill-dir        溢出文件目录（默认: 系统临时目录） / Directory for spill files (default: system temporary directory)
+--output, -o       输出的JSON Lines文件（默认: speed_history.jsonl） / Output JSON Lines file (default: speed_history.jsonl)
+
+每个统计文件归约为未过滤的速度线（有效的速度线缓存直接使用，否则解析并写入缓存），解析出的文档在归约结束后立即释放。
+文件按大小从大到小调度，同时解析的文件的估计内存（文件大小的 PARSED_SIZE_FACTOR 倍）不超过预算的 3/4；
+按 (格式, 评级, 宝可梦) 汇总的各月记录超过预算的 1/4 时，排序后写入溢出文件，最后与内存中的部分归并输出，
+因此峰值内存与处理的月份数无关。预算不包括每个进程的解释器和参考数据。
+Each statistics file is reduced to its unfiltered speed tiers (a valid speed tier cache is used as is, otherwise the
+file is parsed and the cache written), and the parsed document is released as soon as the reduction finishes. Files
+are scheduled largest first, keeping the estimated memory of the files being parsed at once (PARSED_SIZE_FACTOR times
+their size) within 3/4 of the budget. When the monthly records collected per (format, rating, Pokemon) exceed 1/4 of
+the budget, they are sorted and written to a spill file, and at the end the spill files and what remains in memory
+are merged into the output, so peak memory does not depend on how many months are processed. The budget does not
+cover each process's interpreter and reference data.
+
+输出每行为 {"format", "rating", "pokemon", "history": {月份: {"usage", "speeds": [[速度, 速度占比], ...]}}}。
+Each output line is {"format", "rating", "pokemon", "history": {month: {"usage", "speeds": [[speed, speed share], ...]}}}.
+"""
+
+import os
+import io
+import re
+import sys
+import json
+import heapq
+import shutil
+import argparse
+import tempfile
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import export_speed_tiers as tiers
+import atomic_files
+import pipeline_profiler as profiler
+import stats_archive
+
+# 统计文件名：月份-格式-评级.json / Statistics file name: month-format-rating.json
+HISTORY_FILE_PATTERN = re.compile(r"^(\d{4}-\d{2})-(.+)-(\d+)\.json$")
+
+# 解析后的文档约为文件大小的倍数（含读取的文本） / Parsed documents take about this multiple of the file size (read text included)
+PARSED_SIZE_FACTOR = 8
+
+# 汇总记录可使用的预算比例，其余留给解析中的文件 / Share of the budget for collected records, the rest is for files being parsed
+AGGREGATE_BUDGET_SHARE = 0.25
+
+# 汇总中每条月份记录和每个速度的估计字节数 / Estimated bytes per monthly record and per speed in the collected records
+HISTORY_RECORD_BYTES = 600
+HISTORY_SPEED_BYTES = 150
+
+DEFAULT_MEMORY_BUDGET_MB = 1024
+DEFAULT_OUTPUT = "speed_history.jsonl"
+
+
+def get_stats_file_size(filename, file_path):
+    """统计文件未压缩的大小，归档中的文件取索引中的大小 / Uncompressed size of a statistics file, taken from the index for archived files"""
+    member = stats_archive.split_member_path(file_path)
+    if member:
+        index = stats_archive.read_archive_index(member[0]) or {}
+        return index.get(filename, {}).get('size', 0)
+    return os.path.getsize(file_path)
+
+
+def list_history_files(month_range=None, formats=None, ratings=None):
+    """列出要处理的统计文件，按大小从大到小 / List the statistics files to process, largest first
+
+    返回 [{'name', 'month', 'format', 'rating', 'path', 'size'}] / Returns [{'name', 'month', 'format', 'rating', 'path', 'size'}]
+    """
+    files = []
+    for name in sorted(set(tiers.list_stats_files())):
+        match = HISTORY_FILE_PATTERN.match(name)
+        if not match:
+            continue
+        month, format_code, rating = match.groups()
+        if month_range and not month_range[0] <= month <= month_range[-1]:
+            continue
+        if (formats and format_code not in formats) or (ratings and rating not in ratings):
+            continue
+        file_path = tiers.locate_stats_file(name)
+        if file_path:
+            files.append({'name': name, 'month': month, 'format': format_code, 'rating': rating,
+                          'path': file_path, 'size': get_stats_file_size(name, file_path)})
+    files.sort(key=lambda file: file['size'], reverse=True)
+    return files
+
+
+def estimate_document_bytes(file):
+    """解析一个统计文件的估计内存 / Estimated memory of parsing one statistics file"""
+    return file['size'] * PARSED_SIZE_FACTOR
+
+
+def init_history_worker():
+    """工作进程初始化：加载参考数据 / Worker initializer: load the reference data"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        tiers.load_all_data()
+
+
+def reduce_history_file(file):
+    """把一个统计文件归约为 {宝可梦: {'usage', 'speeds': [[速度, 速度占比]]}} / Reduce one statistics file to {Pokemon: {'usage', 'speeds': [[speed, speed share]]}}
+
+    解析出的文档只存在于 build_speed_tier_cache 内部，返回前即被释放 / The parsed document only lives inside
+    build_speed_tier_cache and is released before this returns
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        speed_tiers_list = tiers.load_cached_speed_tiers(file['path'], file['format'])
+        if speed_tiers_list is None:
+            speed_tiers_list = tiers.build_speed_tier_cache(file['path'], file['format'])[0] or []
+
+    records = {}
+    for tier in speed_tiers_list:
+        for pokemon in tier['pokemon_list']:
+            record = records.setdefault(pokemon['name'], {'usage': pokemon['usage'], 'speeds': []})
+            record['speeds'].append([tier['speed'], pokemon['speed_usage_ratio']])
+    return records
+
+
+def create_history_state(memory_budget_mb, spill_directory):
+    """创建汇总状态 / Create the collection state"""
+    return {
+        'aggregates': {},
+        'aggregate_bytes': 0,
+        'aggregate_budget': int(memory_budget_mb * 1024 * 1024 * AGGREGATE_BUDGET_SHARE),
+        'spill_directory': spill_directory,
+        'runs': [],
+        'files': 0
+    }
+
+
+def collect_history_records(state, file, records):
+    """把一个文件的归约结果并入汇总，超出预算时溢出到磁盘 / Merge one file's reduction into the collection, spilling to disk over budget"""
+    aggregates = state['aggregates']
+    for pokemon_name, record in records.items():
+        key = (file['format'], file['rating'], pokemon_name)
+        months = aggregates.get(key)
+        if months is None:
+            months = aggregates[key] = {}
+        months[file['month']] = record
+        state['aggregate_bytes'] += HISTORY_RECORD_BYTES + HISTORY_SPEED_BYTES * len(record['speeds'])
+    state['files'] += 1
+    if state['aggregate_bytes'] > state['aggregate_budget']:
+        spill_history_records(state)
+
+
+def spill_history_records(state):
+    """把汇总按键排序写入一个溢出文件并清空 / Write the collection sorted by key to a spill file and clear it"""
+    if not state['aggregates']:
+        return
+    run_path = os.path.join(state['spill_directory'], f"history_run_{len(state['runs']):04d}.jsonl")
+    with open(run_path, 'w', encoding='utf-8') as f:
+        for key in sorted(state['aggregates']):
+            f.write(json.dumps([key, state['aggregates'][key]], ensure_ascii=False, separators=(',', ':')))
+            f.write('\n')
+    state['runs'].append(run_path)
+    state['aggregates'] = {}
+    state['aggregate_bytes'] = 0
+
+
+def iter_spill_run(run_path):
+    """逐行读取溢出文件，产生 (键, {月份: 记录}) / Read a spill file line by line, yielding (key, {month: record})"""
+    with open(run_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            key, months = json.loads(line)
+            yield tuple(key), months
+
+
+def iter_merged_history(state):
+    """归并溢出文件和内存中的汇总，按键顺序产生 (键, {月份: 记录}) / Merge the spill files and in-memory collection, yielding (key, {month: record}) in key order"""
+    in_memory = ((key, state['aggregates'][key]) for key in sorted(state['aggregates']))
+    runs = [iter_spill_run(run_path) for run_path in state['runs']]
+    current_key, current_months = None, None
+    for key, months in heapq.merge(in_memory, *runs, key=lambda item: item[0]):
+        if key != current_key:
+            if current_key is not None:
+                yield current_key, current_months
+            current_key, current_months = key, {}
+        current_months.update(months)
+    if current_key is not None:
+        yield current_key, current_months
+
+
+def write_history(state, output_path):
+    """把归并后的历史写入JSON Lines文件，返回行数 / Write the merged history to a JSON Lines file, returning the line count"""
+    count = 0
+    with atomic_files.atomic_write(output_path) as f:
+        for (format_code, rating, pokemon_name), months in iter_merged_history(state):
+            f.write(json.dumps({'format': format_code, 'rating': rating, 'pokemon': pokemon_name,
+                                'history': {month: months[month] for month in sorted(months)}},
+                               ensure_ascii=False, separators=(',', ':')))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def pick_next_file(pending, reserved_bytes, document_budget):
+    """取出能放进剩余预算的最大文件；没有正在解析的文件时总会取出最大的 / Take the largest file fitting the remaining budget; the largest is always taken when nothing is being parsed"""
+    for index, file in enumerate(pending):
+        if reserved_bytes + estimate_document_bytes(file) <= document_budget:
+            return pending.pop(index)
+    if reserved_bytes == 0 and pending:
+        print(f"Warning: {pending[0]['name']} alone exceeds the memory budget")
+        return pending.pop(0)
+    return None
+
+
+def run_history_batch(files, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, workers=None, spill_directory=None,
+                      output_path=DEFAULT_OUTPUT):
+    """在内存预算内处理所有文件并写出历史，返回摘要 / Process every file within the memory budget and write the history, returning a summary"""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    document_budget = memory_budget_mb * 1024 * 1024 * (1 - AGGREGATE_BUDGET_SHARE)
+    spill_root = tempfile.mkdtemp(prefix="speed_history_", dir=spill_directory)
+    state = create_history_state(memory_budget_mb, spill_root)
+    pending = sorted(files, key=lambda file: file['size'], reverse=True)
+    failed = 0
+
+    try:
+        if workers == 0:
+            for file in pending:
+                # 与工作进程相同：一个文件出错只计入失败，不中断批处理 / As with workers, one bad file only counts as failed, without aborting the batch
+                try:
+                    records = reduce_history_file(file)
+                except Exception as e:
+                    print(f"Error processing {file['name']}: {e}")
+                    failed += 1
+                    continue
+                collect_history_records(state, file, records)
+        else:
+            # 先编译数据包，避免每个工作进程各自重建 / Compile the data bundle first so workers do not each rebuild it
+            tiers.load_data_bundle()
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_history_worker) as executor:
+                running = {}
+                reserved_bytes = 0
+                while pending or running:
+                    while pending and len(running) < workers:
+                        file = pick_next_file(pending, reserved_bytes, document_budget)
+                        if file is None:
+                            break
+                        running[executor.submit(reduce_history_file, file)] = file
+                        reserved_bytes += estimate_document_bytes(file)
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        file = running.pop(future)
+                        reserved_bytes -= estimate_document_bytes(file)
+                        try:
+                            records = future.result()
+                        except Exception as e:
+                            print(f"Error processing {file['name']}: {e}")
+                            failed += 1
+                            continue
+                        collect_history_records(state, file, records)
+
+        spills = len(state['runs'])
+        lines = write_history(state, output_path)
+    finally:
+        shutil.rmtree(spill_root, ignore_errors=True)
+
+    return {'files': state['files'], 'failed': failed, 'spills': spills, 'lines': lines,
+            'peak_rss_kb': profiler.get_peak_rss_kb(), 'worker_peak_rss_kb': profiler.get_children_peak_rss_kb()}
+
+
+def main():
+    """主函数 / Main function"""
+    parser = argparse.ArgumentParser(description="Reduce every statistics file of many months to per-Pokemon speed histories within a memory budget")
+    parser.add_argument("--months", nargs='+', metavar="YYYY-MM", help="Month range FROM [TO] (default: every month in the data directory and archives)")
+    parser.add_argument("--formats", nargs='+', help="Only these formats (default: all)")
+    parser.add_argument("--ratings", nargs='+', help="Only these ratings (default: all)")
+    parser.add_argument("--memory-budget", type=float, default=DEFAULT_MEMORY_BUDGET_MB, help=f"Memory budget in MB (default: {DEFAULT_MEMORY_BUDGET_MB})")
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count() or 1, help="Processes parsing statistics files, 0 parses in this process (default: CPU count)")
+    parser.add_argument("--spill-dir", help="Directory for spill files (default: system temporary directory)")
+    parser.add_argument("--output", "-o", default=DEFAULT_OUTPUT, help=f"Output JSON Lines file (default: {DEFAULT_OUTPUT})")
+
+    args = parser.parse_args()
+    if args.months and len(args.months) > 2:
+        parser.error("--months takes FROM [TO]")
+
+    print("Loading data...")
+    tiers.load_all_data()
+    files = list_history_files(args.months, args.formats, args.ratings)
+    if not files:
+        print("Error: No statistics files found")
+        sys.exit(1)
+    total_mb = sum(file['size'] for file in files) / 1024 ** 2
+    months = sorted({file['month'] for file in files})
+    print(f"Processing {len(files)} files ({total_mb:.1f} MB) from {len(months)} month(s) "
+          f"with a {args.memory_budget:g} MB budget and {args.workers} worker(s)...")
+
+    summary = run_history_batch(files, args.memory_budget, args.workers, args.spill_dir, args.output)
+    print(f"History of {summary['lines']} Pokemon written: {args.output} "
+          f"({summary['files']} files, {summary['spills']} spill(s), {summary['failed']} failed)")
+    if summary['peak_rss_kb'] is not None:
+        print(f"Peak RSS: {summary['peak_rss_kb'] / 1024:.1f} MB (main), {summary['worker_peak_rss_kb'] / 1024:.1f} MB (largest worker)")
+
+
+if __name__ == "__main__":
+    main()
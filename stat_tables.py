@@ -0,0 +1,233 @@
+"""
+Stat Lookup Tables
+属性值查找表
+Precomputed stat values per generation and level, so calculating a spread's stats is table indexing
+
+用法 / Usage:
+import stat_tables
+stat_tables.calculate_spread_stats("Jolly:4/252/0/0/0/252", {"hp": 80, "atk": 120, ...}, generation=9, level=50)
+
+每个 (世代规则, 等级, 属性, 种族值, 性格槽) 对应一行，以配招中的努力值文本为键，首次用到时计算并缓存。
+第三世代起使用现代公式：个体值31（速度和攻击被性格降低且没有努力值时为0），性格倍率1.1/0.9，HP为种族值1时恒为1。
+第一、二世代没有性格，使用能力值(DV) 15和能力经验：统计数据中的努力值与Showdown相同，能力经验项为 努力值/4（最大63），
+即 ((种族值+DV)*2 + 努力值/4) * 等级/100 + 5，HP为 + 等级 + 10；第一世代的特攻和特防都使用特殊种族值。
+旧世代的种族值先按 get_generation_base_stats 还原（第一世代的特殊、之后世代修改过的种族值）。
+One row per (generation rules, level, stat, base stat, nature slot), keyed by the EV text found in spreads,
+computed on first use and cached. Generation 3 onwards uses the modern formula: 31 IVs (0 when Speed or Attack is
+lowered by the nature and has no EVs), nature multipliers 1.1/0.9, and a base HP of 1 always gives 1 HP.
+Generations 1 and 2 have no natures and use DV 15 with stat experience: the statistics' EVs are Showdown's, whose
+stat experience term is EVs / 4 (at most 63), i.e. ((base + DV) * 2 + EVs / 4) * level / 100 + 5, plus level + 10
+for HP; generation 1 Special Attack and Special Defense both use the Special base stat.
+Base stats of older generations are restored by get_generation_base_stats first (generation 1 Special, base stats
+changed in later generations).
+"""
+
+import re
+import math
+
+# 属性顺序，与配招 "性格:HP/攻/防/特攻/特防/速度" 一致 / Stat order, as in "Nature:HP/Atk/Def/SpA/SpD/Spe" spreads
+STAT_KEYS = ['hp', 'atk', 'def', 'spa', 'spd', 'spe']
+
+# 性格：(提高的属性, 降低的属性) / Natures: (raised stat, lowered stat)
+NATURE_MODIFIERS = {
+    'Hardy': (None, None), 'Lonely': ('atk', 'def'), 'Brave': ('atk', 'spe'), 'Adamant': ('atk', 'spa'),
+    'Naughty': ('atk', 'spd'), 'Bold': ('def', 'atk'), 'Docile': (None, None), 'Relaxed': ('def', 'spe'),
+    'Impish': ('def', 'spa'), 'Lax': ('def', 'spd'), 'Timid': ('spe', 'atk'), 'Hasty': ('spe', 'def'),
+    'Serious': (None, None), 'Jolly': ('spe', 'spa'), 'Naive': ('spe', 'spd'), 'Modest': ('spa', 'atk'),
+    'Mild': ('spa', 'def'), 'Quiet': ('spa', 'spe'), 'Bashful': (None, None), 'Rash': ('spa', 'spd'),
+    'Calm': ('spd', 'atk'), 'Gentle': ('spd', 'def'), 'Sassy': ('spd', 'spe'), 'Careful': ('spd', 'spa'),
+    'Quirky': (None, None)
+}
+
+# 被性格降低且没有努力值时使用0个体的属性 / Stats that use 0 IVs when lowered by the nature without EVs
+MINIMIZED_STATS = ('atk', 'spe')
+
+# 性格槽：不变、提高、降低 / Nature slots: neutral, raised, lowered
+NATURE_SLOT_MULTIPLIERS = (1.0, 1.1, 0.9)
+NEUTRAL_SLOTS = (0, 0, 0, 0, 0, 0)
+
+# 第一、二世代的能力值 / DV of generations 1 and 2
+LEGACY_DV = 15
+
+# 个体值：正常、最低 / IVs: normal, minimized
+MAX_IV = 31
+MINIMIZED_IV = 0
+
+# 单项努力值上限 / Maximum EVs in one stat
+MAX_EVS = 255
+
+# 第一世代的特殊种族值，只列出与现代特攻不同的宝可梦（其余的特殊等于特攻） /
+# Generation 1 Special base stats, only where they differ from the modern Special Attack (otherwise Special is Special Attack)
+GEN1_SPECIAL_BASE_STATS = {
+    'charmander': 50, 'charmeleon': 65, 'charizard': 85, 'sandshrew': 30, 'sandslash': 55, 'nidoking': 75,
+    'vulpix': 65, 'ninetales': 100, 'jigglypuff': 25, 'wigglytuff': 50, 'zubat': 40, 'golbat': 75, 'paras': 55,
+    'parasect': 80, 'diglett': 45, 'dugtrio': 70, 'psyduck': 50, 'golduck': 80, 'growlithe': 50, 'arcanine': 80,
+    'tentacool': 100, 'tentacruel': 120, 'slowbro': 80, 'seel': 70, 'dewgong': 95, 'drowzee': 90, 'hypno': 115,
+    'chansey': 105, 'goldeen': 50, 'seaking': 80, 'jynx': 95, 'electabuzz': 85, 'magmar': 85, 'tauros': 70,
+    'magikarp': 20, 'gyarados': 100, 'lapras': 95, 'eevee': 65, 'flareon': 110, 'porygon': 75, 'kabuto': 45,
+    'kabutops': 70, 'articuno': 125
+}
+
+# 之后世代修改过的种族值：修改的世代 -> {宝可梦ID: 修改前的种族值}，更早的世代使用修改前的值 /
+# Base stats changed in later generations: generation of the change -> {Pokemon ID: base stats before it}, used by earlier generations
+BASE_STAT_CHANGES = {
+    6: {
+        'butterfree': {'spa': 80}, 'beedrill': {'atk': 80}, 'pidgeot': {'spe': 91}, 'pikachu': {'def': 30, 'spd': 40},
+        'raichu': {'spe': 100}, 'nidoqueen': {'atk': 82}, 'nidoking': {'atk': 92}, 'clefable': {'spa': 85},
+        'wigglytuff': {'spa': 75}, 'vileplume': {'spa': 100}, 'poliwrath': {'atk': 85}, 'alakazam': {'spd': 85},
+        'victreebel': {'spd': 60}, 'golem': {'atk': 110}, 'ampharos': {'def': 75}, 'bellossom': {'def': 85},
+        'azumarill': {'spa': 50}, 'jumpluff': {'spd': 85}, 'beautifly': {'spa': 90}, 'exploud': {'spd': 63},
+        'staraptor': {'spd': 50}, 'roserade': {'def': 55}, 'stoutland': {'atk': 100}, 'unfezant': {'atk': 105},
+        'gigalith': {'spd': 70}, 'seismitoad': {'atk': 85}, 'leavanny': {'spd': 70}, 'scolipede': {'atk': 90},
+        'krookodile': {'def': 70}
+    },
+    7: {
+        'arbok': {'atk': 85}, 'dugtrio': {'atk': 80}, 'farfetchd': {'atk': 65}, 'dodrio': {'spe': 100},
+        'electrode': {'spe': 140}, 'exeggutor': {'spd': 65}, 'noctowl': {'spa': 76}, 'ariados': {'spd': 60},
+        'qwilfish': {'def': 75}, 'magcargo': {'hp': 50, 'spa': 80}, 'corsola': {'hp': 55, 'def': 85, 'spd': 85},
+        'mantine': {'hp': 65}, 'pelipper': {'spa': 85}, 'masquerain': {'spa': 80, 'spe': 60}, 'delcatty': {'spe': 70},
+        'volbeat': {'def': 55, 'spd': 75}, 'illumise': {'def': 55, 'spd': 75}, 'lunatone': {'hp': 70},
+        'solrock': {'hp': 70}, 'chimecho': {'hp': 65, 'def': 70, 'spd': 80}, 'woobat': {'hp': 55},
+        'crustle': {'atk': 95}, 'beartic': {'atk': 110}, 'cryogonal': {'hp': 70, 'def': 30}
+    },
+    8: {
+        'aegislash': {'def': 150, 'spd': 150}, 'aegislashblade': {'atk': 150, 'spa': 150}
+    }
+}
+
+# 没有世代前缀的格式使用的世代 / Generation used for formats without a generation prefix
+LATEST_GENERATION = 9
+
+GENERATION_PATTERN = re.compile(r"^gen(\d+)")
+
+# (世代规则, 等级, 属性, 种族值, 性格槽) -> {努力值文本: 属性值} / (generation rules, level, stat, base stat, nature slot) -> {EV text: stat value}
+statRows = {}
+
+# 性格 -> 每个属性的性格槽 / Nature -> nature slot of each stat
+natureSlotCache = {}
+
+
+def get_format_generation(format_code):
+    """格式代码中的世代 / Generation of a format code"""
+    match = GENERATION_PATTERN.match(format_code.lower())
+    return int(match.group(1)) if match else LATEST_GENERATION
+
+
+def get_generation_rules(generation):
+    """使用的公式：'legacy' 为第一、二世代，否则为 'modern' / Formula in use: 'legacy' for generations 1 and 2, 'modern' otherwise"""
+    return 'legacy' if generation <= 2 else 'modern'
+
+
+def compute_stat(rules, level, is_hp, base, ev_bucket, iv, multiplier):
+    """按公式计算一个属性值（只在建表时调用） / Compute one stat by formula (only called while building rows)"""
+    if rules == 'legacy':
+        core = math.floor(((base + LEGACY_DV) * 2 + ev_bucket) * level / 100)
+        return core + level + 10 if is_hp else core + 5
+    if is_hp:
+        # 种族值1的HP恒为1（脱壳忍者） / Base HP 1 is always 1 HP (Shedinja)
+        return 1 if base == 1 else math.floor((2 * base + iv + ev_bucket) * level / 100) + level + 10
+    return math.floor((math.floor((2 * base + iv + ev_bucket) * level / 100) + 5) * multiplier)
+
+
+def get_stat_row(rules, level, stat, base, nature_slot):
+    """一个属性的查找行 {努力值文本: 属性值}，覆盖0到255的努力值 / Lookup row of one stat {EV text: stat value}, covering 0 to 255 EVs
+
+    以配招中的努力值文本为键，查表时不用转换整数 / Keyed by the EV text found in spreads, so lookups need no integer conversion
+    """
+    key = (rules, level, stat, base, nature_slot)
+    row = statRows.get(key)
+    if row is None:
+        multiplier = NATURE_SLOT_MULTIPLIERS[nature_slot]
+        # 被性格降低且没有努力值时使用最低个体 / Minimized IVs when lowered by the nature without EVs
+        minimized = nature_slot == 2 and stat in MINIMIZED_STATS
+        row = {str(ev): compute_stat(rules, level, stat == 'hp', base, ev >> 2,
+                                     MINIMIZED_IV if minimized and ev == 0 else MAX_IV, multiplier)
+               for ev in range(MAX_EVS + 1)}
+        statRows[key] = row
+    return row
+
+
+def get_nature_slots(nature):
+    """性格对每个属性的性格槽 / Nature slot of each stat for a nature"""
+    slots = natureSlotCache.get(nature)
+    if slots is None:
+        raised, lowered = NATURE_MODIFIERS.get(nature, (None, None))
+        slots = tuple(1 if stat == raised and raised != lowered else 2 if stat == lowered and raised != lowered else 0
+                      for stat in STAT_KEYS)
+        natureSlotCache[nature] = slots
+    return slots
+
+
+def get_generation_base_stats(pokemon_id, base_stats, generation):
+    """某世代的种族值：还原之后世代的修改，第一世代的特攻和特防使用特殊 / Base stats in a generation: later changes undone, generation 1 Special Attack and Special Defense set to Special"""
+    changes = [BASE_STAT_CHANGES[changed][pokemon_id] for changed in BASE_STAT_CHANGES
+               if changed > generation and pokemon_id in BASE_STAT_CHANGES[changed]]
+    if generation > 1 and not changes:
+        return base_stats
+    restored = dict(base_stats)
+    # 从最晚的修改往前还原 / Undo from the latest change backwards
+    for change in reversed(changes):
+        restored.update(change)
+    if generation == 1 and 'spa' in restored:
+        restored['spa'] = restored['spd'] = GEN1_SPECIAL_BASE_STATS.get(pokemon_id, restored['spa'])
+    return restored
+
+
+def get_base_stat(base_stats, stat, generation):
+    """计算某项属性使用的种族值 / Base stat used for a stat"""
+    # 第一世代只有特殊，特防使用特攻种族值 / Generation 1 has a single Special, so Special Defense uses the Special Attack base
+    return base_stats['spa'] if stat == 'spd' and generation == 1 else base_stats[stat]
+
+
+def get_nature_row(stat, base, nature, generation, level):
+    """某性格下一项属性的查找行 / Lookup row of one stat under a nature"""
+    nature_slot = get_nature_slots(nature)[STAT_KEYS.index(stat)] if generation > 2 else 0
+    return get_stat_row(get_generation_rules(generation), level, stat, base, nature_slot)
+
+
+def get_nature_rows(base_stats, nature, generation, level):
+    """某性格下六项属性的查找行 / Lookup rows of all six stats under a nature"""
+    rules = get_generation_rules(generation)
+    nature_slots = get_nature_slots(nature) if generation > 2 else NEUTRAL_SLOTS
+    return tuple(get_stat_row(rules, level, stat, get_base_stat(base_stats, stat, generation), nature_slot)
+                 for stat, nature_slot in zip(STAT_KEYS, nature_slots))
+
+
+def lookup_stat(row, ev_text):
+    """按努力值文本查表，其他写法（前导零、超过255等）先规范化 / Look up by EV text, normalizing other forms (leading zeros, above 255, ...) first"""
+    value = row.get(ev_text)
+    if value is None:
+        value = row[str(min(max(int(ev_text), 0), MAX_EVS))]
+    return value
+
+
+def parse_spread(spread):
+    """解析 "性格:HP/攻/防/特攻/特防/速度"，返回 (性格, 努力值列表) / Parse "Nature:HP/Atk/Def/SpA/SpD/Spe", returning (nature, EV list)"""
+    nature, evs = spread.split(':')
+    return nature, [int(ev) for ev in evs.split('/')]
+
+
+def calculate_spread_stats(spread, base_stats, generation, level, nature_rows=None):
+    """查表计算一个配招的六项属性，返回 (属性值列表, 性格, 努力值文本列表) /
+    Look up a spread's six stats, returning (stat values, nature, EV texts)
+
+    nature_rows 为同一只宝可梦的 {性格: 查找行} 缓存，在它的多个配招间复用 /
+    nature_rows is one Pokemon's {nature: lookup rows} cache, reused across its spreads
+    """
+    nature, evs = spread.split(':')
+    ev_texts = evs.split('/')
+    rows = nature_rows.get(nature) if nature_rows is not None else None
+    if rows is None:
+        rows = get_nature_rows(base_stats, nature, generation, level)
+        if nature_rows is not None:
+            nature_rows[nature] = rows
+    try:
+        values = [row[ev_text] for row, ev_text in zip(rows, ev_texts)]
+    except KeyError:
+        values = [lookup_stat(row, ev_text) for row, ev_text in zip(rows, ev_texts)]
+    return values, nature, ev_texts
+
+
+def calculate_stat(stat, base, ev, nature, generation, level):
+    """查表计算单项属性 / Calculate a single stat by table lookup"""
+    return lookup_stat(get_nature_row(stat, base, nature, generation, level), str(ev))
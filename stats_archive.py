@@ -0,0 +1,233 @@
+"""
+Monthly Statistics Archive
+月度统计数据归档
+Pack a past month's statistics files into one compressed archive that still allows reading a single file
+
+用法 / Usage:
+import stats_archive
+stats_archive.write_archive("stats/archive/2025-06.statsarc", {"2025-06-gen9ou-0.json": "stats/2025-06-gen9ou-0.json"})
+stats_archive.read_member("stats/archive/2025-06.statsarc/2025-06-gen9ou-0.json")
+
+归档由每个文件各自的gzip成员依次拼接而成，末尾是JSON索引（偏移、压缩长度、原始大小、SHA-256）和定长尾部。
+读取单个文件只需读取尾部和索引，再定位并解压该文件的成员，耗时与该文件大小成正比，与整个月的数据量无关。
+归档中的文件用 "<归档路径>/<文件名>" 形式的路径表示，导出器和站点生成器可以像普通文件一样使用。
+An archive is one gzip member per file, concatenated, followed by a JSON index (offset, compressed length, original
+size, SHA-256) and a fixed-size trailer. Reading one file only reads the trailer and index, then seeks to and
+decompresses that file's member, so the cost is proportional to the file rather than the whole month. Archived
+files are addressed as "<archive path>/<file name>", which the exporter and site builder use like regular paths.
+"""
+
+import os
+import json
+import zlib
+import struct
+import hashlib
+import atomic_files
+
+# 归档文件扩展名 / Archive file extension
+ARCHIVE_SUFFIX = ".statsarc"
+
+# 尾部：魔数、索引偏移、索引长度 / Trailer: magic, index offset, index length
+ARCHIVE_MAGIC = b"SPDARCH1"
+ARCHIVE_VERSION = 1
+TRAILER = struct.Struct("<8sQQ")
+
+# gzip压缩级别和读写块大小 / gzip compression level and I/O chunk size
+COMPRESSION_LEVEL = 6
+CHUNK_SIZE = 1 << 20
+
+# 按 (路径, 修改时间, 大小) 缓存的索引 / Indexes cached by (path, mtime, size)
+archiveIndexCache = {}
+
+
+def get_archive_path(directory, year_month):
+    """某个月份的归档路径 / Archive path of one month"""
+    return os.path.join(directory, f"{year_month}{ARCHIVE_SUFFIX}")
+
+
+def list_archives(directory):
+    """目录中所有归档，按月份排序 / Every archive in the directory, sorted by month"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(ARCHIVE_SUFFIX))
+
+
+def read_archive_index(archive_path):
+    """读取归档索引 {文件名: 条目}，文件无效时返回None / Read the archive index {file name: entry}, or None when the file is invalid"""
+    try:
+        stat = os.stat(archive_path)
+    except OSError:
+        return None
+    cache_key = (stat.st_mtime_ns, stat.st_size)
+    cached = archiveIndexCache.get(archive_path)
+    if cached and cached[0] == cache_key:
+        return cached[1]
+
+    if stat.st_size < TRAILER.size:
+        print(f"Error: {archive_path} is not a statistics archive")
+        return None
+    try:
+        with open(archive_path, 'rb') as f:
+            f.seek(-TRAILER.size, os.SEEK_END)
+            magic, index_offset, index_length = TRAILER.unpack(f.read(TRAILER.size))
+            if magic != ARCHIVE_MAGIC or index_offset + index_length + TRAILER.size != stat.st_size:
+                print(f"Error: {archive_path} is not a statistics archive")
+                return None
+            f.seek(index_offset)
+            index = json.loads(f.read(index_length).decode('utf-8'))
+    except (OSError, ValueError, struct.error) as e:
+        print(f"Error reading archive index {archive_path}: {e}")
+        return None
+    if index.get('version') != ARCHIVE_VERSION:
+        print(f"Error: {archive_path} is not a statistics archive of version {ARCHIVE_VERSION}")
+        return None
+
+    archiveIndexCache[archive_path] = (cache_key, index['files'])
+    return index['files']
+
+
+def list_archived_files(directory):
+    """所有归档中的文件名 / File names inside every archive"""
+    names = []
+    for archive_path in list_archives(directory):
+        names.extend(read_archive_index(archive_path) or {})
+    return names
+
+
+def build_member_path(archive_path, name):
+    """归档中文件的路径 / Path of a file inside an archive"""
+    return os.path.join(archive_path, name)
+
+
+def split_member_path(path):
+    """拆分归档中文件的路径为 (归档路径, 文件名)，不是归档路径时返回None / Split an archived file path into (archive path, file name), or None"""
+    archive_path, name = os.path.split(path)
+    if archive_path.endswith(ARCHIVE_SUFFIX) and os.path.isfile(archive_path):
+        return archive_path, name
+    return None
+
+
+def find_archived_file(directory, filename):
+    """在文件所属月份的归档中查找文件，返回其路径或None / Look a file up in the archive of its month, returning its path or None"""
+    archive_path = get_archive_path(directory, filename[:len("YYYY-MM")])
+    index = read_archive_index(archive_path) if os.path.isfile(archive_path) else None
+    if index and filename in index:
+        return build_member_path(archive_path, filename)
+    return None
+
+
+def read_member(path):
+    """读取并解压归档中的一个文件，返回字节，失败时返回None / Read and decompress one archived file, returning bytes or None on failure"""
+    location = split_member_path(path)
+    index = read_archive_index(location[0]) if location else None
+    entry = index.get(location[1]) if index else None
+    if not entry:
+        print(f"Error: {path} is not in an archive")
+        return None
+
+    with open(location[0], 'rb') as f:
+        f.seek(entry['offset'])
+        compressed = f.read(entry['length'])
+    try:
+        # wbits=31 表示单个gzip成员 / wbits=31 means a single gzip member
+        data = zlib.decompress(compressed, 31)
+    except zlib.error as e:
+        print(f"Error decompressing {path}: {e}")
+        return None
+    if len(data) != entry['size']:
+        print(f"Error: {path} has {len(data)} bytes, expected {entry['size']}")
+        return None
+    return data
+
+
+def fingerprint_member(path):
+    """归档中文件的指纹，取自索引而无需解压 / Fingerprint of an archived file, taken from the index without decompressing"""
+    archive_path, name = split_member_path(path)
+    entry = read_archive_index(archive_path)[name]
+    return {'sha256': entry['sha256'], 'size': entry['size'], 'mtime_ns': os.stat(archive_path).st_mtime_ns}
+
+
+def compress_file(source_path, output):
+    """把一个文件压缩为gzip成员写入output，返回 (压缩长度, 原始大小, SHA-256) / Write one file as a gzip member to output, returning (compressed length, size, SHA-256)"""
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, 31)
+    digest = hashlib.sha256()
+    size = 0
+    length = 0
+    with open(source_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+            size += len(chunk)
+            compressed = compressor.compress(chunk)
+            output.write(compressed)
+            length += len(compressed)
+    compressed = compressor.flush()
+    output.write(compressed)
+    return length + len(compressed), size, digest.hexdigest()
+
+
+def verify_member(f, entry):
+    """解压一个成员并核对大小和SHA-256 / Decompress one member and check its size and SHA-256"""
+    f.seek(entry['offset'])
+    decompressor = zlib.decompressobj(31)
+    digest = hashlib.sha256()
+    size = 0
+    remaining = entry['length']
+    while remaining > 0:
+        chunk = f.read(min(CHUNK_SIZE, remaining))
+        if not chunk:
+            return False
+        remaining -= len(chunk)
+        data = decompressor.decompress(chunk)
+        digest.update(data)
+        size += len(data)
+    data = decompressor.flush()
+    digest.update(data)
+    size += len(data)
+    return decompressor.eof and size == entry['size'] and digest.hexdigest() == entry['sha256']
+
+
+def write_archive(archive_path, files):
+    """把文件写入归档（已有归档时合并，同名文件以新文件为准），校验后原子替换 / Write files into an archive, merging with an existing one (new files win), verify, then replace atomically
+
+    files 为 {文件名: 源文件路径}；返回新索引，校验失败时返回None且不改动已有归档 /
+    files is {file name: source path}; returns the new index, or None without touching the existing archive when verification fails
+    """
+    previous_index = read_archive_index(archive_path) if os.path.exists(archive_path) else {}
+    if previous_index is None:
+        return None
+
+    index = {}
+    os.makedirs(os.path.dirname(archive_path) or ".", exist_ok=True)
+    try:
+        with atomic_files.atomic_write(archive_path, 'w+b') as output:
+            # 已有成员按原样复制，不重新压缩 / Existing members are copied as is, without recompressing
+            if previous_index:
+                with open(archive_path, 'rb') as previous:
+                    for name, entry in previous_index.items():
+                        if name in files:
+                            continue
+                        previous.seek(entry['offset'])
+                        index[name] = dict(entry, offset=output.tell())
+                        output.write(previous.read(entry['length']))
+            for name in sorted(files):
+                offset = output.tell()
+                length, size, sha256 = compress_file(files[name], output)
+                index[name] = {'offset': offset, 'length': length, 'size': size, 'sha256': sha256}
+
+            index_data = json.dumps({'version': ARCHIVE_VERSION, 'files': index}, separators=(',', ':')).encode('utf-8')
+            index_offset = output.tell()
+            output.write(index_data)
+            output.write(TRAILER.pack(ARCHIVE_MAGIC, index_offset, len(index_data)))
+
+            # 替换前在临时文件上校验，失败时放弃写入 / Verify on the temporary file before replacing, abandoning the write on failure
+            output.flush()
+            for name, entry in index.items():
+                if not verify_member(output, entry):
+                    raise ValueError(name)
+    except ValueError as e:
+        print(f"Error: {e} failed verification, keeping the original files")
+        return None
+    except OSError as e:
+        print(f"Error writing archive {archive_path}: {e}")
+        return None
+    return index
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Turn Order Probabilities
+行动顺序概率
+Probability that each member of your team moves before each Pokemon of an opponent's team, from the opponent's usage spreads
+
+用法 / Usage:
+python turn_order.py format_code team_file (--opponents "A, B, ..." | --opponent-file file) [options]
+
+例如 / Examples:
+python turn_order.py gen9bssregi my_team.txt --opponents "Calyrex-Shadow, Ting-Lu, Chien-Pao, Koraidon, Dondozo, Ho-Oh"
+python turn_order.py gen9bssregi my_team.txt --opponents "Calyrex-Shadow, Flutter Mane" --trick-room --scarf
+python turn_order.py gen9bssregi my_team.txt --opponent-file opponent_teams.txt --json results.json
+
+可选参数 / Optional Arguments:
+--opponents        对手的宝可梦，逗号分隔 / Opponent's Pokemon, comma separated
+--opponent-file    批量对手队伍文件 / File of opponent teams for batch evaluation
+--rating, -r       评级阈值（默认: 最高评级） / Rating threshold (default: highest rating)
+--month, -m        指定统计月份 YYYY-MM / Specify statistics month YYYY-MM
+--scenario         己方速度场景（默认: neutral） / Speed scenario of your team (default: neutral)
+--opponent-scenario 对手速度场景（默认: neutral） / Speed scenario of the opponent (default: neutral)
+--trick-room       戏法空间（速度慢者先行动） / Trick Room (slower Pokemon move first)
+--scarf            按对手的讲究围巾使用率计入围巾 / Fold in the opponent's Choice Scarf usage
+--json             把完整结果导出到JSON文件 / Export the full results to a JSON file
+
+己方队伍文件为Showdown导出的文本，只使用第一支队伍，速度按配置精确计算（讲究围巾、铁球自动计入）。
+对手每只宝可梦的速度分布来自统计数据中的全部配招（Spreads），按使用量加权，性格、个体和等级规则与速度线相同；
+--scarf 时假定道具与配招相互独立。对每一对宝可梦精确计算先手、同速、后手概率，同速时各50%，
+"先行动" 为先手概率加一半同速概率；戏法空间下先后手互换，同速仍各50%。
+对手队伍文件每行一支队伍（逗号分隔的宝可梦），或为Showdown导出文本；所有对手队伍共用一次向量化计算。
+Your team file is Showdown export text; only its first team is used, with exact speeds (Choice Scarf and Iron Ball
+are applied). Each opponent Pokemon's speed distribution comes from every spread in the statistics (Spreads),
+weighted by usage, with the same nature, IV and level rules as the speed tiers; --scarf assumes items are independent
+of spreads. Move-first, tie and move-second probabilities are exact for each pair; ties are 50/50, so "moves first"
+is the move-first probability plus half the tie probability. Trick Room swaps move-first and move-second, ties stay
+50/50. Opponent team files hold one team per line (comma separated Pokemon) or Showdown export text; every opponent
+team is evaluated from one vectorized pass.
+"""
+
+import os
+import json
+import time
+import argparse
+import export_speed_tiers as tiers
+import stat_tables
+import analyze_teams
+
+# 讲究围巾的道具ID和速度倍率 / Choice Scarf item ID and speed multiplier
+SCARF_ITEM_ID = "choicescarf"
+SCARF_MULTIPLIER = 1.5
+
+
+def find_usage_entry(usage_data, species):
+    """在统计数据中查找宝可梦：先精确匹配，再按ID，最后模糊匹配 / Find a Pokemon in usage data: exact name, then ID, then fuzzy match"""
+    if species in usage_data:
+        return species
+    species_id = tiers.to_showdown_id(species)
+    for name in usage_data:
+        if tiers.to_showdown_id(name) == species_id:
+            return name
+    return tiers.fuzzy_match(species, [name for name in usage_data if name != "ALL Pokemon"])
+
+
+def build_speed_distribution(pokemon_data, base_speed, level, include_scarf=False, generation=stat_tables.LATEST_GENERATION):
+    """由全部配招得到速度分布，返回 (速度数组, 占比数组, 道具倍率数组)，没有配招时返回None /
+    Speed distribution over every spread, returning (speeds, shares, item multipliers) arrays, or None without spreads
+
+    讲究围巾只记为倍率，由 apply_distribution_scenario 与场景倍率一起应用，只取整一次 /
+    Choice Scarf is only recorded as a multiplier, applied together with the scenario's by apply_distribution_scenario
+    so it is floored once
+    """
+    import numpy as np
+
+    spreads = pokemon_data.get("Spreads", {})
+    total_spread_usage = sum(spreads.values())
+    if not total_spread_usage:
+        return None
+
+    speed_usage = {}
+    nature_rows = {}
+    for spread, spread_usage in spreads.items():
+        speed_value = tiers.calculate_spread_speed(spread, base_speed, level, generation, nature_rows)[0]
+        speed_usage[speed_value] = speed_usage.get(speed_value, 0) + spread_usage
+    speeds = np.array(list(speed_usage), dtype=np.int32)
+    shares = np.array(list(speed_usage.values()), dtype=np.float64) / total_spread_usage
+    item_multipliers = np.ones(len(speeds), dtype=np.float64)
+
+    if include_scarf:
+        items = pokemon_data.get("Items", {})
+        total_item_usage = sum(items.values())
+        scarf_share = items.get(SCARF_ITEM_ID, 0) / total_item_usage if total_item_usage else 0
+        if scarf_share > 0:
+            speeds = np.concatenate([speeds, speeds])
+            shares = np.concatenate([shares * (1 - scarf_share), shares * scarf_share])
+            item_multipliers = np.concatenate([item_multipliers, np.full(len(item_multipliers), SCARF_MULTIPLIER)])
+    return speeds, shares, item_multipliers
+
+
+def apply_distribution_scenario(distribution, scenario):
+    """对速度分布应用速度场景，道具倍率与场景倍率相乘后只取整一次（与 analyze_teams 相同），返回 (速度数组, 占比数组) /
+    Apply a speed scenario to a speed distribution, multiplying item and scenario multipliers and flooring once (as
+    analyze_teams does), returning (speeds, shares) arrays"""
+    import numpy as np
+
+    _, stage, multiplier = analyze_teams.SPEED_SCENARIOS[scenario]
+    speeds, shares, item_multipliers = distribution
+    scaled = np.array([analyze_teams.apply_speed_scenario(int(speed), stage, multiplier * float(item_multiplier))
+                       for speed, item_multiplier in zip(speeds, item_multipliers)], dtype=np.int32)
+    return scaled, shares
+
+
+def build_opponent_distributions(usage_data, species_names, format_code, include_scarf=False, scenario='neutral'):
+    """为每个对手宝可梦建立速度分布 {输入名称: 分布条目}，无法识别的跳过并提示 / Build a speed distribution per opponent Pokemon, skipping unknown ones with a message"""
+    level = tiers.get_format_level(format_code)
+    generation = stat_tables.get_format_generation(format_code)
+    distributions = {}
+    for species in species_names:
+        if species in distributions:
+            continue
+        usage_name = find_usage_entry(usage_data, species)
+        base_speed = analyze_teams.resolve_base_speed(usage_name or species, generation)
+        distribution = build_speed_distribution(usage_data[usage_name], base_speed, level, include_scarf, generation) \
+            if usage_name and base_speed is not None else None
+        if distribution is None:
+            print(f"Warning: No usage spreads for '{species}', skipped")
+            continue
+        speeds, shares = apply_distribution_scenario(distribution, scenario)
+        distributions[species] = {'name': usage_name, 'speeds': speeds, 'shares': shares}
+    return distributions
+
+
+def compute_turn_order(my_speeds, distributions, trick_room=False):
+    """向量化计算 己方 × 对手 的先手、同速、后手概率 / Vectorized move-first, tie and move-second probabilities for your Pokemon × opponents
+
+    distributions 为分布条目列表；返回numpy数组字典，形状均为 (己方, 对手)，moves_first 含一半同速 /
+    distributions is a list of distribution entries; returns a dict of numpy arrays shaped (yours, opponents), moves_first includes half the ties
+    """
+    import numpy as np
+
+    speeds = np.asarray(my_speeds, dtype=np.int32)
+    # 所有对手的速度依次排列，记录每只对手的起始位置 / Every opponent's speeds laid out in order, with each opponent's start
+    opponent_speeds = np.concatenate([entry['speeds'] for entry in distributions])
+    opponent_shares = np.concatenate([entry['shares'] for entry in distributions])
+    starts = np.cumsum([0] + [len(entry['speeds']) for entry in distributions[:-1]])
+
+    difference = speeds[:, None] - opponent_speeds[None, :]
+    if trick_room:
+        difference = -difference
+    first = np.add.reduceat((difference > 0) * opponent_shares, starts, axis=1)
+    tie = np.add.reduceat((difference == 0) * opponent_shares, starts, axis=1)
+    second = np.clip(1.0 - first - tie, 0.0, 1.0)
+    return {'first': first, 'tie': tie, 'second': second, 'moves_first': first + tie / 2}
+
+
+def evaluate_opponent_teams(matrix, species_order, opponent_teams):
+    """从 己方 × 全部对手宝可梦 的矩阵中取出每支对手队伍的列，返回每支队伍的 (列索引, 先行动概率矩阵) /
+    Take each opponent team's columns from the yours × every opponent Pokemon matrix, returning (column indexes, moves-first matrix) per team"""
+    columns = {species: index for index, species in enumerate(species_order)}
+    results = []
+    for team in opponent_teams:
+        indexes = [columns[species] for species in team if species in columns]
+        results.append((indexes, matrix['moves_first'][:, indexes]))
+    return results
+
+
+def parse_opponent_teams(text):
+    """解析对手队伍文件：Showdown导出文本，或每行一支逗号分隔的队伍 / Parse an opponent team file: Showdown export text, or one comma separated team per line"""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if any(line.startswith("===") or line.startswith("- ") for line in lines):
+        return [[member['species'] for member in team['members']] for team in analyze_teams.parse_showdown_teams(text)]
+    return [[name.strip() for name in line.split(',') if name.strip()] for line in lines]
+
+
+def print_turn_order_table(members, distributions, matrix):
+    """打印 己方 × 对手 的先行动概率表 / Print the moves-first table of your Pokemon × opponents"""
+    names = [entry['name'] for entry in distributions]
+    width = max([len(member['species']) for member in members] + [10])
+    print(f"{'':<{width}} {'Speed':>5}  " + "  ".join(f"{name[:14]:>14}" for name in names))
+    for row, member in enumerate(members):
+        cells = []
+        for column in range(len(names)):
+            cell = f"{matrix['moves_first'][row, column] * 100:.1f}%"
+            if matrix['tie'][row, column] > 0:
+                cell += f" (t{matrix['tie'][row, column] * 100:.1f})"
+            cells.append(f"{cell:>14}")
+        print(f"{member['species']:<{width}} {member['scenario_speed']:>5}  " + "  ".join(cells))
+
+
+def export_turn_order_json(members, species_order, distributions, matrix, opponent_teams, team_results, filepath):
+    """导出完整结果为JSON / Export the full results as JSON"""
+    document = {
+        'team': [{'species': member['species'], 'speed': member['scenario_speed']} for member in members],
+        'opponents': [{'species': species, 'name': distributions[species]['name'],
+                       'speeds': distributions[species]['speeds'].tolist(),
+                       'shares': distributions[species]['shares'].round(6).tolist()} for species in species_order],
+        'first': matrix['first'].round(6).tolist(),
+        'tie': matrix['tie'].round(6).tolist(),
+        'second': matrix['second'].round(6).tolist(),
+        'teams': [{'opponents': [species_order[index] for index in indexes], 'moves_first': result.round(6).tolist()}
+                  for team, (indexes, result) in zip(opponent_teams, team_results)]
+    }
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False)
+    print(f"JSON file exported: {filepath}")
+
+
+def main():
+    """主函数 / Main function"""
+    parser = argparse.ArgumentParser(description="Probability of each of your Pokemon moving before each opponent Pokemon, from usage spreads")
+    parser.add_argument("format", help="Format code (e.g.: gen9bssregi)")
+    parser.add_argument("team", help="Showdown team export file (the first team is used)")
+    parser.add_argument("--opponents", help="Opponent's Pokemon, comma separated")
+    parser.add_argument("--opponent-file", help="File of opponent teams: one comma separated team per line, or Showdown export text")
+    parser.add_argument("--rating", "-r", help="Rating threshold (default: highest rating)")
+    parser.add_argument("--month", "-m", help="Statistics month YYYY-MM (default: last month, falling back to the month before)")
+    parser.add_argument("--scenario", choices=list(analyze_teams.SPEED_SCENARIOS), default="neutral", help="Speed scenario of your team (default: neutral)")
+    parser.add_argument("--opponent-scenario", choices=list(analyze_teams.SPEED_SCENARIOS), default="neutral", help="Speed scenario of the opponent (default: neutral)")
+    parser.add_argument("--trick-room", action="store_true", help="Trick Room: slower Pokemon move first")
+    parser.add_argument("--scarf", action="store_true", help="Fold in the opponent's Choice Scarf usage")
+    parser.add_argument("--json", help="Export the full results to this JSON file")
+
+    args = parser.parse_args()
+
+    if not args.opponents and not args.opponent_file:
+        print("Error: Specify --opponents or --opponent-file")
+        return
+    try:
+        import numpy
+    except ImportError:
+        print("Error: Turn order probabilities require numpy (pip install numpy)")
+        return
+
+    print("Loading data...")
+    tiers.load_all_data()
+
+    rating_threshold = args.rating
+    available_ratings = tiers.get_available_ratings(args.format)
+    if not available_ratings:
+        print(f"Error: No data files found for format '{args.format}'")
+        return
+    if not rating_threshold:
+        rating_threshold = available_ratings[-1]
+        print(f"Rating not specified, using highest rating: {rating_threshold}")
+    elif rating_threshold not in available_ratings:
+        print(f"Error: Rating '{rating_threshold}' is not available for format '{args.format}'")
+        print(f"Available ratings: {', '.join(available_ratings)}")
+        return
+
+    try:
+        with open(args.team, 'r', encoding='utf-8') as f:
+            teams = analyze_teams.parse_showdown_teams(f.read(), os.path.splitext(os.path.basename(args.team))[0])
+        opponent_teams = []
+        if args.opponents:
+            opponent_teams.append([name.strip() for name in args.opponents.split(',') if name.strip()])
+        if args.opponent_file:
+            with open(args.opponent_file, 'r', encoding='utf-8') as f:
+                opponent_teams.extend(parse_opponent_teams(f.read()))
+    except OSError as e:
+        print(f"Error reading team file: {e}")
+        return
+    if not teams:
+        print("Error: No team found")
+        return
+
+    members, member_speeds = analyze_teams.prepare_team_speeds(teams[:1], args.format, [args.scenario])
+    if not members:
+        print("Error: No recognized Pokemon in the team")
+        return
+    for member, speeds in zip(members, member_speeds):
+        member['scenario_speed'] = speeds[0]
+
+    stats_path, is_outdated = tiers.find_usage_data_file(args.format, rating_threshold, args.month)
+    usage_document = tiers.load_usage_file(stats_path) if stats_path else None
+    if not usage_document:
+        print("Error: Unable to get usage data")
+        return
+    if is_outdated:
+        print("Warning: Using outdated statistics data")
+
+    species_names = [species for team in opponent_teams for species in team]
+    distributions = build_opponent_distributions(usage_document.get("data", {}), species_names, args.format,
+                                                 args.scarf, args.opponent_scenario)
+    if not distributions:
+        print("Error: No recognized opponent Pokemon")
+        return
+    species_order = list(distributions)
+
+    started = time.perf_counter()
+    matrix = compute_turn_order([member['scenario_speed'] for member in members],
+                                [distributions[species] for species in species_order], args.trick_room)
+    team_results = evaluate_opponent_teams(matrix, species_order, opponent_teams)
+    elapsed = time.perf_counter() - started
+    print(f"Computed {len(members)} x {len(species_order)} pairs for {len(opponent_teams)} opponent team(s) "
+          f"in {elapsed * 1000:.2f} ms{' (Trick Room)' if args.trick_room else ''}")
+
+    if len(opponent_teams) == 1:
+        print_turn_order_table(members, [distributions[species] for species in species_order], matrix)
+    else:
+        print(f"{'#':>4}  {'Moves first':>11}  Opponents")
+        for number, (team, (indexes, result)) in enumerate(zip(opponent_teams, team_results), 1):
+            average = f"{result.mean() * 100:.1f}%" if indexes else "-"
+            print(f"{number:>4}  {average:>11}  {', '.join(team)}")
+
+    if args.json:
+        export_turn_order_json(members, species_order, distributions, matrix, opponent_teams, team_results, args.json)
+
+
+if __name__ == "__main__":
+    main()
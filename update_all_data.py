@@ -2,9 +2,20 @@ import requests
 from datetime import datetime
 from bs4 import BeautifulSoup
 import re
+import ast
+import codecs
 import pyjson5
 import os
 import difflib
+import hashlib
+import argparse
+import contextlib
+import io
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import export_speed_tiers as tiers
+import atomic_files
+import stats_archive
 
 def get_current_month_prefix():
     """Get the current month prefix for filtering files"""
@@ -15,8 +26,17 @@ def get_current_month_prefix():
         year = year - 1
     return f"{year}-{str(month).zfill(2)}"
 
-def clean_old_data():
-    """Clean old data files that are not from the previous month"""
+RETENTION_MODES = ['prompt', 'delete', 'archive', 'keep']
+
+def clean_old_data(retention='prompt'):
+    """Clean old data files that are not from the previous month
+
+    retention is 'prompt' (ask before deleting), 'delete', 'archive' (pack each month into a compressed archive) or 'keep'
+    """
+    if retention == 'keep':
+        print("Keeping old data files.")
+        return
+
     current_prefix = get_current_month_prefix()
     stats_dir = "stats"
     
@@ -49,95 +69,278 @@ def clean_old_data():
     if len(old_files) > 10:
         print(f"  ... and {len(old_files) - 10} more files")
     
+    if retention == 'archive':
+        archive_old_data(stats_dir, old_files)
+        return
+
     # Ask for confirmation
-    choice = input(f"\nDo you want to delete these {len(old_files)} old files? [y/N]: ").strip().lower()
-    
-    if choice in ['y', 'yes']:
-        deleted_count = 0
-        for file in old_files:
+    if retention == 'prompt':
+        choice = input(f"\nDo you want to delete these {len(old_files)} old files? [y/N]: ").strip().lower()
+        if choice not in ['y', 'yes']:
+            print("Deletion cancelled.")
+            return
+
+    deleted_count = 0
+    for file in old_files:
+        try:
+            os.remove(os.path.join(stats_dir, file))
+            deleted_count += 1
+            cache_path = tiers.get_speed_tier_cache_path(file)
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+        except OSError as e:
+            print(f"Error deleting {file}: {e}")
+    print(f"Successfully deleted {deleted_count} old data files.")
+
+def archive_old_data(stats_dir, old_files):
+    """Pack old data files into one compressed archive per month, deleting the originals once the archive is verified"""
+    files_by_month = {}
+    for file in old_files:
+        files_by_month.setdefault(file[:len("YYYY-MM")], []).append(file)
+
+    for month, files in sorted(files_by_month.items()):
+        archive_path = stats_archive.get_archive_path(tiers.ARCHIVE_DIRECTORY, month)
+        sources = {file: os.path.join(stats_dir, file) for file in files}
+        original_size = sum(os.path.getsize(path) for path in sources.values())
+        if stats_archive.write_archive(archive_path, sources) is None:
+            print(f"Archiving {month} failed, keeping its files.")
+            continue
+
+        for path in sources.values():
             try:
-                os.remove(os.path.join(stats_dir, file))
-                deleted_count += 1
+                os.remove(path)
             except OSError as e:
-                print(f"Error deleting {file}: {e}")
-        print(f"Successfully deleted {deleted_count} old data files.")
-    else:
-        print("Deletion cancelled.")
+                print(f"Error deleting {path}: {e}")
+        print(f"Archived {len(files)} files from {month}: {original_size / 1024 ** 2:.1f} MB -> "
+              f"{os.path.getsize(archive_path) / 1024 ** 2:.1f} MB ({archive_path})")
 
-def updateMetagames():
-    """Update metagames data for the previous month"""
-    current_prefix = get_current_month_prefix()
-    year, month = current_prefix.split('-')
-    
-    urls = [
-        f'https://www.smogon.com/stats/{year}-{month}/chaos/',
-        f'https://www.smogon.com/stats/{year}-{month}-DLC1/chaos/',
-        f'https://www.smogon.com/stats/{year}-{month}-DLC2/chaos/',
-        f'https://www.smogon.com/stats/{year}-{month}-H1/chaos/',
-        f'https://www.smogon.com/stats/{year}-{month}-H2/chaos/',
-    ]
-    
-    for url in urls:
+STATS_BASE_URL = 'https://www.smogon.com/stats'
+STATS_DIRECTORY_SUFFIXES = ['', '-DLC1', '-DLC2', '-H1', '-H2']
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+def list_chaos_files(base_url, year, month):
+    """List (url, filename) of every chaos JSON file published for a month"""
+    chaos_files = []
+    for suffix in STATS_DIRECTORY_SUFFIXES:
+        url = f'{base_url}/{year}-{month}{suffix}/chaos/'
         try:
             response = requests.get(url, timeout=30)
             if response.status_code == 200:
                 print(f"Getting stats from {url}")
                 soup = BeautifulSoup(response.text, 'html.parser')
-                links = soup.find_all('a', href=True)
-                
-                for link in links:
+                for link in soup.find_all('a', href=True):
                     href = link['href']
                     if ".json" in href and ".gz" not in href:
-                        filename = f'stats/{year}-{month}-{href}'
-                        
-                        if os.path.exists(filename):
-                            print(f"File {filename} already exists, skipping download.")
-                            continue
-                        
-                        print(f"Downloading {href}...")
-                        try:
-                            file_response = requests.get(url + href, timeout=30)
-                            file_response.raise_for_status()
-                            
-                            os.makedirs('stats', exist_ok=True)
-                            with open(filename, 'w', encoding="utf-8") as file:
-                                file.write(file_response.text)
-                        except requests.RequestException as e:
-                            print(f"Error downloading {href}: {e}")
+                        chaos_files.append((url + href, f'stats/{year}-{month}-{href}'))
             else:
                 print(f"Unable to access {url} (Status: {response.status_code})")
         except requests.RequestException as e:
             print(f"Error accessing {url}: {e}")
+    return chaos_files
+
+def download_file(url, filename):
+    """Stream a file to disk under a temporary name, renaming it once complete; returns True on success"""
+    try:
+        with requests.get(url, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            with atomic_files.atomic_write(filename, 'wb') as file:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    file.write(chunk)
+        return True
+    except (requests.RequestException, OSError) as e:
+        print(f"Error downloading {url}: {e}")
+        return False
+
+def init_cache_worker():
+    """Load the reference data once per cache worker process"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        tiers.load_all_data()
+
+def build_cache_task(filename):
+    """Build the speed tier cache of one statistics file, returning (filename, catalog entry)"""
+    format_code = os.path.basename(filename).split("-")[-2]
+    return filename, tiers.build_speed_tier_cache(filename, format_code)[1]
+
+def updateMetagames(base_url=STATS_BASE_URL, workers=None):
+    """Download the previous month's statistics and build their speed tier caches
+
+    Downloads run one after another in this process while a pool of worker processes builds the cache of each
+    file as soon as it is complete, so parsing overlaps with the remaining downloads. workers=0 only downloads.
+    """
+    current_prefix = get_current_month_prefix()
+    year, month = current_prefix.split('-')
+    chaos_files = list_chaos_files(base_url.rstrip('/'), year, month)
+    if not chaos_files:
+        return
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    catalog_path = tiers.build_data_path(tiers.CATALOG_NAME)
+    catalog = tiers.load_data_file(catalog_path) or {}
+    executor = None
+    if workers > 0:
+        # Compile the data bundle first so workers do not each rebuild it
+        tiers.load_data_bundle()
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_cache_worker)
+
+    pending = []
+    catalog_entries = {}
+    try:
+        for url, filename in chaos_files:
+            if os.path.exists(filename):
+                print(f"File {filename} already exists, skipping download.")
+            else:
+                print(f"Downloading {os.path.basename(url)}...")
+                if not download_file(url, filename):
+                    continue
+            if executor is None:
+                continue
+            format_code = os.path.basename(filename).split("-")[-2]
+            if (os.path.basename(filename) not in catalog
+                    or tiers.load_cached_speed_tiers(filename, format_code) is None):
+                pending.append(executor.submit(build_cache_task, filename))
+
+        for future in as_completed(pending):
+            try:
+                filename, catalog_entry = future.result()
+            except Exception as e:
+                print(f"Error building speed tier cache: {e}")
+                continue
+            if catalog_entry:
+                catalog_entries[os.path.basename(filename)] = catalog_entry
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if executor is not None:
+        print(f"Built speed tier caches for {len(catalog_entries)} of {len(pending)} new or changed files")
+        catalog.update(catalog_entries)
+        # Drop files that were deleted since; archived files stay listed
+        catalog = {name: entry for name, entry in sorted(catalog.items()) if tiers.locate_stats_file(name)}
+        with atomic_files.atomic_write(catalog_path) as file:
+            json.dump(catalog, file, indent=1)
+        print(f"Catalog lists {len(catalog)} statistics files")
+
+# Tokens of the icon-index sheet; "other" covers any character outside the object literal
+SHEET_TOKEN_PATTERN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<comment>//[^\n]*\n|/\*.*?\*/)
+  | (?P<name>[A-Za-z_$][\w$]*)
+  | (?P<string>'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*")
+  | (?P<number>\d+)
+  | (?P<punct>[{}:,+=;])
+  | (?P<other>.)
+""", re.VERBOSE | re.DOTALL)
+
+ICON_INDEXES_NAME = 'BattlePokemonIconIndexes'
+
+def sheet_token_may_continue(buffer, position, match):
+    """Check whether a token at the end of a partial buffer could still grow with more data"""
+    if match.end() == len(buffer):
+        return True
+    if match.lastgroup != 'other':
+        return False
+    # An unterminated comment or string only matches "other" until the rest of it arrives
+    if buffer.startswith(('/*', '//'), position):
+        return True
+    return buffer[position] in '\'"' and buffer.find('\n', position) == -1
+
+def iter_sheet_tokens(chunks):
+    """Tokenize a stream of byte chunks in a single pass, yielding (kind, text) pairs
+
+    A token that may continue in the next chunk is held back until more data arrives,
+    so chunk boundaries can fall anywhere, including inside a UTF-8 character.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    final = False
+    chunks = iter(chunks)
+    while not final:
+        chunk = next(chunks, None)
+        if chunk is None:
+            final = True
+            # A trailing line comment still needs its newline
+            buffer += decoder.decode(b'', final=True) + '\n'
+        else:
+            buffer += decoder.decode(chunk)
+
+        position = 0
+        while position < len(buffer):
+            match = SHEET_TOKEN_PATTERN.match(buffer, position)
+            if not final and sheet_token_may_continue(buffer, position, match):
+                break
+            if match.lastgroup not in ('space', 'comment'):
+                yield match.lastgroup, match.group()
+            position = match.end()
+        buffer = buffer[position:]
+
+def parse_icon_indexes(chunks):
+    """Parse the BattlePokemonIconIndexes object literal from a stream of byte chunks
+
+    Keys may be identifiers, quoted strings or numbers; values are integers or sums of integers,
+    which are folded here. Stops reading at the closing brace. Raises ValueError on anything else.
+    """
+    tokens = iter_sheet_tokens(chunks)
+
+    # Find "BattlePokemonIconIndexes = {"
+    recent = []
+    for token in tokens:
+        recent = (recent + [token])[-3:]
+        if recent == [('name', ICON_INDEXES_NAME), ('punct', '='), ('punct', '{')]:
+            break
+    else:
+        raise ValueError(f"{ICON_INDEXES_NAME} not found")
+
+    def expect(expected_kinds):
+        token = next(tokens, None)
+        if token is None:
+            raise ValueError(f"Unexpected end of sheet inside {ICON_INDEXES_NAME}")
+        if token[0] not in expected_kinds:
+            raise ValueError(f"Unexpected {token[1]!r} inside {ICON_INDEXES_NAME}")
+        return token
+
+    icon_indexes = {}
+    while True:
+        kind, text = expect(('name', 'string', 'number', 'punct'))
+        if text == '}':
+            return icon_indexes
+        if kind == 'punct':
+            raise ValueError(f"Unexpected {text!r} inside {ICON_INDEXES_NAME}")
+        try:
+            key = ast.literal_eval(text) if kind == 'string' else text
+        except (SyntaxError, ValueError):
+            raise ValueError(f"Invalid string key {text!r}")
+
+        if expect(('punct',))[1] != ':':
+            raise ValueError(f"Expected ':' after {key!r}")
+        value = int(expect(('number',))[1])
+        while True:
+            kind, text = expect(('punct',))
+            if text == '+':
+                value += int(expect(('number',))[1])
+            elif text in (',', '}'):
+                break
+            else:
+                raise ValueError(f"Unexpected {text!r} in value of {key!r}")
+        icon_indexes[key] = value
+        if text == '}':
+            return icon_indexes
 
 def extract_battle_icon_indexes_from_url(mjs_url, output_json_path):
     """Extract battle icon indexes from MJS URL and save to JSON"""
     try:
-        response = requests.get(mjs_url, timeout=30)
-        response.raise_for_status()
-        mjs_content = response.text.splitlines()
-
-        # Extract the content of BattlePokemonIconIndexes
-        start_index = mjs_content.index('const BattlePokemonIconIndexes = {')
-        end_index = start_index
-        while mjs_content[end_index] != '};':
-            end_index += 1
-        icon_indexes_content = mjs_content[start_index + 1:end_index]
-
-        # Clean and process the content
-        cleaned_content = [line for line in icon_indexes_content if not line.strip().startswith('//')]
-        content_string = ''.join(cleaned_content)
-        content_string = re.sub(r'/\*.*?\*/', '', content_string, flags=re.DOTALL)
-        content_string = re.sub(r'(\d+ \+ \d+)', lambda x: str(eval(x.group(1))), content_string)
-        content_string = re.sub(r'(\w+):', r'"\1":', content_string)
-
-        # Convert to dictionary and save
-        icon_indexes_dict = eval(f"{{{content_string}}}")
-        
+        with requests.get(mjs_url, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            icon_indexes_dict = parse_icon_indexes(response.iter_content(chunk_size=64 * 1024))
+
         os.makedirs(os.path.dirname(output_json_path), exist_ok=True)
-        with open(output_json_path, 'wb') as json_file:
-            pyjson5.dump(icon_indexes_dict, json_file, indent=4)
-            
-    except (requests.RequestException, ValueError, IndexError) as e:
+        # pyjson5 2.x writes str, so the file is opened in text mode
+        with open(output_json_path, 'w', encoding='utf-8') as json_file:
+            pyjson5.dump(icon_indexes_dict, json_file)
+        print(f"Extracted {len(icon_indexes_dict)} icon indexes")
+
+    except (requests.RequestException, ValueError) as e:
         print(f"Error extracting icon indexes: {e}")
 
 def updateData():
@@ -185,10 +388,81 @@ def extract_gen(s):
     val = int(re.findall(r'\d+', val)[0]) if re.findall(r'\d+', val) else None
     return str(val)
 
-def generateFormatList():
+FORMATS_URL = 'https://raw.githubusercontent.com/smogon/pokemon-showdown/master/config/formats.ts'
+# Bump when the resolution rules change so cached resolutions are redone
+FORMAT_RESOLVER_VERSION = 1
+# Formats compared with difflib when a metagame has no exact match
+FORMAT_FALLBACK_CANDIDATES = 20
+
+def get_trigrams(text):
+    """Character trigrams of a string, padded so short IDs still have some"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def build_format_index(format_names):
+    """Index format names by exact Showdown ID and by trigram of that ID"""
+    exact_index = {}
+    trigram_index = {}
+    for name in format_names:
+        format_id = tiers.to_showdown_id(name)
+        if not format_id or format_id in exact_index:
+            continue
+        exact_index[format_id] = name
+        for trigram in get_trigrams(format_id):
+            trigram_index.setdefault(trigram, []).append(format_id)
+    return exact_index, trigram_index
+
+def resolve_format_name(meta, exact_index, trigram_index):
+    """Resolve a metagame ID to a format name, returning (name or None, method)"""
+    if meta in exact_index:
+        return exact_index[meta], 'exact'
+
+    # Only the formats sharing the most trigrams with the ID go through difflib
+    shared_counts = {}
+    for trigram in get_trigrams(meta):
+        for format_id in trigram_index.get(trigram, ()):
+            shared_counts[format_id] = shared_counts.get(format_id, 0) + 1
+    candidates = sorted(shared_counts, key=lambda format_id: -shared_counts[format_id])[:FORMAT_FALLBACK_CANDIDATES]
+    matches = difflib.get_close_matches(meta, candidates, 1)
+    if matches:
+        return exact_index[matches[0]], 'fuzzy'
+    return None, 'unresolved'
+
+def resolve_format_names(metas, format_names, cache=None):
+    """Resolve every metagame, reusing cached resolutions made against the same formats source
+
+    cache is the previous {'source': ..., 'resolved': {meta: {'name': ..., 'method': ...}}} entry
+    Returns (meta_names, new cache entry, counts per method)
+    """
+    source_text = "\n".join([str(FORMAT_RESOLVER_VERSION)] + format_names)
+    source_hash = hashlib.sha256(source_text.encode('utf-8')).hexdigest()
+    cached = cache.get('resolved', {}) if cache and cache.get('source') == source_hash else {}
+
+    indexes = None
+    resolved = {}
+    counts = {'cached': 0, 'exact': 0, 'fuzzy': 0, 'unresolved': 0}
+    for meta in metas:
+        if meta in cached:
+            resolved[meta] = cached[meta]
+            counts['cached'] += 1
+            continue
+        if indexes is None:
+            indexes = build_format_index(format_names)
+        name, method = resolve_format_name(meta, *indexes)
+        resolved[meta] = {'name': name, 'method': method}
+        counts[method] += 1
+        if method == 'fuzzy':
+            print(f"Possible incorrect name with {meta} as {name}")
+        elif method == 'unresolved':
+            print(f"Unable to find format name for {meta}")
+
+    meta_names = {meta: entry['name'] for meta, entry in resolved.items() if entry['name']}
+    return meta_names, {'source': source_hash, 'resolved': resolved}, counts
+
+def generateFormatList(formats_url=FORMATS_URL):
     """Generate format list mapping from Smogon data"""
     try:
-        response = requests.get('https://raw.githubusercontent.com/smogon/pokemon-showdown/master/config/formats.ts', timeout=30)
+        response = requests.get(formats_url, timeout=30)
         response.raise_for_status()
         mjs_content = response.text
 
@@ -199,48 +473,52 @@ def generateFormatList():
             return
             
         meta_games_list = ["stats/" + f for f in os.listdir("stats/") if f.split("-")[-1] == "0.json"]
-        meta_games_list = [f.split("-")[-2] for f in meta_games_list]
-        
-        meta_names = {}
-        for meta in meta_games_list:
-            word = meta
-            possibilities = format_names
-            normalized_possibilities = {p.lower(): p for p in possibilities}
-            result = difflib.get_close_matches(word, normalized_possibilities.keys(), 10)
-            normalized_result = [normalized_possibilities[r] for r in result]
-            
-            if normalized_result:
-                close = normalized_result[0]
-                pokeSearch = close
-
-                if re.sub(r'[^a-z0-9]+', '', pokeSearch.lower()) != meta:
-                    print(f"Possible incorrect name with {meta} as {pokeSearch}")
+        meta_games_list = sorted(set(f.split("-")[-2] for f in meta_games_list))
 
-                meta_names[meta] = pokeSearch
-            else:
-                print(f"Unable to find format name for {meta}")
-        
         filename = 'stats/meta_names.json'
+        previous = tiers.load_data_file(filename) or {}
+        meta_names, cache, counts = resolve_format_names(meta_games_list, format_names,
+                                                         previous.get(tiers.FORMAT_NAMES_CACHE_KEY))
+        meta_names[tiers.FORMAT_NAMES_CACHE_KEY] = cache
+        print(f"Resolved {len(meta_games_list)} formats: " + ", ".join(f"{count} {method}" for method, count in counts.items()))
+
         os.makedirs('stats', exist_ok=True)
-        with open(filename, 'wb') as file:
+        with atomic_files.atomic_write(filename) as file:
             pyjson5.dump(meta_names, file)
             
     except requests.RequestException as e:
         print(f"Error generating format list: {e}")
 
+def compileDataBundle():
+    """Compile the static data bundle (pokedex, sprite index, format names, translations) used by the exporter"""
+    print("Compiling data bundle.")
+    bundle = tiers.compile_data_bundle()
+    print(f"Data bundle contains {len(bundle['pokedex'])} Pokemon and {len(bundle['format_names'])} format names")
+
 def main():
     """Main function to run all update tasks"""
+    parser = argparse.ArgumentParser(description="Update Pokemon data, usage statistics, sprites and format names")
+    parser.add_argument("--retention", choices=RETENTION_MODES, default="prompt",
+                        help="What to do with statistics from older months: ask before deleting (default), delete, "
+                             "archive into compressed monthly archives readable by the exporter, or keep")
+    parser.add_argument("--stats-url", default=STATS_BASE_URL,
+                        help=f"Base URL of the monthly usage statistics (default: {STATS_BASE_URL})")
+    parser.add_argument("--workers", type=int,
+                        help="Processes building speed tier caches while downloads continue (default: CPU count, 0 disables)")
+    args = parser.parse_args()
+
     print("Starting Pokemon data update...")
     print(f"Current month prefix: {get_current_month_prefix()}")
     
-    # Ask about cleaning old data
-    clean_old_data()
+    # Clean or archive old data; every mode except prompt runs unattended (e.g. from cron)
+    clean_old_data(args.retention)
     
     # Update all data
     updateData()
     updateImage()
-    updateMetagames()
+    updateMetagames(args.stats_url, args.workers)
     generateFormatList()
+    compileDataBundle()
     
     print("Update completed successfully!")
 
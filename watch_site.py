@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Speed Tiers Watch Mode
+速度线监视模式
+Watch statistics and asset files and regenerate affected site pages
+
+用法 / Usage:
+python watch_site.py [options]
+
+例如 / Examples:
+python watch_site.py
+python watch_site.py --output ./site --workers 4 --status-log watch_status.jsonl
+python watch_site.py --poll 5
+
+可选参数 / Optional Arguments:
+--output, -o       网站输出目录（默认: site） / Site output directory (default: site)
+--translate, -t    使用中文翻译宝可梦名称 / Use Chinese translation for Pokemon names
+--min-usage, -u    最小使用率过滤器 / Minimum usage rate filter
+--top-n, -n        只导出前N名使用率最高的宝可梦 / Export only top N Pokemon by usage rate
+--workers, -w      并行生成页面的进程数（默认: 2） / Number of processes rendering pages in parallel (default: 2)
+--debounce, -d     最后一次文件变化后等待的秒数（默认: 2） / Seconds to wait after the last file change (default: 2)
+--poll, -p         使用轮询代替inotify，参数为轮询间隔秒数 / Use polling instead of inotify, value is the interval in seconds
+--status-log, -s   以JSON Lines格式追加重建状态 / Append rebuild status as JSON Lines
+
+监视 stats/、translate.json 和图标表。在Linux上使用inotify，其他平台或inotify不可用时回退到轮询。
+根据构建清单中每个页面的输入文件，只重新生成受影响的页面。
+Watches stats/, translate.json and the sprite sheet, using inotify on Linux and polling elsewhere or
+when inotify is unavailable. Only pages whose inputs (recorded in the build manifest) changed are rebuilt.
+"""
+
+import os
+import sys
+import json
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import argparse
+from datetime import datetime
+import export_speed_tiers as tiers
+import build_site
+
+# inotify事件掩码 / inotify event masks
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+
+# struct inotify_event { int wd; uint32_t mask, cookie, len; char name[]; }
+INOTIFY_EVENT = struct.Struct("iIII")
+
+# 单次防抖的最长等待时间（秒），避免持续写入时一直不重建 / Maximum debounce wait (seconds) so a steady stream of writes still rebuilds
+MAX_DEBOUNCE_DELAY = 30.0
+
+
+def is_watched_path(path):
+    """判断文件是否是网站的输入文件 / Check whether a file is a site input"""
+    path = os.path.normpath(path)
+    if os.path.dirname(path) == os.path.normpath(tiers.DATA_DIRECTORY):
+        # 数据包和目录由源文件生成，本身不是输入 / The data bundle and catalog are derived from the sources and are not inputs themselves
+        return path.endswith(".json") and os.path.basename(path) not in (tiers.DATA_BUNDLE_NAME, tiers.CATALOG_NAME)
+    return path in (os.path.normpath(tiers.TRANSLATION_PATH), os.path.normpath(tiers.SPRITE_SHEET_PATH))
+
+
+def get_watched_directories():
+    """需要监视的目录 / Directories to watch"""
+    return [tiers.DATA_DIRECTORY, os.path.dirname(tiers.SPRITE_SHEET_PATH) or "."]
+
+
+def snapshot_watched_files():
+    """记录监视文件的修改时间和大小 / Record mtime and size of watched files"""
+    snapshot = {}
+    for directory in get_watched_directories():
+        if not os.path.isdir(directory):
+            continue
+        for name in os.listdir(directory):
+            path = os.path.normpath(os.path.join(directory, name))
+            if is_watched_path(path):
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    # 列出后被删除或替换（如原子写入的临时文件） / Removed or replaced after listing (e.g. an atomic write's temporary file)
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def open_inotify():
+    """打开inotify监视，不可用时返回None / Open inotify watches, returning None when unavailable
+
+    返回 (文件描述符, {监视描述符: 目录}) / Returns (file descriptor, {watch descriptor: directory})
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+
+    watch_directories = {}
+    for directory in get_watched_directories():
+        wd = libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            print(f"Warning: Unable to watch {directory}: {os.strerror(ctypes.get_errno())}")
+            os.close(fd)
+            return None
+        watch_directories[wd] = directory
+    return fd, watch_directories
+
+
+def read_inotify_changes(fd, watch_directories, timeout):
+    """等待并读取inotify事件，返回变化的监视文件 / Wait for and read inotify events, returning changed watched files
+
+    队列溢出时返回None，调用方应视为全部可能变化 / Returns None on queue overflow; the caller should assume anything changed
+    """
+    readable, _, _ = select.select([fd], [], [], timeout)
+    if not readable:
+        return set()
+
+    changed = set()
+    while True:
+        try:
+            buffer = os.read(fd, 64 * 1024)
+        except OSError as e:
+            if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                break
+            raise
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, name_length = INOTIFY_EVENT.unpack_from(buffer, offset)
+            offset += INOTIFY_EVENT.size
+            name = buffer[offset:offset + name_length].rstrip(b"\0").decode("utf-8", "replace")
+            offset += name_length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if wd in watch_directories and name:
+                path = os.path.normpath(os.path.join(watch_directories[wd], name))
+                if is_watched_path(path):
+                    changed.add(path)
+    return changed
+
+
+def make_change_source(poll_interval=None):
+    """创建变化来源函数 source(timeout) -> 变化的文件集合或None / Create change source function source(timeout) -> set of changed files or None
+
+    优先使用inotify，否则轮询 / Prefers inotify, otherwise polls
+    """
+    inotify = None if poll_interval else open_inotify()
+    if inotify:
+        fd, watch_directories = inotify
+        print("Watching with inotify")
+        return lambda timeout: read_inotify_changes(fd, watch_directories, timeout)
+
+    interval = poll_interval or 2.0
+    print(f"Watching by polling every {interval:g}s")
+    state = {'snapshot': snapshot_watched_files()}
+
+    def poll_changes(timeout):
+        time.sleep(min(timeout, interval))
+        snapshot = snapshot_watched_files()
+        previous = state['snapshot']
+        state['snapshot'] = snapshot
+        return {path for path in set(previous) | set(snapshot) if previous.get(path) != snapshot.get(path)}
+
+    return poll_changes
+
+
+def wait_for_changes(change_source, debounce):
+    """阻塞直到有文件变化，并合并短时间内的连续变化 / Block until files change, coalescing bursts of changes
+
+    返回 (变化的文件集合或None, 首次检测到变化的时间) / Returns (set of changed files or None, time the first change was seen)
+    """
+    changed = set()
+    while not changed:
+        changed = change_source(3600)
+        if changed is None:
+            return None, time.monotonic()
+
+    first_seen = time.monotonic()
+    last_seen = first_seen
+    while True:
+        remaining = min(last_seen + debounce, first_seen + MAX_DEBOUNCE_DELAY) - time.monotonic()
+        if remaining <= 0:
+            return changed, first_seen
+        more = change_source(remaining)
+        if more is None:
+            return None, first_seen
+        if more:
+            changed |= more
+            last_seen = time.monotonic()
+
+
+def build_dependency_graph(output_dir):
+    """从构建清单生成 输入文件 -> 页面 的反向依赖图 / Build the input file -> pages reverse dependency graph from the build manifest"""
+    manifest = build_site.load_site_manifest(output_dir)
+    graph = {}
+    for page_id, entry in manifest['pages'].items():
+        for path in entry.get('inputs', []):
+            graph.setdefault(os.path.normpath(path), set()).add(page_id)
+    return graph
+
+
+def find_affected_pages(changed_paths, graph):
+    """找出受影响的页面；出现未知输入（如新的统计文件）时返回None表示全部检查 / Find affected pages; None means check everything because an unknown input (e.g. a new stats file) appeared"""
+    affected = set()
+    for path in changed_paths:
+        if path not in graph:
+            return None
+        affected |= graph[path]
+    return affected
+
+
+def write_status(status_log, status):
+    """输出并记录重建状态 / Print and record rebuild status"""
+    print(f"[{status['time']}] {status['changed']} changed file(s): {status['built']} page(s) rebuilt, "
+          f"{status['checked']} checked, build {status['build_seconds']:.2f}s, latency {status['latency_seconds']:.2f}s")
+    if status_log:
+        with open(status_log, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(status) + "\n")
+
+
+def watch_site(output_dir="site", use_translation=False, min_usage_filter=None, top_n_filter=None, workers=2,
+               debounce=2.0, poll_interval=None, status_log=None):
+    """监视输入文件并增量重建网站 / Watch inputs and rebuild the site incrementally"""
+    build_options = dict(use_translation=use_translation, min_usage_filter=min_usage_filter,
+                         top_n_filter=top_n_filter, workers=workers)
+
+    # 先完成一次完整的增量构建 / Start with a full incremental build
+    print("Initial site build...")
+    build_site.build_site(output_dir, **build_options)
+    change_source = make_change_source(poll_interval)
+
+    while True:
+        changed, first_seen = wait_for_changes(change_source, debounce)
+        graph = build_dependency_graph(output_dir)
+        affected = None if changed is None else find_affected_pages(changed, graph)
+
+        build_started = time.monotonic()
+        result = build_site.build_site(output_dir, only_pages=affected, **build_options)
+        finished = time.monotonic()
+
+        write_status(status_log, {
+            'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'changed': len(changed) if changed is not None else -1,
+            'checked': len(affected) if affected is not None else len(result['built']) + len(result['skipped']),
+            'built': len(result['built']),
+            'pages': result['built'],
+            'build_seconds': round(finished - build_started, 3),
+            'latency_seconds': round(finished - first_seen, 3)
+        })
+
+
+def main():
+    """主函数 / Main function"""
+    parser = argparse.ArgumentParser(description="Watch statistics and asset files and regenerate affected site pages")
+    parser.add_argument("--output", "-o", default="site", help="Site output directory (default: site)")
+    parser.add_argument("--translate", "-t", action="store_true", help="Use Chinese translation for Pokemon names")
+    parser.add_argument("--min-usage", "-u", type=float, help="Minimum usage rate threshold (e.g., 0.01 for 1%%)")
+    parser.add_argument("--top-n", "-n", type=int, help="Export only top N Pokemon by usage rate")
+    parser.add_argument("--workers", "-w", type=int, default=2, help="Number of processes rendering pages in parallel (default: 2)")
+    parser.add_argument("--debounce", "-d", type=float, default=2.0, help="Seconds to wait after the last file change (default: 2)")
+    parser.add_argument("--poll", "-p", type=float, help="Poll every N seconds instead of using inotify")
+    parser.add_argument("--status-log", "-s", help="Append rebuild status to this JSON Lines file")
+
+    args = parser.parse_args()
+
+    try:
+        watch_site(args.output, args.translate, args.min_usage, args.top_n, args.workers,
+                   args.debounce, args.poll, args.status_log)
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+
+
+if __name__ == "__main__":
+    main()